@@ -0,0 +1,7 @@
+"""Offline benchmarks for the ingestion and search hot paths.
+
+Everything runs in-process: synthetic PRAW-like listings instead of Reddit, a
+mock embedding model, in-memory Qdrant and an in-process stand-in for the
+Meilisearch search endpoint. Run ``python -m benchmarks.run --out results.json``
+and compare the JSON files of two commits.
+"""
@@ -0,0 +1,348 @@
+"""Run the offline benchmarks and write the results as JSON.
+
+Usage::
+
+    python -m benchmarks.run --out results.json
+    python -m benchmarks.run --submissions 200 --comments 100 --depth 8 --concurrency 32
+
+Three benchmarks run against the same synthetic corpus:
+
+- ``mapping``: ``RedditIndexUtils`` extraction and node/document mapping
+  throughput (items per second, best of ``--repeat`` runs);
+- ``upsert``: ``RedditQueryIndex.upsert`` end to end (dedup, chunking, mock
+  embeddings, in-memory Qdrant) with a stand-in connector, Meilisearch ingestor
+  and Redis; one upsert per batch of ``--limit`` submissions;
+- ``search``: ``POST /search`` through the FastAPI app under ``--concurrency``
+  concurrent clients, with the hybrid engine wired to an in-memory copy of the
+  collection and the fake Meilisearch search endpoint from ``server.backends``. Caches and the LLM
+  reranker are disabled so every request takes the full retrieval path.
+
+Latencies are reported in milliseconds as p50/p95/p99 plus mean and max.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Sequence
+
+import httpx
+import numpy as np
+from llama_index.core.embeddings import MockEmbedding
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http import models as qmodels
+
+from server.backends import FakeMeiliTransport, LexicalStore
+from server.backends.synthetic import WORDS, SyntheticConfig, SyntheticReddit
+from server.indexing.dedup import Deduplicator, MemorySignatureStore
+from server.indexing.freshness import MemoryFreshnessStore
+from server.indexing.reddit_index_utils import RedditIndexUtils
+from server.indexing.reddit_query_index import RedditQueryIndex
+from server.main import app
+from server.retrieval.hybrid import HybridSearchEngine
+from server.routes.search import (
+    get_reranker,
+    get_result_cache,
+    get_search_engine,
+    get_semantic_cache,
+)
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "benchmark_posts"
+
+
+def latency_summary(seconds: Sequence[float]) -> Dict[str, float]:
+    """p50/p95/p99/mean/max of ``seconds``, in milliseconds."""
+    if not seconds:
+        return {}
+    ms = np.asarray(seconds, dtype=np.float64) * 1000.0
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {
+        "count": int(ms.size),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(ms.mean()), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+# ----------------------------------------------------------------------
+# Stand-ins for the network services
+# ----------------------------------------------------------------------
+class ListingConnector:
+    """Serves pre-generated submissions, ``limit`` at a time, like a Reddit search."""
+
+    def __init__(self, submissions: List[Any]) -> None:
+        self._submissions = submissions
+        self._offset = 0
+
+    def search(self, query: str, subreddit: Optional[str] = None, limit: int = 10, **_: Any):
+        batch = self._submissions[self._offset : self._offset + limit]
+        self._offset += limit
+        return batch
+
+
+class CollectingIngestor:
+    """Writes Meilisearch documents straight into an in-process ``LexicalStore``."""
+
+    def __init__(self) -> None:
+        self.store = LexicalStore()
+
+    def add(self, documents: List[dict], wait: bool = False) -> None:
+        self.store.add(COLLECTION, documents)
+
+    def apply_settings(self) -> bool:
+        # The in-process store can filter on any attribute.
+        return True
+
+
+class NullRedis:
+    def incr(self, key: str) -> int:
+        return 0
+
+
+class OfflineQueryIndex(RedditQueryIndex):
+    """``RedditQueryIndex`` on in-memory Qdrant, with Reddit/Meili/Redis stubbed out."""
+
+    def __init__(self, connector: ListingConnector, embed_dim: int) -> None:
+        super().__init__(
+            collection_name=COLLECTION,
+            embed_model=MockEmbedding(embed_dim=embed_dim),
+            embedding_cache=None,
+            freshness_store=MemoryFreshnessStore(),
+            deduplicator=Deduplicator(MemorySignatureStore()),
+        )
+        self._client = QdrantClient(":memory:")
+        self._listing = connector
+        self.ingestor = CollectingIngestor()
+
+    def _connector(self) -> Any:
+        return self._listing
+
+    def _meili(self) -> Any:
+        return self.ingestor
+
+    def _redis_client(self) -> Any:
+        return NullRedis()
+
+
+async def copy_collection(source: QdrantClient, target: AsyncQdrantClient) -> int:
+    """Copy every point of the benchmark collection between in-memory clients."""
+    info = source.get_collection(COLLECTION)
+    await target.create_collection(COLLECTION, vectors_config=info.config.params.vectors)
+    copied, offset = 0, None
+    while True:
+        points, offset = source.scroll(
+            COLLECTION, limit=256, offset=offset, with_payload=True, with_vectors=True
+        )
+        if points:
+            await target.upsert(
+                COLLECTION,
+                points=[
+                    qmodels.PointStruct(id=p.id, vector=p.vector, payload=p.payload or {})
+                    for p in points
+                ],
+            )
+            copied += len(points)
+        if offset is None:
+            return copied
+
+
+# ----------------------------------------------------------------------
+# Benchmarks
+# ----------------------------------------------------------------------
+def bench_mapping(submissions: List[Any], repeat: int) -> Dict[str, Any]:
+    items = sum(1 + len(s.comments.list()) for s in submissions)
+    timings: Dict[str, List[float]] = defaultdict(list)
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        records = RedditIndexUtils.extract_records(submissions)
+        timings["extract"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        RedditIndexUtils.records_to_text_nodes(records, "benchmark")
+        timings["text_nodes"].append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        RedditIndexUtils.records_to_meili_documents(records, "benchmark")
+        timings["meili_documents"].append(time.perf_counter() - started)
+
+    result: Dict[str, Any] = {"items": items}
+    for stage, seconds in timings.items():
+        best = min(seconds)
+        result[stage] = {
+            "best_seconds": round(best, 6),
+            "items_per_second": round(items / best, 1) if best > 0 else None,
+        }
+    return result
+
+
+def bench_upsert(
+    submissions: List[Any], limit: int, embed_dim: int
+) -> tuple[Dict[str, Any], OfflineQueryIndex]:
+    index = OfflineQueryIndex(ListingConnector(submissions), embed_dim)
+    items = sum(1 + len(s.comments.list()) for s in submissions)
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for i in range(0, len(submissions), limit):
+        t0 = time.perf_counter()
+        index.upsert(f"benchmark query {i // limit}", limit=limit)
+        latencies.append(time.perf_counter() - t0)
+    total = time.perf_counter() - started
+    points = index._client.count(COLLECTION).count
+    return (
+        {
+            "submissions": len(submissions),
+            "items": items,
+            "points": points,
+            "meili_documents": index.ingestor.store.count(COLLECTION),
+            "total_seconds": round(total, 4),
+            "items_per_second": round(items / total, 1) if total > 0 else None,
+            "per_upsert": latency_summary(latencies),
+        },
+        index,
+    )
+
+
+async def bench_search(
+    index: OfflineQueryIndex,
+    *,
+    requests: int,
+    concurrency: int,
+    top_k: int,
+    embed_dim: int,
+    seed: int,
+) -> Dict[str, Any]:
+    qdrant = AsyncQdrantClient(location=":memory:")
+    await copy_collection(index._client, qdrant)
+    engine = HybridSearchEngine(
+        COLLECTION,
+        qdrant=qdrant,
+        http=httpx.AsyncClient(
+            transport=FakeMeiliTransport(index.ingestor.store), base_url="http://meili"
+        ),
+        embed_model=MockEmbedding(embed_dim=embed_dim),
+    )
+
+    rng = random.Random(seed)
+    queries = [" ".join(rng.sample(WORDS, rng.randint(1, 4))) for _ in range(requests)]
+    latencies: List[float] = []
+    errors = 0
+
+    app.dependency_overrides[get_search_engine] = lambda: engine
+    app.dependency_overrides[get_result_cache] = lambda: None
+    app.dependency_overrides[get_semantic_cache] = lambda: None
+    app.dependency_overrides[get_reranker] = lambda: None
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            pending = iter(queries)
+
+            async def worker() -> None:
+                nonlocal errors
+                for query in pending:
+                    started = time.perf_counter()
+                    resp = await client.post("/search", json={"query": query, "top_k": top_k})
+                    latencies.append(time.perf_counter() - started)
+                    if resp.status_code != 200:
+                        errors += 1
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+            total = time.perf_counter() - started
+    finally:
+        app.dependency_overrides.clear()
+        await engine.aclose()
+
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "total_seconds": round(total, 4),
+        "requests_per_second": round(requests / total, 1) if total > 0 else None,
+        "latency": latency_summary(latencies),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        )
+        return out.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    config = SyntheticConfig(
+        submissions=args.submissions,
+        comments_per_submission=args.comments,
+        max_depth=args.depth,
+        seed=args.seed,
+    )
+    submissions = SyntheticReddit(config).submissions()
+    results: Dict[str, Any] = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.time(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "params": vars(args) | {"out": None},
+        }
+    }
+    results["mapping"] = bench_mapping(submissions, args.repeat)
+    results["upsert"], index = bench_upsert(submissions, args.limit, args.embed_dim)
+    results["search"] = asyncio.run(
+        bench_search(
+            index,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            top_k=args.top_k,
+            embed_dim=args.embed_dim,
+            seed=args.seed,
+        )
+    )
+    return results
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--out", help="write JSON results here (default: stdout)")
+    parser.add_argument("--submissions", type=int, default=50)
+    parser.add_argument("--comments", type=int, default=40, help="comments per submission")
+    parser.add_argument("--depth", type=int, default=5, help="maximum comment nesting depth")
+    parser.add_argument("--limit", type=int, default=10, help="submissions per upsert")
+    parser.add_argument("--repeat", type=int, default=3, help="mapping runs (best is kept)")
+    parser.add_argument("--requests", type=int, default=200, help="/search requests")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--embed-dim", type=int, default=384)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    logging.basicConfig(level=logging.WARNING)
+    args = parse_args(argv)
+    results = run(args)
+    payload = json.dumps(results, indent=2, sort_keys=True)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            fh.write(payload + "\n")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Pluggable external backends (Reddit, Meilisearch, LLM) and their offline fakes.
+
+``BACKEND_MODE=live`` (default) talks to the real services; ``BACKEND_MODE=fake``
+swaps in the in-process stand-ins from ``fakes.py`` so the service can be
+load-tested with no network (Qdrant and Redis are still used as configured).
+"""
+
+from .base import CompletionLLM, LexicalClient, LexicalIndex, RedditClient
+from .fakes import (
+    FakeBackends,
+    FakeLLM,
+    FakeMeiliClient,
+    FakeMeiliTransport,
+    FakeReddit,
+    LexicalStore,
+    fake_backends,
+    is_fake_mode,
+)
+from .faults import BackendError, FaultProfile, QuotaWindow
+
+__all__ = [
+    "BackendError",
+    "CompletionLLM",
+    "FakeBackends",
+    "FakeLLM",
+    "FakeMeiliClient",
+    "FakeMeiliTransport",
+    "FakeReddit",
+    "FaultProfile",
+    "LexicalClient",
+    "LexicalIndex",
+    "LexicalStore",
+    "QuotaWindow",
+    "RedditClient",
+    "fake_backends",
+    "is_fake_mode",
+]
@@ -0,0 +1,43 @@
+"""Interfaces of the external services the pipeline talks to.
+
+The live implementations are the third-party clients themselves (``praw.Reddit``,
+``meilisearch.Client``, LlamaIndex LLMs); ``fakes.py`` provides in-process
+stand-ins. Lexical *search* goes through Meilisearch's REST API with
+``httpx.AsyncClient``, so its seam is an ``httpx.AsyncBaseTransport``.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Mapping, Protocol, Sequence
+
+
+class RedditClient(Protocol):
+    """The ``praw.Reddit`` subset used by ``RedditConnector``."""
+
+    auth: Any  # ``auth.limits``: PRAW's parsed X-Ratelimit headers
+
+    def subreddit(self, display_name: str) -> Any: ...
+
+
+class LexicalIndex(Protocol):
+    """A Meilisearch index handle (``client.index(uid)``)."""
+
+    def add_documents(self, documents: Sequence[dict], primary_key: str = ...) -> Any: ...
+
+    def update_filterable_attributes(self, attributes: Sequence[str]) -> Any: ...
+
+
+class LexicalClient(Protocol):
+    """The ``meilisearch.Client`` subset used by ``MeiliIngestor``."""
+
+    def index(self, uid: str) -> LexicalIndex: ...
+
+    def wait_for_task(self, uid: int) -> Any: ...
+
+    def get_task(self, uid: int) -> Mapping[str, Any]: ...
+
+
+class CompletionLLM(Protocol):
+    """The LlamaIndex LLM subset used by the reranker."""
+
+    async def acomplete(self, prompt: str, **kwargs: Any) -> Any: ...
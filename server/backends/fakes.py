@@ -0,0 +1,420 @@
+"""In-process stand-ins for Reddit, Meilisearch and the LLM.
+
+- ``FakeReddit`` replaces ``praw.Reddit`` underneath the real ``RedditConnector``,
+  so the rate-limit scheduler, retries and comment-expansion pool all run as in
+  production. Every listing page and comment expansion is billed as a request
+  against an optional Reddit-style quota (``FAKE_REDDIT_QUOTA`` per 10 minutes),
+  and ``auth.limits`` is kept up to date like PRAW does from the X-Ratelimit
+  headers. Listings are replayed from a recorded JSON file
+  (``FAKE_LISTINGS_PATH``) or generated per query, deterministically.
+- ``LexicalStore`` is a tiny term-matching index shared by ``FakeMeiliClient``
+  (the ``meilisearch.Client`` subset used for ingestion) and
+  ``FakeMeiliTransport`` (the REST search endpoint used by the hybrid engine),
+  so documents indexed in fake mode are searchable in fake mode.
+- ``FakeLLM`` answers rerank prompts with term-overlap scores.
+
+Every backend takes a ``FaultProfile`` for latency, 5xx and 429 injection.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import httpx
+
+from ..config import settings
+from .faults import BackendError, FaultProfile, QuotaWindow
+from .synthetic import Submission, SyntheticConfig, SyntheticReddit, from_dict
+
+if TYPE_CHECKING:
+    from llama_index.core.base.llms.types import CompletionResponse
+
+# Submissions per Reddit listing page.
+PAGE_SIZE = 100
+_TERM_RE = re.compile(r"\w+")
+_FILTER_RE = re.compile(r"^\s*(\w+)\s*(=|!=|>=|<=|>|<|IN)\s*(.+?)\s*$")
+_FILTER_OPS = {
+    "=": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+    ">=": lambda a, b: a is not None and a >= b,
+    "<=": lambda a, b: a is not None and a <= b,
+    ">": lambda a, b: a is not None and a > b,
+    "<": lambda a, b: a is not None and a < b,
+    "IN": lambda a, b: a in b,
+}
+
+
+_Generated = Tuple[SyntheticReddit, List[Submission]]
+
+
+def _terms(text: str) -> List[str]:
+    return _TERM_RE.findall(text.casefold())
+
+
+def is_fake_mode() -> bool:
+    return settings.backend_mode.strip().lower() == "fake"
+
+
+# ----------------------------------------------------------------------
+# Reddit
+# ----------------------------------------------------------------------
+class _Listing:
+    """Lazy listing that bills one request per page, like PRAW's ListingGenerator.
+
+    A failed page request does not advance the iterator, so a retry resumes
+    where it failed.
+    """
+
+    def __init__(self, reddit: "FakeReddit", items: List[Submission]) -> None:
+        self._reddit = reddit
+        self._items = items
+        self._index = 0
+        self._fetched = 0
+        self._requested = False
+
+    def __iter__(self) -> Iterator[Submission]:
+        return self
+
+    def __next__(self) -> Submission:
+        if self._index >= self._fetched and (self._index < len(self._items) or not self._requested):
+            self._reddit.request()
+            self._requested = True
+            self._fetched += PAGE_SIZE
+        if self._index >= len(self._items):
+            raise StopIteration
+        item = self._items[self._index]
+        self._index += 1
+        return item
+
+
+class _FakeSubreddit:
+    def __init__(self, reddit: "FakeReddit", name: str) -> None:
+        self._reddit = reddit
+        self.display_name = name
+
+    def search(
+        self, query: str, limit: Optional[int] = 100, sort: Optional[str] = None, **_: Any
+    ) -> _Listing:
+        items = self._reddit.listing(query, self.display_name, limit or PAGE_SIZE, sort)
+        return _Listing(self._reddit, items)
+
+
+class FakeReddit:
+    """``praw.Reddit`` stand-in serving recorded or synthetic listings."""
+
+    def __init__(
+        self,
+        *,
+        listings: Optional[Sequence[Submission]] = None,
+        profile: Optional[FaultProfile] = None,
+        quota: int = 0,
+        synthetic: Optional[SyntheticConfig] = None,
+        max_cached_queries: int = 1024,
+    ) -> None:
+        self._recorded = list(listings) if listings is not None else None
+        self._profile = profile or FaultProfile()
+        self._quota = QuotaWindow(quota)
+        self._synthetic = synthetic or SyntheticConfig()
+        self._max_cached = max(1, max_cached_queries)
+        # (query, subreddit) -> (generator, submissions generated so far)
+        self._generated: "OrderedDict[Tuple[str, str], _Generated]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.auth = SimpleNamespace(limits={})
+        self.requests = 0
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs: Any) -> "FakeReddit":
+        """Replay submissions recorded as a JSON list of ``synthetic.to_dict`` objects."""
+        with open(path, encoding="utf-8") as fh:
+            return cls(listings=[from_dict(item) for item in json.load(fh)], **kwargs)
+
+    def subreddit(self, display_name: str) -> _FakeSubreddit:
+        return _FakeSubreddit(self, display_name)
+
+    def request(self) -> None:
+        """One Reddit API call: latency, then quota accounting, then injected faults."""
+        seconds = self._profile.delay()
+        if seconds:
+            time.sleep(seconds)
+        with self._lock:
+            self.requests += 1
+        self.auth.limits = self._quota.consume() or self.auth.limits
+        error = self._profile.failure()
+        if error is not None:
+            raise error
+
+    def listing(
+        self, query: str, subreddit: str, limit: int, sort: Optional[str] = None
+    ) -> List[Submission]:
+        items = (
+            self._replay(query, subreddit)
+            if self._recorded is not None
+            else self._generate(query, subreddit, limit)
+        )
+        if sort == "new":
+            items = sorted(items, key=lambda s: s.created_utc or 0.0, reverse=True)
+        return items[:limit]
+
+    def _replay(self, query: str, subreddit: str) -> List[Submission]:
+        terms = set(_terms(query))
+        pool = [
+            s
+            for s in self._recorded or []
+            if subreddit == "all" or str(getattr(s, "subreddit", "")) == subreddit
+        ]
+        matching = [
+            s
+            for s in pool
+            if terms & set(_terms(f"{s.title or ''} {getattr(s, 'selftext', '') or ''}"))
+        ]
+        return self._attach(matching or pool)
+
+    def _generate(self, query: str, subreddit: str, limit: int) -> List[Submission]:
+        key = (" ".join(_terms(query)), subreddit.casefold())
+        with self._lock:
+            entry = self._generated.get(key)
+            if entry is None:
+                seed = zlib.crc32("|".join(key).encode("utf-8"))
+                config = replace(
+                    self._synthetic,
+                    seed=self._synthetic.seed ^ seed,
+                    id_prefix=f"f{seed:x}_",
+                    topic=query.strip(),
+                    subreddit=subreddit if subreddit != "all" else "fake",
+                )
+                entry = (SyntheticReddit(config), [])
+                self._generated[key] = entry
+                while len(self._generated) > self._max_cached:
+                    self._generated.popitem(last=False)
+            else:
+                self._generated.move_to_end(key)
+            generator, items = entry
+            if len(items) < limit:
+                items.extend(self._attach(generator.submissions(limit - len(items))))
+            return list(items)
+
+    def _attach(self, submissions: List[Submission]) -> List[Submission]:
+        # Expanding a comment forest costs a request, as with PRAW.
+        for s in submissions:
+            s.comments.fetch = self.request
+        return submissions
+
+
+# ----------------------------------------------------------------------
+# Meilisearch
+# ----------------------------------------------------------------------
+class LexicalStore:
+    """Thread-safe term-matching document store with Meilisearch-shaped results."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._documents: Dict[str, Dict[Any, dict]] = defaultdict(dict)
+        self._postings: Dict[str, Dict[str, Set[Any]]] = defaultdict(lambda: defaultdict(set))
+        self._task_uid = 0
+
+    def next_task(self) -> int:
+        with self._lock:
+            self._task_uid += 1
+            return self._task_uid
+
+    def add(self, index: str, documents: Sequence[dict], primary_key: str = "id") -> None:
+        with self._lock:
+            docs, postings = self._documents[index], self._postings[index]
+            for doc in documents:
+                key = doc.get(primary_key)
+                old = docs.get(key)
+                if old is not None:
+                    for term in set(_terms(self._text(old))):
+                        postings[term].discard(key)
+                docs[key] = dict(doc)
+                for term in set(_terms(self._text(doc))):
+                    postings[term].add(key)
+
+    def search(
+        self, index: str, q: str, *, limit: int = 20, filter: Optional[str] = None
+    ) -> List[dict]:
+        conditions = self._parse_filter(filter)
+        with self._lock:
+            docs, postings = self._documents.get(index, {}), self._postings.get(index, {})
+            counts: Dict[Any, int] = defaultdict(int)
+            for term in set(_terms(q)):
+                for key in postings.get(term, ()):
+                    counts[key] += 1
+            ranked = sorted(counts.items(), key=lambda kv: -kv[1])
+            hits = [docs[key] for key, _ in ranked if self._matches(docs[key], conditions)]
+        return [dict(doc) for doc in hits[:limit]]
+
+    def count(self, index: str) -> int:
+        with self._lock:
+            return len(self._documents.get(index, {}))
+
+    @staticmethod
+    def _text(doc: dict) -> str:
+        return " ".join(str(doc.get(k) or "") for k in ("title", "selftext", "body"))
+
+    @staticmethod
+    def _parse_filter(expression: Optional[str]) -> List[Tuple[str, str, Any]]:
+        # Only the ``attr OP value [AND ...]`` filters the service emits.
+        conditions: List[Tuple[str, str, Any]] = []
+        for clause in re.split(r"\s+AND\s+", expression or ""):
+            match = _FILTER_RE.match(clause)
+            if match:
+                attr, op, raw = match.groups()
+                try:
+                    value = json.loads(raw)
+                except ValueError:
+                    value = raw
+                conditions.append((attr, op, value))
+        return conditions
+
+    @staticmethod
+    def _matches(doc: dict, conditions: List[Tuple[str, str, Any]]) -> bool:
+        return all(_FILTER_OPS[op](doc.get(attr), value) for attr, op, value in conditions)
+
+
+class _FakeMeiliIndex:
+    def __init__(self, client: "FakeMeiliClient", uid: str) -> None:
+        self._client = client
+        self.uid = uid
+
+    def add_documents(self, documents: Sequence[dict], primary_key: str = "id") -> dict:
+        self._client.profile.call()
+        self._client.store.add(self.uid, documents, primary_key)
+        return {"taskUid": self._client.store.next_task()}
+
+    def update_filterable_attributes(self, attributes: Sequence[str]) -> dict:
+        self._client.profile.call()
+        return {"taskUid": self._client.store.next_task()}
+
+
+class FakeMeiliClient:
+    """The ``meilisearch.Client`` subset used by ``MeiliIngestor``; tasks finish at once."""
+
+    def __init__(self, store: LexicalStore, profile: Optional[FaultProfile] = None) -> None:
+        self.store = store
+        self.profile = profile or FaultProfile()
+
+    def index(self, uid: str) -> _FakeMeiliIndex:
+        return _FakeMeiliIndex(self, uid)
+
+    def wait_for_task(self, uid: int, **_: Any) -> dict:
+        return {"taskUid": uid, "status": "succeeded"}
+
+    def get_task(self, uid: int) -> dict:
+        return {"taskUid": uid, "status": "succeeded"}
+
+
+class FakeMeiliTransport(httpx.AsyncBaseTransport):
+    """Serves ``POST /indexes/{uid}/search`` from a ``LexicalStore``."""
+
+    _SEARCH_RE = re.compile(r"^/indexes/([^/]+)/search$")
+
+    def __init__(self, store: LexicalStore, profile: Optional[FaultProfile] = None) -> None:
+        self._store = store
+        self._profile = profile or FaultProfile()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        try:
+            await self._profile.acall()
+        except BackendError as exc:
+            return httpx.Response(
+                exc.status_code, headers=exc.response.headers, json={"message": str(exc)}
+            )
+        match = self._SEARCH_RE.match(request.url.path)
+        if request.method != "POST" or match is None:
+            return httpx.Response(404, json={"message": "not found"})
+        body = json.loads(await request.aread() or b"{}")
+        hits = self._store.search(
+            match.group(1),
+            body.get("q") or "",
+            limit=int(body.get("limit", 20)),
+            filter=body.get("filter"),
+        )
+        return httpx.Response(200, json={"hits": hits, "query": body.get("q")})
+
+
+# ----------------------------------------------------------------------
+# LLM
+# ----------------------------------------------------------------------
+_QUERY_RE = re.compile(r"^Query:\s*(.*)$", re.MULTILINE)
+_DOC_RE = re.compile(r"^\[(\d+)\]\s*(.*?)(?=^\[\d+\]|\Z)", re.MULTILINE | re.DOTALL)
+
+
+class FakeLLM:
+    """Completion LLM that scores rerank prompts by query-term overlap (0-10)."""
+
+    def __init__(self, profile: Optional[FaultProfile] = None) -> None:
+        self._profile = profile or FaultProfile()
+
+    async def acomplete(self, prompt: str, **_: Any) -> CompletionResponse:
+        await self._profile.acall()
+        return self.response(prompt)
+
+    def complete(self, prompt: str, **_: Any) -> CompletionResponse:
+        self._profile.call()
+        return self.response(prompt)
+
+    @classmethod
+    def response(cls, prompt: str) -> CompletionResponse:
+        from llama_index.core.base.llms.types import CompletionResponse
+
+        return CompletionResponse(text=cls.answer(prompt))
+
+    @staticmethod
+    def answer(prompt: str) -> str:
+        match = _QUERY_RE.search(prompt)
+        query = set(_terms(match.group(1))) if match else set()
+        scores = []
+        for doc_id, text in _DOC_RE.findall(prompt):
+            overlap = len(query & set(_terms(text))) / len(query) if query else 0.0
+            scores.append({"id": int(doc_id), "score": round(10 * overlap, 1)})
+        return json.dumps({"scores": scores})
+
+
+# ----------------------------------------------------------------------
+# Process-wide fake backends (BACKEND_MODE=fake)
+# ----------------------------------------------------------------------
+@dataclass
+class FakeBackends:
+    reddit: FakeReddit
+    lexical: LexicalStore
+    meili_profile: FaultProfile
+    llm: FakeLLM
+
+    def meili_client(self) -> FakeMeiliClient:
+        return FakeMeiliClient(self.lexical, self.meili_profile)
+
+    def meili_http(self) -> httpx.AsyncClient:
+        transport = FakeMeiliTransport(self.lexical, self.meili_profile)
+        return httpx.AsyncClient(transport=transport, base_url="http://fake-meili")
+
+
+@lru_cache(maxsize=1)
+def fake_backends() -> FakeBackends:
+    """The fakes shared by every component of this process, built from settings."""
+    reddit_profile = FaultProfile.from_settings(settings.fake_reddit_latency_ms)
+    if settings.fake_listings_path:
+        reddit = FakeReddit.from_file(
+            settings.fake_listings_path, profile=reddit_profile, quota=settings.fake_reddit_quota
+        )
+    else:
+        reddit = FakeReddit(
+            profile=reddit_profile,
+            quota=settings.fake_reddit_quota,
+            synthetic=SyntheticConfig(seed=settings.fake_seed),
+        )
+    return FakeBackends(
+        reddit=reddit,
+        lexical=LexicalStore(),
+        meili_profile=FaultProfile.from_settings(settings.fake_meili_latency_ms),
+        llm=FakeLLM(FaultProfile.from_settings(settings.fake_llm_latency_ms)),
+    )
@@ -0,0 +1,121 @@
+"""Latency and failure injection for the fake backends.
+
+Latencies are drawn from a log-normal distribution around a median, which gives
+the long right tail real network services have. Failures are either generic
+5xx errors (``FAKE_ERROR_RATE``) or 429 rate-limit responses
+(``FAKE_RATE_LIMIT_RATE``); both carry a ``response.status_code`` so the
+retry/backoff code treats them exactly like the HTTP errors of the real clients.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Dict, Optional
+
+from ..config import settings
+
+
+class BackendError(Exception):
+    """An HTTP error raised by a fake backend."""
+
+    def __init__(
+        self, status_code: int, message: str = "", headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        super().__init__(f"{status_code} {message}".strip())
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+@dataclass
+class FaultProfile:
+    latency_ms: float = 0.0
+    sigma: float = 0.0
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    seed: Optional[int] = None
+    _rng: random.Random = field(init=False, repr=False)
+    _lock: threading.Lock = field(init=False, repr=False, default_factory=threading.Lock)
+
+    def __post_init__(self) -> None:
+        self._rng = random.Random(self.seed)
+
+    @classmethod
+    def from_settings(cls, latency_ms: float) -> "FaultProfile":
+        return cls(
+            latency_ms=latency_ms,
+            sigma=settings.fake_latency_sigma,
+            error_rate=settings.fake_error_rate,
+            rate_limit_rate=settings.fake_rate_limit_rate,
+            seed=settings.fake_seed,
+        )
+
+    def delay(self) -> float:
+        """Seconds the next call takes."""
+        if self.latency_ms <= 0:
+            return 0.0
+        with self._lock:
+            factor = self._rng.lognormvariate(0.0, self.sigma) if self.sigma > 0 else 1.0
+        return self.latency_ms * factor / 1000.0
+
+    def failure(self) -> Optional[BackendError]:
+        """The error the next call fails with, if any."""
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            return BackendError(429, "Too Many Requests", {"retry-after": "1"})
+        if roll < self.rate_limit_rate + self.error_rate:
+            return BackendError(503, "Service Unavailable")
+        return None
+
+    def call(self) -> None:
+        """Block for one call's latency, then raise its injected failure."""
+        seconds = self.delay()
+        if seconds:
+            time.sleep(seconds)
+        error = self.failure()
+        if error is not None:
+            raise error
+
+    async def acall(self) -> None:
+        seconds = self.delay()
+        if seconds:
+            await asyncio.sleep(seconds)
+        error = self.failure()
+        if error is not None:
+            raise error
+
+
+class QuotaWindow:
+    """Reddit-style request quota: ``limit`` calls per ``window_seconds``."""
+
+    def __init__(self, limit: int, window_seconds: float = 600.0) -> None:
+        self._limit = limit
+        self._window = window_seconds
+        self._lock = threading.Lock()
+        self._started = time.time()
+        self._used = 0
+
+    def consume(self) -> Dict[str, float]:
+        """Count one call and return PRAW-style ``auth.limits``; raise 429 when exhausted."""
+        if self._limit <= 0:
+            return {}
+        with self._lock:
+            now = time.time()
+            if now - self._started >= self._window:
+                self._started, self._used = now, 0
+            reset = self._started + self._window
+            if self._used >= self._limit:
+                retry_after = str(math.ceil(reset - now))
+                raise BackendError(429, "Too Many Requests", {"retry-after": retry_after})
+            self._used += 1
+            return {
+                "remaining": self._limit - self._used,
+                "reset_timestamp": reset,
+                "used": self._used,
+            }
@@ -0,0 +1,236 @@
+"""Synthetic PRAW-like submissions with comment forests.
+
+The objects mimic the attributes PRAW exposes on listing items (plain instance
+attributes, ``author.name``, ``link_id`` prefixes, a ``comments`` forest with
+``list()`` and ``replace_more()``) so they go through exactly the same code paths
+as real listings. Generation is seeded and therefore reproducible across runs.
+
+Listings can also be recorded to plain JSON (``to_dict``) and replayed
+(``from_dict``), e.g. to serve a captured production listing from the fake
+Reddit backend.
+"""
+
+from __future__ import annotations
+
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+WORDS = (
+    "python rust async database index query latency cache vector search embedding "
+    "model server deploy docker kubernetes memory thread process benchmark release "
+    "bug feature upgrade version library framework api request response timeout "
+    "error config setting install package build test review merge branch commit "
+    "performance throughput storage disk network cpu gpu batch stream queue worker"
+).split()
+
+
+class Author:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class CommentForest:
+    """Top-level comments of a submission (or replies of a comment)."""
+
+    def __init__(self, comments: Optional[List["Comment"]] = None) -> None:
+        self._comments: List[Comment] = comments or []
+        # Called by replace_more(); the fake Reddit backend bills it as a request.
+        self.fetch: Optional[Callable[[], None]] = None
+
+    def __iter__(self) -> Iterator["Comment"]:
+        return iter(self._comments)
+
+    def __len__(self) -> int:
+        return len(self._comments)
+
+    def append(self, comment: "Comment") -> None:
+        self._comments.append(comment)
+
+    def replace_more(self, limit: Optional[int] = 32) -> list:
+        if self.fetch is not None:
+            self.fetch()
+        return []
+
+    def list(self) -> List["Comment"]:
+        # Breadth-first, like PRAW's CommentForest.list().
+        out: List[Comment] = []
+        queue = list(self._comments)
+        while queue:
+            comment = queue.pop(0)
+            out.append(comment)
+            queue.extend(comment.replies)
+        return out
+
+
+class Comment:
+    def __init__(self, **attrs) -> None:
+        self.__dict__.update(attrs)
+        self.replies = CommentForest()
+
+
+class Submission:
+    def __init__(self, **attrs) -> None:
+        self.__dict__.update(attrs)
+        self.comments = CommentForest()
+
+
+@dataclass
+class SyntheticConfig:
+    submissions: int = 50
+    comments_per_submission: int = 40
+    max_depth: int = 5
+    # Mean words per comment; lengths are log-normal, so a few exceed the chunk limit.
+    comment_words: int = 40
+    selftext_words: int = 150
+    # Share of comments that repeat an earlier comment verbatim (reposts, copypasta).
+    duplicate_ratio: float = 0.05
+    subreddit: str = "benchmark"
+    seed: int = 0
+    # Prefix of generated ids; differing prefixes keep several corpora apart.
+    id_prefix: str = "b"
+    # Words every title starts with (e.g. the search query that "found" the post).
+    topic: str = ""
+
+
+class SyntheticReddit:
+    def __init__(self, config: Optional[SyntheticConfig] = None) -> None:
+        self.config = config or SyntheticConfig()
+        self._rng = random.Random(self.config.seed)
+        self._next_id = 0
+        self._bodies: List[str] = []
+
+    def submissions(self, count: Optional[int] = None) -> List[Submission]:
+        n = self.config.submissions if count is None else count
+        return [self.submission() for _ in range(n)]
+
+    def submission(self) -> Submission:
+        cfg = self.config
+        sid = self._new_id()
+        now = time.time()
+        submission = Submission(
+            id=sid,
+            name=f"t3_{sid}",
+            title=self._title(),
+            selftext=self._paragraphs(self._length(cfg.selftext_words)),
+            url=f"https://www.reddit.com/r/{cfg.subreddit}/comments/{sid}/",
+            permalink=f"/r/{cfg.subreddit}/comments/{sid}/",
+            score=int(self._rng.paretovariate(1.2)) - 1,
+            upvote_ratio=round(self._rng.uniform(0.5, 1.0), 2),
+            num_comments=cfg.comments_per_submission,
+            created_utc=now - self._rng.uniform(0, 30 * 86400),
+            edited=False,
+            over_18=False,
+            subreddit=cfg.subreddit,
+            author=Author(f"user{self._rng.randint(1, 5000)}"),
+        )
+        self._add_comments(submission)
+        return submission
+
+    def _add_comments(self, submission: Submission) -> None:
+        cfg = self.config
+        # (comment, depth) pairs that may still receive replies.
+        open_threads: List[tuple] = []
+        for _ in range(cfg.comments_per_submission):
+            parent, depth = None, 0
+            # Most comments reply to an existing thread, biased towards shallow ones.
+            if open_threads and self._rng.random() < 0.6:
+                parent, depth = self._rng.choice(open_threads)
+                depth += 1
+            comment = self._comment(submission, parent)
+            if parent is None:
+                submission.comments.append(comment)
+            else:
+                parent.replies.append(comment)
+            if depth < cfg.max_depth - 1:
+                open_threads.append((comment, depth))
+
+    def _comment(self, submission: Submission, parent: Optional[Comment]) -> Comment:
+        cid = self._new_id()
+        if self._bodies and self._rng.random() < self.config.duplicate_ratio:
+            body = self._rng.choice(self._bodies)
+        else:
+            body = self._paragraphs(self._length(self.config.comment_words))
+            self._bodies.append(body)
+        return Comment(
+            id=cid,
+            name=f"t1_{cid}",
+            body=body,
+            score=int(self._rng.paretovariate(1.5)) - 1,
+            created_utc=submission.created_utc + self._rng.uniform(0, 86400),
+            edited=False,
+            subreddit=submission.subreddit,
+            author=Author(f"user{self._rng.randint(1, 5000)}"),
+            link_id=f"t3_{submission.id}",
+            parent_id=parent.name if parent is not None else submission.name,
+            permalink=f"{submission.permalink}_/{cid}/",
+        )
+
+    def _title(self) -> str:
+        title = self._sentence(self._rng.randint(5, 14)).rstrip(".")
+        return f"{self.config.topic} {title.lower()}".strip() if self.config.topic else title
+
+    def _new_id(self) -> str:
+        self._next_id += 1
+        return f"{self.config.id_prefix}{self._next_id:x}"
+
+    def _length(self, mean: int) -> int:
+        return max(1, int(self._rng.lognormvariate(0, 0.8) * mean))
+
+    def _sentence(self, words: int) -> str:
+        text = " ".join(self._rng.choice(WORDS) for _ in range(words))
+        return text.capitalize() + "."
+
+    def _paragraphs(self, words: int) -> str:
+        sentences: List[str] = []
+        while words > 0:
+            n = min(words, self._rng.randint(6, 20))
+            sentences.append(self._sentence(n))
+            words -= n
+        # Blank lines between paragraphs of about four sentences, as in Reddit markdown.
+        return "\n\n".join(" ".join(sentences[i : i + 4]) for i in range(0, len(sentences), 4))
+
+
+def to_dict(submission: Any) -> Dict[str, Any]:
+    """JSON-serialisable form of a (synthetic or PRAW) submission and its forest."""
+
+    def _plain(obj: Any, children: Any) -> Dict[str, Any]:
+        data: Dict[str, Any] = {}
+        for key, value in vars(obj).items():
+            if key.startswith("_") or key in ("comments", "replies"):
+                continue
+            if key == "author":
+                value = getattr(value, "name", None)
+            elif key == "subreddit" and value is not None:
+                value = str(value)
+            if isinstance(value, (str, int, float, bool, type(None))):
+                data[key] = value
+        data["replies"] = [_plain(c, getattr(c, "replies", [])) for c in children or []]
+        return data
+
+    return _plain(submission, getattr(submission, "comments", []))
+
+
+def from_dict(data: Dict[str, Any]) -> Submission:
+    """Rebuild a submission recorded with :func:`to_dict`."""
+
+    def _attrs(item: Dict[str, Any]) -> Dict[str, Any]:
+        attrs = {k: v for k, v in item.items() if k != "replies"}
+        if attrs.get("author"):
+            attrs["author"] = Author(attrs["author"])
+        return attrs
+
+    def _comment(item: Dict[str, Any]) -> Comment:
+        comment = Comment(**_attrs(item))
+        for reply in item.get("replies", []):
+            comment.replies.append(_comment(reply))
+        return comment
+
+    submission = Submission(**_attrs(data))
+    for item in data.get("replies", []):
+        submission.comments.append(_comment(item))
+    return submission
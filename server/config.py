@@ -8,19 +8,98 @@ class Settings(BaseSettings):
     openai_api_key: str | None = Field(default=None, alias="OPENAI_API_KEY")
 
     qdrant_url: str = Field(default="http://localhost:6333", alias="QDRANT_URL")
+    # Collection (or alias) used for both indexing and search.
+    qdrant_collection: str = Field(default="reddit_mcp_posts", alias="QDRANT_COLLECTION")
+    # none | scalar | binary; the layout settings apply when a collection is created.
+    qdrant_quantization: str = Field(default="none", alias="QDRANT_QUANTIZATION")
+    qdrant_quantization_always_ram: bool = Field(
+        default=True, alias="QDRANT_QUANTIZATION_ALWAYS_RAM"
+    )
+    qdrant_quantization_rescore: bool = Field(default=True, alias="QDRANT_QUANTIZATION_RESCORE")
+    qdrant_quantization_oversampling: float = Field(
+        default=2.0, alias="QDRANT_QUANTIZATION_OVERSAMPLING"
+    )
+    qdrant_on_disk_vectors: bool = Field(default=False, alias="QDRANT_ON_DISK_VECTORS")
+    qdrant_on_disk_payload: bool = Field(default=False, alias="QDRANT_ON_DISK_PAYLOAD")
+    qdrant_hnsw_m: int = Field(default=16, alias="QDRANT_HNSW_M")
+    qdrant_hnsw_ef_construct: int = Field(default=100, alias="QDRANT_HNSW_EF_CONSTRUCT")
+    # Search-time HNSW beam width (0 = Qdrant's default).
+    qdrant_hnsw_ef: int = Field(default=0, alias="QDRANT_HNSW_EF")
     meili_url: str = Field(default="http://localhost:7700", alias="MEILI_URL")
     meili_master_key: str | None = Field(default=None, alias="MEILI_MASTER_KEY")
+    meili_batch_size: int = Field(default=1000, alias="MEILI_BATCH_SIZE")
+    meili_flush_interval_seconds: float = Field(default=2.0, alias="MEILI_FLUSH_INTERVAL_SECONDS")
     redis_url: str = Field(default="redis://localhost:6379", alias="REDIS_URL")
 
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
 
     llm_model_id: str = Field(default="gpt-5-nano", alias="LLM_MODEL_ID")
+    llm_temperature: float = Field(default=0.2, alias="LLM_TEMPERATURE")
     embedding_model_id: str = Field(default="BAAI/bge-small-en-v1.5", alias="EMBEDDING_MODEL_ID")
+    embedding_warmup: bool = Field(default=True, alias="EMBEDDING_WARMUP")
+    # redis | disk | none
+    embedding_cache_backend: str = Field(default="redis", alias="EMBEDDING_CACHE_BACKEND")
+    embedding_cache_path: str = Field(
+        default=".cache/embeddings.sqlite", alias="EMBEDDING_CACHE_PATH"
+    )
+    embedding_cache_max_bytes: int = Field(
+        default=512 * 1024 * 1024, alias="EMBEDDING_CACHE_MAX_BYTES"
+    )
+    embedding_cache_ttl_seconds: int = Field(default=0, alias="EMBEDDING_CACHE_TTL_SECONDS")
+    # Processes embedding in parallel (0 = embed in the calling process).
+    embed_workers: int = Field(default=0, alias="EMBED_WORKERS")
+    embed_batch_size: int = Field(default=64, alias="EMBED_BATCH_SIZE")
+    embed_threads_per_worker: int = Field(default=1, alias="EMBED_THREADS_PER_WORKER")
+    # fork | forkserver | spawn
+    embed_pool_start_method: str = Field(default="fork", alias="EMBED_POOL_START_METHOD")
 
     cache_ttl_seconds: int = Field(default=3600, alias="CACHE_TTL_SECONDS")
+    # How long the result cache is bypassed after a Redis error.
+    cache_retry_after_seconds: float = Field(default=5.0, alias="CACHE_RETRY_AFTER_SECONDS")
+    cache_max_entries: int = Field(default=10000, alias="CACHE_MAX_ENTRIES")
+    # Calibrate per embedding model: BGE-style models score unrelated queries high.
+    semantic_cache_threshold: float = Field(default=0.95, alias="SEMANTIC_CACHE_THRESHOLD")
     expiration_days: int = Field(default=14, alias="EXPIRATION_DAYS")
+    rerank_enabled: bool = Field(default=False, alias="RERANK_ENABLED")
     rerank_top_k: int = Field(default=20, alias="RERANK_TOP_K")
+    rerank_batch_size: int = Field(default=20, alias="RERANK_BATCH_SIZE")
+    rerank_timeout_seconds: float = Field(default=3.0, alias="RERANK_TIMEOUT_SECONDS")
+    semantic_top_k: int = Field(default=200, alias="SEMANTIC_TOP_K")
+    bm25_top_k: int = Field(default=200, alias="BM25_TOP_K")
+    # Weight of the semantic ranking in rank fusion (lexical gets 1 - alpha).
+    hybrid_alpha: float = Field(default=0.5, alias="HYBRID_ALPHA")
+    hybrid_rrf_k: int = Field(default=60, alias="HYBRID_RRF_K")
+    temporal_decay_half_life_days: float = Field(
+        default=7.0, gt=0, alias="TEMPORAL_DECAY_HALF_LIFE_DAYS"
+    )
+    temporal_weight: float = Field(default=0.2, alias="TEMPORAL_WEIGHT")
+    engagement_weight: float = Field(default=0.1, alias="ENGAGEMENT_WEIGHT")
     query_max_subqueries: int = Field(default=5, alias="QUERY_MAX_SUBQUERIES")
+    chunk_max_tokens: int = Field(default=512, alias="CHUNK_MAX_TOKENS")
+    chunk_overlap_tokens: int = Field(default=64, alias="CHUNK_OVERLAP_TOKENS")
+    dedup_similarity_threshold: float = Field(default=0.92, alias="DEDUP_SIMILARITY_THRESHOLD")
+    dedup_ttl_days: float = Field(default=30.0, alias="DEDUP_TTL_DAYS")
+    queue_concurrency: int = Field(default=4, alias="QUEUE_CONCURRENCY")
+    index_batch_size: int = Field(default=128, alias="INDEX_BATCH_SIZE")
+
+    job_queue_enabled: bool = Field(default=True, alias="JOB_QUEUE_ENABLED")
+    # How long a queued/running job blocks duplicates of its (query, subreddit).
+    job_active_ttl_seconds: int = Field(default=900, alias="JOB_ACTIVE_TTL_SECONDS")
+    job_ttl_seconds: int = Field(default=86400, alias="JOB_TTL_SECONDS")
+    # A worker whose heartbeat is older than this is presumed dead; its claimed
+    # jobs are requeued when another worker starts.
+    job_heartbeat_ttl_seconds: int = Field(default=60, alias="JOB_HEARTBEAT_TTL_SECONDS")
+    job_wait_max_seconds: float = Field(default=60.0, alias="JOB_WAIT_MAX_SECONDS")
+    job_default_limit: int = Field(default=100, alias="JOB_DEFAULT_LIMIT")
+    worker_metrics_port: int = Field(default=9101, alias="WORKER_METRICS_PORT")
+
+    rate_limit_max_calls_per_minute: int = Field(
+        default=60, alias="RATE_LIMIT_MAX_CALLS_PER_MINUTE"
+    )
+    rate_limit_window_seconds: int = Field(default=60, alias="RATE_LIMIT_WINDOW_SECONDS")
+    backoff_initial_seconds: float = Field(default=1.0, alias="BACKOFF_INITIAL_SECONDS")
+    backoff_max_seconds: float = Field(default=60.0, alias="BACKOFF_MAX_SECONDS")
+    retry_max_attempts: int = Field(default=5, alias="RETRY_MAX_ATTEMPTS")
 
     ner_languages_raw: str = Field(default="en,es", alias="NER_LANGUAGES")
 
@@ -28,6 +107,20 @@ class Settings(BaseSettings):
     reddit_client_secret: str | None = Field(default=None, alias="REDDIT_CLIENT_SECRET")
     reddit_user_agent: str = Field(default="reddit-mcp/0.1", alias="REDDIT_USER_AGENT")
 
+    # live | fake (in-process Reddit/Meilisearch/LLM stand-ins for offline load tests)
+    backend_mode: str = Field(default="live", alias="BACKEND_MODE")
+    fake_listings_path: str | None = Field(default=None, alias="FAKE_LISTINGS_PATH")
+    fake_reddit_latency_ms: float = Field(default=150.0, alias="FAKE_REDDIT_LATENCY_MS")
+    fake_meili_latency_ms: float = Field(default=5.0, alias="FAKE_MEILI_LATENCY_MS")
+    fake_llm_latency_ms: float = Field(default=400.0, alias="FAKE_LLM_LATENCY_MS")
+    # Sigma of the log-normal latency distribution around the medians above.
+    fake_latency_sigma: float = Field(default=0.5, alias="FAKE_LATENCY_SIGMA")
+    fake_error_rate: float = Field(default=0.0, alias="FAKE_ERROR_RATE")
+    fake_rate_limit_rate: float = Field(default=0.0, alias="FAKE_RATE_LIMIT_RATE")
+    # Reddit requests allowed per 10-minute window before 429s (0 = unlimited).
+    fake_reddit_quota: int = Field(default=0, alias="FAKE_REDDIT_QUOTA")
+    fake_seed: int = Field(default=0, alias="FAKE_SEED")
+
     @property
     def ner_languages(self) -> List[str]:
         return [lang.strip() for lang in self.ner_languages_raw.split(",") if lang.strip()]
@@ -1,3 +1,25 @@
-from .reddit import RedditConnector
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-__all__ = ["RedditConnector"]
+if TYPE_CHECKING:
+    from .rate_limit import Priority, RateLimitScheduler
+    from .reddit import RedditConnector
+
+_EXPORTS = {
+    "RedditConnector": ".reddit",
+    "RateLimitScheduler": ".rate_limit",
+    "Priority": ".rate_limit",
+}
+
+__all__ = ["RedditConnector", "RateLimitScheduler", "Priority"]
+
+
+def __getattr__(name: str) -> Any:
+    # PEP 562: submodules are imported on first access, so importing the
+    # package (or a light submodule of it) does not pull in praw.
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,250 @@
+"""Client-side rate limiting for Reddit API calls (FR-18).
+
+All Reddit calls go through a shared ``RateLimitScheduler`` which combines:
+
+- a token bucket throttling calls to ``RATE_LIMIT_MAX_CALLS_PER_MINUTE`` per
+  ``RATE_LIMIT_WINDOW_SECONDS``;
+- the server-side quota reported by Reddit's ``X-Ratelimit-*`` headers, so the
+  remaining calls of the current window are spent but never exceeded;
+- a priority wait queue, so interactive searches are served before background
+  refreshes when both wait for a token;
+- jittered exponential backoff (``tenacity``) on 429 and 5xx responses.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from enum import IntEnum
+from typing import Any, Callable, Mapping, Optional, TypeVar
+
+from tenacity import Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class Priority(IntEnum):
+    """Scheduling priority; lower values are served first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class TokenBucket:
+    """Classic token bucket. Not thread-safe; the scheduler serialises access."""
+
+    def __init__(
+        self,
+        capacity: float,
+        refill_per_second: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._capacity = float(capacity)
+        self._refill_per_second = float(refill_per_second)
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        elapsed = max(0.0, now - self._updated_at)
+        self._tokens = min(self._capacity, self._tokens + elapsed * self._refill_per_second)
+        self._updated_at = now
+
+    def wait_time(self, cost: float = 1.0) -> float:
+        """Seconds until ``cost`` tokens are available (0 if available now)."""
+        self._refill()
+        missing = min(cost, self._capacity) - self._tokens
+        if missing <= 0:
+            return 0.0
+        if self._refill_per_second <= 0:
+            return float("inf")
+        return missing / self._refill_per_second
+
+    def consume(self, cost: float = 1.0) -> None:
+        self._refill()
+        self._tokens -= min(cost, self._capacity)
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    response = getattr(exc, "response", None)
+    status = getattr(response, "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Whether ``exc`` is a 429 or 5xx response that deserves a retry."""
+    status = _status_code(exc)
+    if status is not None:
+        return status == 429 or 500 <= status < 600
+    # prawcore raises these without a response in some code paths
+    return type(exc).__name__ in {"TooManyRequests", "ServerError"}
+
+
+class RateLimitScheduler:
+    """Shared scheduler placed in front of every Reddit call."""
+
+    def __init__(
+        self,
+        max_calls: int = 60,
+        window_seconds: float = 60.0,
+        *,
+        backoff_initial_seconds: float = 1.0,
+        backoff_max_seconds: float = 60.0,
+        retry_max_attempts: int = 5,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self._bucket = TokenBucket(max_calls, max_calls / float(window_seconds), clock=clock)
+        self._clock = clock
+        self._sleep = sleep
+        self._backoff_initial = backoff_initial_seconds
+        self._backoff_max = backoff_max_seconds
+        self._max_attempts = max(1, retry_max_attempts)
+
+        self._cond = threading.Condition()
+        self._waiters: list[tuple[int, int]] = []
+        self._seq = itertools.count()
+
+        # Server-side quota from X-Ratelimit-* headers (unknown until first response).
+        self._quota_remaining: Optional[float] = None
+        self._quota_reset_at: Optional[float] = None
+
+    # ------------------------------------------------------------------
+    # Quota tracking
+    # ------------------------------------------------------------------
+    def update_from_headers(self, headers: Mapping[str, Any]) -> None:
+        """Resync the server quota from ``X-Ratelimit-Remaining/Reset`` headers."""
+        lowered = {str(k).lower(): v for k, v in headers.items()}
+        remaining = lowered.get("x-ratelimit-remaining")
+        reset = lowered.get("x-ratelimit-reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            self._set_quota(float(remaining), float(reset))
+        except (TypeError, ValueError):
+            return
+
+    def update_from_limits(self, limits: Mapping[str, Any]) -> None:
+        """Resync from PRAW's ``reddit.auth.limits`` (parsed X-Ratelimit headers)."""
+        remaining = limits.get("remaining")
+        reset_timestamp = limits.get("reset_timestamp")
+        if remaining is None or reset_timestamp is None:
+            return
+        self._set_quota(float(remaining), max(0.0, float(reset_timestamp) - time.time()))
+
+    def _set_quota(self, remaining: float, seconds_to_reset: float) -> None:
+        with self._cond:
+            self._quota_remaining = remaining
+            self._quota_reset_at = self._clock() + seconds_to_reset
+            self._cond.notify_all()
+
+    def _quota_wait_time(self) -> float:
+        if self._quota_remaining is None or self._quota_reset_at is None:
+            return 0.0
+        now = self._clock()
+        if now >= self._quota_reset_at:
+            # Window rolled over; wait for the next response to learn the new quota.
+            self._quota_remaining = None
+            self._quota_reset_at = None
+            return 0.0
+        if self._quota_remaining >= 1:
+            return 0.0
+        return self._quota_reset_at - now
+
+    # ------------------------------------------------------------------
+    # Admission
+    # ------------------------------------------------------------------
+    def acquire(self, priority: Priority = Priority.INTERACTIVE, cost: float = 1.0) -> None:
+        """Block until the caller may issue ``cost`` requests.
+
+        Waiters are admitted strictly in (priority, arrival) order.
+        """
+        with self._cond:
+            ticket = (int(priority), next(self._seq))
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    if self._waiters[0] == ticket:
+                        wait = max(self._bucket.wait_time(cost), self._quota_wait_time())
+                        if wait <= 0:
+                            heapq.heappop(self._waiters)
+                            self._bucket.consume(cost)
+                            if self._quota_remaining is not None:
+                                self._quota_remaining -= cost
+                            self._cond.notify_all()
+                            return
+                        self._cond.wait(timeout=min(wait, 1.0))
+                    else:
+                        self._cond.wait(timeout=1.0)
+            except BaseException:
+                if ticket in self._waiters:
+                    self._waiters.remove(ticket)
+                    heapq.heapify(self._waiters)
+                    self._cond.notify_all()
+                raise
+
+    def call(
+        self,
+        fn: Callable[..., T],
+        *args: Any,
+        priority: Priority = Priority.INTERACTIVE,
+        cost: float = 1.0,
+        **kwargs: Any,
+    ) -> T:
+        """Run ``fn`` once admitted, retrying 429/5xx with jittered backoff."""
+
+        def _before_sleep(retry_state) -> None:
+            exc = retry_state.outcome.exception() if retry_state.outcome else None
+            if exc is not None and _status_code(exc) == 429:
+                # Reddit says we are out of quota; stop admitting until it resets.
+                with self._cond:
+                    self._quota_remaining = 0
+                    if self._quota_reset_at is None:
+                        self._quota_reset_at = self._clock() + self._backoff_initial
+            logger.warning(
+                "Retrying Reddit call after %s (attempt %s/%s)",
+                exc,
+                retry_state.attempt_number,
+                self._max_attempts,
+            )
+
+        retrying = Retrying(
+            retry=retry_if_exception(is_retryable),
+            wait=wait_random_exponential(multiplier=self._backoff_initial, max=self._backoff_max),
+            stop=stop_after_attempt(self._max_attempts),
+            sleep=self._sleep,
+            before_sleep=_before_sleep,
+            reraise=True,
+        )
+        for attempt in retrying:
+            with attempt:
+                self.acquire(priority, cost)
+                return fn(*args, **kwargs)
+        raise AssertionError("unreachable")  # pragma: no cover
+
+
+_DEFAULT_SCHEDULER: Optional[RateLimitScheduler] = None
+_DEFAULT_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_default_scheduler() -> RateLimitScheduler:
+    """Return the process-wide scheduler configured from settings."""
+    global _DEFAULT_SCHEDULER
+    with _DEFAULT_SCHEDULER_LOCK:
+        if _DEFAULT_SCHEDULER is None:
+            _DEFAULT_SCHEDULER = RateLimitScheduler(
+                max_calls=settings.rate_limit_max_calls_per_minute,
+                window_seconds=settings.rate_limit_window_seconds,
+                backoff_initial_seconds=settings.backoff_initial_seconds,
+                backoff_max_seconds=settings.backoff_max_seconds,
+                retry_max_attempts=settings.retry_max_attempts,
+            )
+        return _DEFAULT_SCHEDULER
@@ -1,12 +1,67 @@
 from __future__ import annotations
 
+import functools
+import logging
 import os
-from typing import Iterable, List, Optional
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
 
 import praw
+from praw.models import MoreComments
+
+from ..metrics import REDDIT_COMMENTS_EXPANDED_TOTAL, StageTimer, record_swallowed, track_stage
+from .rate_limit import Priority, RateLimitScheduler, get_default_scheduler
 
 """Reddit connector returning PRAW models directly."""
 
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_END = object()
+
+# Process-wide pool used for concurrent Reddit calls (listing fetches of
+# ``search_many`` and comment-forest expansions). It is shared by every connector
+# instance so the number of in-flight requests is capped globally, not per caller.
+_EXPANSION_POOL: Optional[ThreadPoolExecutor] = None
+_EXPANSION_POOL_LOCK = threading.Lock()
+
+
+def _expansion_pool(max_workers: int) -> ThreadPoolExecutor:
+    """Return the shared comment-expansion pool, creating it on first use.
+
+    The pool size is fixed by the first caller; later callers share it.
+    """
+    global _EXPANSION_POOL
+    with _EXPANSION_POOL_LOCK:
+        if _EXPANSION_POOL is None:
+            _EXPANSION_POOL = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="reddit-comments"
+            )
+        return _EXPANSION_POOL
+
+
+def _pending_more(forest: Any) -> int:
+    """Number of ``MoreComments`` placeholders in a comment forest."""
+    flatten = getattr(forest, "list", None)
+    if not callable(flatten):
+        return 0
+    return sum(isinstance(c, MoreComments) for c in flatten())
+
 
 class RedditConnector:
     def __init__(
@@ -14,7 +69,32 @@ class RedditConnector:
         client_id: Optional[str] = None,
         client_secret: Optional[str] = None,
         user_agent: Optional[str] = None,
+        *,
+        max_concurrency: int = 1,
+        scheduler: Optional[RateLimitScheduler] = None,
+        reddit: Any = None,
     ) -> None:
+        # ``reddit`` replaces ``praw.Reddit`` (e.g. the fake backend for load tests)
+        # and is shared by all threads, so it must be thread-safe. ``praw.Reddit``
+        # is not: a connector that builds its own client gives every thread that
+        # uses it a separate instance (see ``_client``).
+        self._factory: Optional[Callable[[], Any]] = None
+        if reddit is None:
+            self._factory = functools.partial(self._praw, client_id, client_secret, user_agent)
+            reddit = self._factory()
+        self._reddit = reddit
+        self._local = threading.local()
+        self._local.reddit = reddit
+        # 1 keeps the original serial behaviour; >1 expands comment forests of
+        # several submissions in parallel through the shared pool.
+        self._max_concurrency = max(1, int(max_concurrency))
+        # Every Reddit call is admitted by the shared rate-limit scheduler.
+        self._scheduler = scheduler or get_default_scheduler()
+
+    @staticmethod
+    def _praw(
+        client_id: Optional[str], client_secret: Optional[str], user_agent: Optional[str]
+    ) -> praw.Reddit:
         # Resolve credentials strictly from provided args or current environment.
         client_id = client_id or os.getenv("REDDIT_CLIENT_ID")
         client_secret = client_secret or os.getenv("REDDIT_CLIENT_SECRET")
@@ -28,12 +108,30 @@ class RedditConnector:
                 "Reddit credentials are required: set REDDIT_CLIENT_ID and REDDIT_CLIENT_SECRET"
             )
 
-        self._reddit = praw.Reddit(
+        return praw.Reddit(
             client_id=client_id,
             client_secret=client_secret,
             user_agent=user_agent,
         )
 
+    def _client(self) -> Any:
+        """The Reddit client of the calling thread, created on its first call."""
+        if self._factory is None:
+            return self._reddit
+        client = getattr(self._local, "reddit", None)
+        if client is None:
+            client = self._local.reddit = self._factory()
+        return client
+
+    def _call(self, fn: Callable[..., T], *args: Any, priority: Priority, cost: float = 1.0) -> T:
+        """Run a Reddit call through the scheduler and resync it from the response."""
+        try:
+            return self._scheduler.call(fn, *args, priority=priority, cost=cost)
+        finally:
+            limits = getattr(getattr(self._client(), "auth", None), "limits", None)
+            if isinstance(limits, dict):
+                self._scheduler.update_from_limits(limits)
+
     def search(
         self,
         query: str,
@@ -44,30 +142,248 @@ class RedditConnector:
         comments_limit: Optional[int] = 50,
         comment_sort: Optional[str] = None,
         replace_more_limit: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        sort: Optional[str] = None,
     ) -> List[praw.models.Submission]:
         if not query or not query.strip():
             return []
 
-        submissions: Iterable[praw.models.Submission]
-        if subreddit:
-            sub = self._reddit.subreddit(subreddit)
-            submissions = sub.search(query, limit=limit)
+        # Page by page, so a retried page request never drops the pages before it.
+        results = list(
+            self._iter_listing(self._listing(query, subreddit, limit, sort), priority, limit)
+        )
+        if include_comments:
+            self.expand_comments(
+                results,
+                comment_sort=comment_sort,
+                replace_more_limit=replace_more_limit,
+                priority=priority,
+            )
+        return results
+
+    def search_many(
+        self,
+        queries: Sequence[str],
+        subreddit: Optional[str] = None,
+        limit: int = 10,
+        *,
+        include_comments: bool = True,
+        comment_sort: Optional[str] = None,
+        replace_more_limit: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Dict[str, List[praw.models.Submission]]:
+        """Run several searches concurrently and merge their results.
+
+        Listings are fetched in parallel (up to ``max_concurrency``), then each
+        submission is kept once, under the first query (in ``queries`` order) that
+        returned it, so overlapping subqueries never expand or index the same
+        thread twice. Comments are expanded once for the merged set.
+        """
+        queries = [q for q in dict.fromkeys(queries) if q and q.strip()]
+
+        def _list(query: str) -> List[praw.models.Submission]:
+            return self.search(query, subreddit, limit, include_comments=False, priority=priority)
+
+        if self._max_concurrency <= 1 or len(queries) <= 1:
+            listings = [_list(q) for q in queries]
         else:
-            submissions = self._reddit.subreddit("all").search(query, limit=limit)
-
-        results: List[praw.models.Submission] = []
-        for s in submissions:
-            if include_comments and hasattr(s, "comments"):
-                try:
-                    if comment_sort:
-                        s.comment_sort = comment_sort
-                    # Expand MoreComments according to requested strategy
-                    s.comments.replace_more(limit=replace_more_limit)
-                    # Force full flatten to ensure replies are present in consumers
-                    _ = s.comments.list()
-                except Exception:
-                    pass
-
-            results.append(s)
+            # Nothing submitted here waits on the pool itself, so sharing it with
+            # the comment expansions cannot deadlock.
+            listings = list(_expansion_pool(self._max_concurrency).map(_list, queries))
 
-        return results
+        seen: set = set()
+        merged: Dict[str, List[praw.models.Submission]] = {}
+        for query, listing in zip(queries, listings, strict=True):
+            unique = []
+            for s in listing:
+                key = getattr(s, "id", None) or id(s)
+                if key not in seen:
+                    seen.add(key)
+                    unique.append(s)
+            merged[query] = unique
+
+        if include_comments:
+            self.expand_comments(
+                [s for subs in merged.values() for s in subs],
+                comment_sort=comment_sort,
+                replace_more_limit=replace_more_limit,
+                priority=priority,
+            )
+        return merged
+
+    def iter_search(
+        self,
+        query: str,
+        subreddit: Optional[str] = None,
+        limit: int = 10,
+        *,
+        include_comments: bool = True,
+        comment_sort: Optional[str] = None,
+        replace_more_limit: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE,
+        sort: Optional[str] = None,
+    ) -> Iterator[praw.models.Submission]:
+        """Streaming variant of :meth:`search`.
+
+        Submissions are yielded, in listing order, as soon as their comment forest
+        is expanded. At most ``max_concurrency`` submissions are fetched ahead of
+        the consumer, so a slow consumer throttles the Reddit calls (backpressure)
+        and memory stays bounded regardless of ``limit``.
+        """
+        if not query or not query.strip():
+            return
+
+        listing = self._iter_listing(self._listing(query, subreddit, limit, sort), priority, limit)
+        if not include_comments:
+            yield from listing
+            return
+
+        if self._max_concurrency <= 1:
+            for s in listing:
+                self._expand_submission_comments(s, comment_sort, replace_more_limit, priority)
+                yield s
+            return
+
+        pool = _expansion_pool(self._max_concurrency)
+        window: Deque[Tuple[praw.models.Submission, Future]] = deque()
+        for s in listing:
+            window.append(
+                (
+                    s,
+                    pool.submit(
+                        self._expand_submission_comments,
+                        s,
+                        comment_sort,
+                        replace_more_limit,
+                        priority,
+                    ),
+                )
+            )
+            if len(window) >= self._max_concurrency:
+                head, future = window.popleft()
+                future.result()
+                yield head
+        while window:
+            head, future = window.popleft()
+            future.result()
+            yield head
+
+    def _listing(
+        self, query: str, subreddit: Optional[str], limit: int, sort: Optional[str] = None
+    ) -> Iterable[praw.models.Submission]:
+        # ``sort`` is e.g. "new" for incremental refreshes; Reddit defaults to relevance.
+        kwargs = {"sort": sort} if sort else {}
+        sub = self._client().subreddit(subreddit or "all")
+        return sub.search(query, limit=limit, **kwargs)
+
+    def _iter_listing(
+        self,
+        submissions: Iterable[praw.models.Submission],
+        priority: Priority,
+        limit: Optional[int] = None,
+    ) -> Iterator[praw.models.Submission]:
+        """Iterate a lazy listing, admitting each page request through the scheduler.
+
+        Stops after ``limit`` items without reserving a page for the item after
+        the last one, which the listing would never request.
+        """
+        it = iter(submissions)
+        listed = StageTimer("reddit_search")
+        index = 0
+        while limit is None or index < limit:
+            # Listings are paginated by 100 items; a new page is requested on
+            # every 100th item. A sentinel avoids raising StopIteration inside
+            # the retry machinery.
+            if index % 100 == 0:
+                with track_stage("reddit_search"):
+                    s = self._call(next, it, _END, priority=priority)
+            else:
+                s = next(it, _END)
+            if s is _END:
+                return
+            index += 1
+            listed.add(1)
+            yield s
+
+    def _bind(self, s: praw.models.Submission) -> None:
+        """Make ``s`` fetch its comments through the calling thread's client.
+
+        PRAW models issue their requests through the client that created them,
+        which is another thread's when the expansion runs in the pool.
+        """
+        if self._factory is not None and hasattr(s, "_reddit"):
+            s._reddit = self._client()
+
+    def expand_comments(
+        self,
+        submissions: List[praw.models.Submission],
+        *,
+        comment_sort: Optional[str] = None,
+        replace_more_limit: Optional[int] = None,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> None:
+        """Fetch and expand the comment forest of each submission in place.
+
+        With ``max_concurrency > 1`` the submissions are expanded in parallel, so
+        wall time tracks the slowest thread instead of the sum of all of them.
+        """
+        if self._max_concurrency <= 1 or len(submissions) <= 1:
+            for s in submissions:
+                self._expand_submission_comments(s, comment_sort, replace_more_limit, priority)
+            return
+
+        pool = _expansion_pool(self._max_concurrency)
+        futures = [
+            pool.submit(
+                self._expand_submission_comments, s, comment_sort, replace_more_limit, priority
+            )
+            for s in submissions
+        ]
+        for future in futures:
+            future.result()
+
+    def _expand_submission_comments(
+        self,
+        s: praw.models.Submission,
+        comment_sort: Optional[str],
+        replace_more_limit: Optional[int],
+        priority: Priority,
+    ) -> None:
+        def _fetch() -> Optional[int]:
+            # The first access to ``comments`` fetches the forest (one request),
+            # so the sort and the client are set before it.
+            self._bind(s)
+            if comment_sort:
+                s.comment_sort = comment_sort
+            forest = getattr(s, "comments", None)
+            return None if forest is None else _pending_more(forest)
+
+        def _expand() -> int:
+            # Expand MoreComments according to requested strategy. Consumers
+            # flatten the forest themselves (once) when they map it.
+            s.comments.replace_more(limit=replace_more_limit)
+            flatten = getattr(s.comments, "list", None)
+            return len(flatten()) if callable(flatten) else 0
+
+        try:
+            with track_stage("replace_more") as stage:
+                pending = self._call(_fetch, priority=priority)
+                if pending is None:
+                    return
+                # Each MoreComments replacement is one request. Those uncovered by
+                # the expansion itself are not known up front; the quota resync
+                # from the response headers accounts for them.
+                if replace_more_limit is not None:
+                    pending = min(pending, max(0, replace_more_limit))
+                expanded = self._call(_expand, priority=priority, cost=pending)
+                stage.add(expanded)
+            REDDIT_COMMENTS_EXPANDED_TOTAL.inc(expanded)
+        except Exception as exc:
+            # Retries are exhausted or the error is not transient: keep the
+            # submission, but make the incomplete comment tree visible.
+            record_swallowed("replace_more", exc)
+            logger.warning(
+                "Failed to expand comments for submission %s",
+                getattr(s, "id", None),
+                exc_info=True,
+            )
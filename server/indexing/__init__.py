@@ -1,4 +1,25 @@
-from .reddit_index_utils import RedditIndexUtils
-from .reddit_query_index import RedditQueryIndex
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .reddit_index_utils import RedditIndexUtils
+    from .reddit_query_index import RedditQueryIndex
+
+_EXPORTS = {
+    "RedditQueryIndex": ".reddit_query_index",
+    "RedditIndexUtils": ".reddit_index_utils",
+}
 
 __all__ = ["RedditQueryIndex", "RedditIndexUtils"]
+
+
+def __getattr__(name: str) -> Any:
+    # PEP 562: submodules are imported on first access, so importing the
+    # package (or a light submodule of it) does not pull in llama_index,
+    # qdrant_client, meilisearch and praw.
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,107 @@
+"""Token-aware chunking of posts and comments before embedding (FR-11).
+
+Embedding models silently truncate their input (512 tokens for the BGE family),
+so the tail of a long post was never embedded. ``TextChunker`` splits node
+texts at paragraph, then sentence boundaries with LlamaIndex's
+``SentenceSplitter`` so that every chunk plus its embedded metadata fits the
+model's limit (``CHUNK_MAX_TOKENS`` capped by the model's own maximum), with
+``CHUNK_OVERLAP_TOKENS`` of overlap. Token counts use the embedding model's
+own tokenizer when it exposes one.
+
+Texts that fit are left untouched. Longer ones become chunk nodes carrying
+``parent_doc_id``, ``chunk_index`` and ``chunk_count``. Every chunk keeps the
+parent's Reddit id as its ``doc_id``, so retrieval can group the chunks back
+into one hit.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Callable, List, Optional
+
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import MetadataMode, NodeRelationship, RelatedNodeInfo, TextNode
+from llama_index.core.utils import get_tokenizer
+
+from ..config import settings
+from .reddit_index_utils import RedditIndexUtils
+
+logger = logging.getLogger(__name__)
+
+# Room for special tokens ([CLS]/[SEP]) and instruction prefixes added by the model.
+_SPECIAL_TOKENS_MARGIN = 8
+CHUNK_METADATA_KEYS = ("parent_doc_id", "chunk_index", "chunk_count")
+
+
+def model_tokenizer(embed_model: Any) -> Optional[Callable[[str], List[Any]]]:
+    """Tokenizer of a HuggingFace/SentenceTransformers embedding model, if any."""
+    tokenizer = getattr(getattr(embed_model, "_model", None), "tokenizer", None)
+    if tokenizer is None:
+        return None
+    return lambda text: tokenizer.encode(text, add_special_tokens=False)
+
+
+class TextChunker:
+    def __init__(
+        self,
+        max_tokens: Optional[int] = None,
+        overlap_tokens: Optional[int] = None,
+        tokenizer: Optional[Callable[[str], List[Any]]] = None,
+    ) -> None:
+        self.max_tokens = max_tokens or settings.chunk_max_tokens
+        overlap = settings.chunk_overlap_tokens if overlap_tokens is None else overlap_tokens
+        self.overlap_tokens = min(overlap, self.max_tokens // 2)
+        self._splitter = SentenceSplitter(
+            chunk_size=self.max_tokens,
+            chunk_overlap=self.overlap_tokens,
+            tokenizer=tokenizer or get_tokenizer(),
+            # Reddit markdown separates paragraphs with a blank line.
+            paragraph_separator="\n\n",
+        )
+
+    @classmethod
+    def for_embed_model(cls, embed_model: Any) -> "TextChunker":
+        """Chunker sized for ``embed_model`` (its max sequence length and tokenizer)."""
+        max_tokens = settings.chunk_max_tokens
+        model_max = getattr(embed_model, "max_length", None)
+        if isinstance(model_max, int) and model_max > _SPECIAL_TOKENS_MARGIN:
+            max_tokens = min(max_tokens, model_max - _SPECIAL_TOKENS_MARGIN)
+        return cls(max_tokens=max_tokens, tokenizer=model_tokenizer(embed_model))
+
+    def split(self, text: str, metadata_str: str = "") -> List[str]:
+        if not text.strip():
+            return [text]
+        try:
+            return self._splitter.split_text_metadata_aware(text, metadata_str)
+        except ValueError:
+            # Metadata alone exceeds the budget (e.g. a huge title): split the body only.
+            return self._splitter.split_text(text)
+
+    def chunk_nodes(self, nodes: List[TextNode]) -> List[TextNode]:
+        """Replace every node that is too long for the model by its chunks."""
+        out: List[TextNode] = []
+        for node in nodes:
+            splits = self.split(node.text or "", node.get_metadata_str(MetadataMode.EMBED))
+            if len(splits) <= 1:
+                out.append(node)
+                continue
+            out.extend(self._children(node, splits))
+        return out
+
+    @staticmethod
+    def _children(node: TextNode, splits: List[str]) -> List[TextNode]:
+        parent_id = node.metadata.get("doc_id") or node.ref_doc_id or node.node_id
+        excluded = list(node.excluded_embed_metadata_keys) + list(CHUNK_METADATA_KEYS)
+        children: List[TextNode] = []
+        for i, text in enumerate(splits):
+            metadata = dict(node.metadata)
+            metadata.update(parent_doc_id=parent_id, chunk_index=i, chunk_count=len(splits))
+            child = TextNode(
+                text=text,
+                id_=RedditIndexUtils.point_id(f"{parent_id}#{i}"),
+                metadata=metadata,
+                excluded_embed_metadata_keys=excluded,
+            )
+            child.relationships[NodeRelationship.SOURCE] = RelatedNodeInfo(node_id=parent_id)
+            children.append(child)
+        return children
@@ -0,0 +1,247 @@
+"""Qdrant collection layout: creation, quantization, storage and migration.
+
+The indexer creates its collection explicitly (instead of leaving it to
+``QdrantVectorStore`` defaults) from these settings:
+
+- ``QDRANT_QUANTIZATION``: ``none``, ``scalar`` (int8, ~4x smaller vectors) or
+  ``binary`` (1 bit per dimension, ~32x smaller; best with larger models).
+  Quantized vectors stay in RAM (``QDRANT_QUANTIZATION_ALWAYS_RAM``) while the
+  originals can go to disk; searches oversample the quantized index and rescore
+  the candidates with the original vectors (``QDRANT_QUANTIZATION_RESCORE``,
+  ``QDRANT_QUANTIZATION_OVERSAMPLING``).
+- ``QDRANT_ON_DISK_VECTORS`` / ``QDRANT_ON_DISK_PAYLOAD``: memory-map the
+  original vectors / payloads instead of holding them in RAM.
+- ``QDRANT_HNSW_M`` / ``QDRANT_HNSW_EF_CONSTRUCT``: graph degree and build-time
+  beam width; ``QDRANT_HNSW_EF`` sets the search-time beam (0 = Qdrant default).
+
+These only apply when a collection is created. ``migrate_collection`` rebuilds
+an existing collection under the current settings by copying its points,
+vectors included, so nothing is re-embedded; an alias then switches readers
+and writers over. Run it with the indexing workers stopped::
+
+    python -m server.indexing.collection migrate reddit_mcp_posts_v1 reddit_mcp_posts_v2 \\
+        --alias reddit_mcp_posts
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from qdrant_client.http import models as qmodels
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Payload indexes backing the search filters. PRAW timestamps are floats, so
+# ``created_utc`` ranges use a float index; ``created_at`` carries the same
+# instant as RFC 3339 for datetime filters. ``doc_id`` is the index
+# ``QdrantVectorStore`` creates for its own collections.
+PAYLOAD_INDEXES = (
+    ("doc_id", "keyword"),
+    ("subreddit_lc", "keyword"),
+    ("kind", "keyword"),
+    ("author_lc", "keyword"),
+    ("submission_id", "keyword"),
+    ("created_utc", "float"),
+    ("created_at", "datetime"),
+)
+
+QUANTIZATION_MODES = ("none", "scalar", "binary")
+
+
+def quantization_config() -> Optional[Any]:
+    mode = settings.qdrant_quantization.lower()
+    if mode not in QUANTIZATION_MODES:
+        raise ValueError(f"QDRANT_QUANTIZATION must be one of {QUANTIZATION_MODES}, not {mode!r}")
+    always_ram = settings.qdrant_quantization_always_ram
+    if mode == "scalar":
+        return qmodels.ScalarQuantization(
+            scalar=qmodels.ScalarQuantizationConfig(
+                type=qmodels.ScalarType.INT8, quantile=0.99, always_ram=always_ram
+            )
+        )
+    if mode == "binary":
+        return qmodels.BinaryQuantization(
+            binary=qmodels.BinaryQuantizationConfig(always_ram=always_ram)
+        )
+    return None
+
+
+def collection_config(vector_size: int, distance: Any = qmodels.Distance.COSINE) -> Dict[str, Any]:
+    """``create_collection`` keyword arguments for the configured layout."""
+    return {
+        # Unnamed dense vector, as ``QdrantVectorStore`` expects without hybrid mode.
+        "vectors_config": qmodels.VectorParams(
+            size=vector_size, distance=distance, on_disk=settings.qdrant_on_disk_vectors
+        ),
+        "hnsw_config": qmodels.HnswConfigDiff(
+            m=settings.qdrant_hnsw_m, ef_construct=settings.qdrant_hnsw_ef_construct
+        ),
+        "quantization_config": quantization_config(),
+        "on_disk_payload": settings.qdrant_on_disk_payload,
+    }
+
+
+def search_params() -> Optional[qmodels.SearchParams]:
+    """Query-time parameters matching the layout (rescoring, HNSW ``ef``)."""
+    quantization = None
+    if settings.qdrant_quantization.lower() != "none":
+        quantization = qmodels.QuantizationSearchParams(
+            rescore=settings.qdrant_quantization_rescore,
+            oversampling=settings.qdrant_quantization_oversampling,
+        )
+    hnsw_ef = settings.qdrant_hnsw_ef or None
+    if quantization is None and hnsw_ef is None:
+        return None
+    return qmodels.SearchParams(hnsw_ef=hnsw_ef, quantization=quantization)
+
+
+def collection_exists(client: Any, name: str) -> bool:
+    """Whether ``name`` is a collection or an alias of one."""
+    return client.collection_exists(name) or _is_alias(client, name)
+
+
+def ensure_payload_indexes(client: Any, name: str) -> None:
+    existing = client.get_collection(name).payload_schema or {}
+    for field_name, schema in PAYLOAD_INDEXES:
+        if field_name not in existing:
+            client.create_payload_index(
+                collection_name=name,
+                field_name=field_name,
+                field_schema=qmodels.PayloadSchemaType(schema),
+            )
+
+
+def ensure_collection(client: Any, name: str, vector_size: int) -> bool:
+    """Create ``name`` with the configured layout if missing; returns whether it was created.
+
+    Payload indexes missing from an existing collection are added either way.
+    """
+    created = False
+    if not collection_exists(client, name):
+        client.create_collection(collection_name=name, **collection_config(vector_size))
+        logger.info(
+            "Created Qdrant collection %s (dim=%d, quantization=%s, on-disk vectors=%s)",
+            name,
+            vector_size,
+            settings.qdrant_quantization,
+            settings.qdrant_on_disk_vectors,
+        )
+        created = True
+    ensure_payload_indexes(client, name)
+    return created
+
+
+def migrate_collection(
+    client: Any,
+    source: str,
+    target: str,
+    *,
+    alias: Optional[str] = None,
+    drop_source: bool = False,
+    batch_size: int = 256,
+) -> int:
+    """Copy ``source`` into a new ``target`` built with the current settings.
+
+    Points keep their ids, vectors and payloads. When ``alias`` is given it is
+    pointed at ``target`` in one atomic alias update. An alias cannot share its
+    name with a collection, so taking over the name of a real ``source``
+    collection needs ``drop_source=True``: the source is then deleted before the
+    alias is created. Returns the number of points copied.
+    """
+    if collection_exists(client, target):
+        raise ValueError(f"target collection {target!r} already exists")
+    if alias is not None and client.collection_exists(alias) and not _is_alias(client, alias):
+        if alias != source or not drop_source:
+            raise ValueError(f"{alias!r} is a collection; pass drop_source=True to replace it")
+
+    params = client.get_collection(source).config.params.vectors
+    client.create_collection(
+        collection_name=target, **collection_config(params.size, params.distance)
+    )
+    ensure_payload_indexes(client, target)
+
+    copied, offset = 0, None
+    while True:
+        points, offset = client.scroll(
+            source, limit=batch_size, offset=offset, with_payload=True, with_vectors=True
+        )
+        if points:
+            client.upsert(
+                collection_name=target,
+                points=[
+                    qmodels.PointStruct(id=p.id, vector=p.vector, payload=p.payload or {})
+                    for p in points
+                ],
+                wait=True,
+            )
+            copied += len(points)
+        if offset is None:
+            break
+    expected = client.count(source, exact=True).count
+    if copied != expected:
+        raise RuntimeError(f"copied {copied} points but {source!r} holds {expected}")
+    logger.info("Copied %d points from %s to %s", copied, source, target)
+
+    if alias is not None:
+        actions: List[Any] = []
+        if _is_alias(client, alias):
+            actions.append(
+                qmodels.DeleteAliasOperation(delete_alias=qmodels.DeleteAlias(alias_name=alias))
+            )
+        elif drop_source and alias == source:
+            client.delete_collection(source)
+        actions.append(
+            qmodels.CreateAliasOperation(
+                create_alias=qmodels.CreateAlias(collection_name=target, alias_name=alias)
+            )
+        )
+        client.update_collection_aliases(change_aliases_operations=actions)
+        logger.info("Alias %s now points at %s", alias, target)
+    return copied
+
+
+def _is_alias(client: Any, name: str) -> bool:
+    return any(a.alias_name == name for a in client.get_aliases().aliases)
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Manage the Reddit Qdrant collection.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate = commands.add_parser(
+        "migrate", help="rebuild a collection with the current settings, without re-embedding"
+    )
+    migrate.add_argument("source")
+    migrate.add_argument("target")
+    migrate.add_argument("--alias", help="point this alias at the target when done")
+    migrate.add_argument(
+        "--drop-source",
+        action="store_true",
+        help="delete the source collection so the alias can take over its name",
+    )
+    migrate.add_argument("--batch-size", type=int, default=256)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    import qdrant_client
+
+    args = parse_args(argv)
+    logging.basicConfig(level=settings.log_level)
+    client = qdrant_client.QdrantClient(url=settings.qdrant_url)
+    copied = migrate_collection(
+        client,
+        args.source,
+        args.target,
+        alias=args.alias,
+        drop_source=args.drop_source,
+        batch_size=args.batch_size,
+    )
+    print(f"migrated {copied} points from {args.source} to {args.target}")
+
+
+if __name__ == "__main__":
+    main()
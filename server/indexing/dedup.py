@@ -0,0 +1,471 @@
+"""Deduplication of posts and comments before embedding (FR-12).
+
+Crossposts, reposts and copy-pasted comments would otherwise each be embedded
+and stored as their own point. ``Deduplicator`` sits between record extraction
+and the embedder and skips embedding, per node:
+
+- exact duplicates, by a hash of the normalised body, kind and post title;
+- near duplicates, by 64-bit SimHash signatures of the body whose similarity
+  ``1 - hamming / 64`` reaches ``DEDUP_SIMILARITY_THRESHOLD``, among nodes with
+  the same kind and title. Candidates are found with LSH banding: with at
+  most ``d`` differing bits, splitting the signature into ``d + 1`` bands
+  guarantees that a true match shares one band exactly, so only same-bucket
+  signatures are compared.
+
+The subreddit is not part of the match, so crossposts are merged. The title
+is: two posts with the same boilerplate body but different titles are both
+kept, which also means a repost under a new title is not detected. Bodies
+shorter than ``MIN_DEDUP_TOKENS`` words ("[deleted]", "Thanks!") are never
+deduplicated, and bodies shorter than ``MIN_NEAR_DUP_TOKENS`` are only matched
+exactly because SimHash is unreliable on them.
+
+The first node seen becomes the canonical one and collects the Reddit ids of
+the nodes merged into it (``duplicate_ids``). Signatures are kept in a
+``SignatureStore`` (Redis by default), so duplicates are also caught across
+upserts. Buckets keep at most ``MAX_BAND_MEMBERS`` signatures and Redis keys
+expire ``DEDUP_TTL_DAYS`` after their last write, so lookups stay bounded as
+the collection grows. When a canonical node is edited or deleted its old
+signature is replaced, and nodes merged into it are indexed on their next
+refresh. Only the vector write is skipped: the lexical index keeps every
+document.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import re
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from llama_index.core.schema import TextNode
+
+from ..config import settings
+from ..metrics import record_swallowed
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_BITS = 64
+# Bodies with fewer words are never deduplicated.
+MIN_DEDUP_TOKENS = 5
+# Bodies with fewer words are only deduplicated exactly.
+MIN_NEAR_DUP_TOKENS = 8
+SHINGLE_SIZE = 3
+# Signatures kept per LSH bucket; the most recently written win.
+MAX_BAND_MEMBERS = 64
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold and keep only word characters, so formatting changes do not matter."""
+    return " ".join(_WORD_RE.findall(text.casefold()))
+
+
+def exact_hash(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+
+
+def simhash(tokens: Sequence[str]) -> int:
+    """64-bit SimHash over word shingles (or single words for short texts)."""
+    if len(tokens) >= SHINGLE_SIZE:
+        features = [
+            " ".join(tokens[i : i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)
+        ]
+    else:
+        features = list(tokens)
+    if not features:
+        return 0
+    digests = b"".join(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest() for f in features)
+    bits = np.unpackbits(
+        np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1, bitorder="little"
+    )
+    # Each feature votes +1/-1 per bit; the signature keeps the sign of the sum.
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(features)
+    packed = np.packbits(votes > 0, bitorder="little")
+    return int.from_bytes(packed.tobytes(), "little")
+
+
+def similarity(a: int, b: int) -> float:
+    return 1.0 - (a ^ b).bit_count() / SIGNATURE_BITS
+
+
+def max_distance(threshold: float) -> int:
+    return max(0, min(SIGNATURE_BITS - 1, int((1.0 - threshold) * SIGNATURE_BITS)))
+
+
+def band_keys(signature: int, bands: int) -> List[str]:
+    """LSH bucket keys: the signature split into ``bands`` contiguous bit ranges."""
+    keys: List[str] = []
+    for i in range(bands):
+        lo = i * SIGNATURE_BITS // bands
+        hi = (i + 1) * SIGNATURE_BITS // bands
+        value = (signature >> lo) & ((1 << (hi - lo)) - 1)
+        keys.append(f"{i}:{value:x}")
+    return keys
+
+
+@dataclass
+class Signature:
+    reddit_id: str
+    exact: str
+    simhash: Optional[int]  # None for texts too short for near-dup matching
+    bands: List[str] = field(default_factory=list)
+
+
+class SignatureStore(ABC):
+    """Base class: persisted signatures and provenance of canonical nodes.
+
+    Each canonical id has one current signature. Saving a new signature for it
+    (the post was edited) or retiring it (deleted, or now too short) removes the
+    old exact hash and band entries and forgets its duplicates, so nodes merged
+    into the old text are indexed on their next refresh.
+    """
+
+    @abstractmethod
+    def lookup(
+        self, exact: Iterable[str], bands: Iterable[str]
+    ) -> Tuple[Dict[str, str], Dict[str, List[Tuple[str, int]]]]:
+        """Return ``{exact hash: id}`` and ``{band key: [(id, simhash)]}`` for known keys."""
+
+    @abstractmethod
+    def save(
+        self,
+        signatures: List[Signature],
+        duplicates: Dict[str, List[str]],
+        retired: Iterable[str] = (),
+    ) -> None:
+        """Persist canonical signatures and ``{canonical id: [duplicate ids]}``.
+
+        ``retired`` ids no longer have a signature; their old one is dropped.
+        """
+
+    @abstractmethod
+    def duplicates_of(self, reddit_id: str) -> List[str]: ...
+
+
+class MemorySignatureStore(SignatureStore):
+    def __init__(self, max_band_members: int = MAX_BAND_MEMBERS) -> None:
+        self._max_band_members = max_band_members
+        self._exact: Dict[str, str] = {}
+        # Insertion-ordered, so the oldest members are evicted first.
+        self._bands: Dict[str, Dict[str, int]] = {}
+        self._signatures: Dict[str, Signature] = {}
+        self._duplicates: Dict[str, Set[str]] = {}
+
+    def lookup(
+        self, exact: Iterable[str], bands: Iterable[str]
+    ) -> Tuple[Dict[str, str], Dict[str, List[Tuple[str, int]]]]:
+        found_exact = {h: self._exact[h] for h in exact if h in self._exact}
+        found_bands = {b: list(self._bands[b].items()) for b in bands if self._bands.get(b)}
+        return found_exact, found_bands
+
+    def save(
+        self,
+        signatures: List[Signature],
+        duplicates: Dict[str, List[str]],
+        retired: Iterable[str] = (),
+    ) -> None:
+        for rid in retired:
+            self._forget(rid)
+        for sig in signatures:
+            if self._signatures.get(sig.reddit_id) != sig:
+                self._forget(sig.reddit_id)
+            self._signatures[sig.reddit_id] = sig
+            self._exact.setdefault(sig.exact, sig.reddit_id)
+            for band in sig.bands:
+                members = self._bands.setdefault(band, {})
+                members.pop(sig.reddit_id, None)
+                members[sig.reddit_id] = sig.simhash
+                while len(members) > self._max_band_members:
+                    del members[next(iter(members))]
+        for canonical, ids in duplicates.items():
+            self._duplicates.setdefault(canonical, set()).update(ids)
+
+    def duplicates_of(self, reddit_id: str) -> List[str]:
+        return sorted(self._duplicates.get(reddit_id, ()))
+
+    def _forget(self, rid: str) -> None:
+        old = self._signatures.pop(rid, None)
+        if old is None:
+            return
+        if self._exact.get(old.exact) == rid:
+            del self._exact[old.exact]
+        for band in old.bands:
+            self._bands.get(band, {}).pop(rid, None)
+        self._duplicates.pop(rid, None)
+
+
+# Deletes KEYS[1] only while it still holds ARGV[1].
+_DELETE_IF_EQUAL = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class RedisSignatureStore(SignatureStore):
+    """Signatures in Redis; every key expires ``ttl_seconds`` after its last write.
+
+    Layout under ``reddit_mcp:dedup:v2:<collection>:``: ``exact:<hash>`` (canonical
+    id), ``band:<key>`` (sorted set of ``<id>:<simhash>`` scored by write time,
+    capped at ``max_band_members``), ``sig:<id>`` (current signature of a
+    canonical id) and ``dups:<id>`` (its duplicate ids).
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        redis_url: str,
+        *,
+        ttl_seconds: Optional[int] = None,
+        max_band_members: int = MAX_BAND_MEMBERS,
+    ) -> None:
+        import redis
+
+        self._client = redis.Redis.from_url(redis_url, socket_connect_timeout=1.0)
+        # v2: bands are capped sorted sets now; the former hashes are not read.
+        self._prefix = f"reddit_mcp:dedup:v2:{collection_name}:"
+        self._ttl = ttl_seconds
+        self._max_band_members = max_band_members
+        self._delete_if_equal = self._client.register_script(_DELETE_IF_EQUAL)
+
+    def lookup(
+        self, exact: Iterable[str], bands: Iterable[str]
+    ) -> Tuple[Dict[str, str], Dict[str, List[Tuple[str, int]]]]:
+        exact = list(exact)
+        bands = list(bands)
+        pipe = self._client.pipeline(transaction=False)
+        if exact:
+            pipe.mget([self._prefix + "exact:" + h for h in exact])
+        for band in bands:
+            pipe.zrange(self._prefix + "band:" + band, 0, -1)
+        replies = pipe.execute()
+        found_exact: Dict[str, str] = {}
+        if exact:
+            for h, rid in zip(exact, replies.pop(0), strict=True):
+                if rid is not None:
+                    found_exact[h] = rid.decode()
+        found_bands: Dict[str, List[Tuple[str, int]]] = {}
+        for band, members in zip(bands, replies, strict=True):
+            if members:
+                found_bands[band] = [_split_member(m.decode()) for m in members]
+        return found_exact, found_bands
+
+    def save(
+        self,
+        signatures: List[Signature],
+        duplicates: Dict[str, List[str]],
+        retired: Iterable[str] = (),
+    ) -> None:
+        retired = list(retired)
+        rids = [sig.reddit_id for sig in signatures] + retired
+        pipe = self._client.pipeline(transaction=False)
+        for rid in rids:
+            pipe.hgetall(self._prefix + "sig:" + rid)
+        previous = dict(zip(rids, pipe.execute(), strict=True))
+
+        now = time.time()
+        pipe = self._client.pipeline(transaction=False)
+        for rid in retired:
+            self._forget(pipe, rid, previous[rid])
+        for sig in signatures:
+            old = previous[sig.reddit_id]
+            if old and old.get(b"exact", b"").decode() != sig.exact:
+                self._forget(pipe, sig.reddit_id, old)
+            exact_key = self._prefix + "exact:" + sig.exact
+            pipe.set(exact_key, sig.reddit_id, nx=True)
+            self._expire(pipe, exact_key)
+            sig_key = self._prefix + "sig:" + sig.reddit_id
+            pipe.hset(
+                sig_key,
+                mapping={
+                    "exact": sig.exact,
+                    "simhash": "" if sig.simhash is None else str(sig.simhash),
+                    "bands": json.dumps(sig.bands),
+                },
+            )
+            self._expire(pipe, sig_key)
+            for band in sig.bands:
+                key = self._prefix + "band:" + band
+                pipe.zadd(key, {f"{sig.reddit_id}:{sig.simhash}": now})
+                pipe.zremrangebyrank(key, 0, -self._max_band_members - 1)
+                self._expire(pipe, key)
+        for canonical, ids in duplicates.items():
+            key = self._prefix + "dups:" + canonical
+            pipe.sadd(key, *ids)
+            self._expire(pipe, key)
+        pipe.execute()
+
+    def duplicates_of(self, reddit_id: str) -> List[str]:
+        return sorted(m.decode() for m in self._client.smembers(self._prefix + "dups:" + reddit_id))
+
+    def _forget(self, pipe: Any, rid: str, old: Dict[bytes, bytes]) -> None:
+        if not old:
+            return
+        exact = old.get(b"exact", b"").decode()
+        self._delete_if_equal(keys=[self._prefix + "exact:" + exact], args=[rid], client=pipe)
+        member = f"{rid}:{old.get(b'simhash', b'').decode()}"
+        for band in json.loads(old.get(b"bands", b"[]")):
+            pipe.zrem(self._prefix + "band:" + band, member)
+        pipe.delete(self._prefix + "sig:" + rid, self._prefix + "dups:" + rid)
+
+    def _expire(self, pipe: Any, key: str) -> None:
+        if self._ttl:
+            pipe.expire(key, self._ttl)
+
+
+def _split_member(member: str) -> Tuple[str, int]:
+    rid, _, sig = member.rpartition(":")
+    return rid, int(sig)
+
+
+@dataclass
+class DedupResult:
+    nodes: List[TextNode]
+    # Reddit ids of dropped nodes, mapped to the id of their canonical node.
+    dropped: Dict[str, str]
+    # Canonical nodes indexed by an earlier upsert that gained duplicates now.
+    merged_into_existing: Dict[str, List[str]]
+
+
+def _reddit_id(node: TextNode) -> Optional[str]:
+    return node.metadata.get("doc_id") or node.ref_doc_id
+
+
+class Deduplicator:
+    def __init__(
+        self,
+        store: Optional[SignatureStore] = None,
+        *,
+        threshold: Optional[float] = None,
+    ) -> None:
+        self._store = store or MemorySignatureStore()
+        threshold = settings.dedup_similarity_threshold if threshold is None else threshold
+        self._max_distance = max_distance(threshold)
+        self._bands = self._max_distance + 1
+
+    def _signature(self, reddit_id: str, node: TextNode) -> Optional[Signature]:
+        tokens = normalize_text(node.text or "").split()
+        if len(tokens) < MIN_DEDUP_TOKENS:
+            return None
+        # Nodes only match with the same kind and post title; the subreddit is
+        # left out so crossposts are caught.
+        meta = node.metadata
+        scope = exact_hash(normalize_text(f"{meta.get('kind') or ''} {meta.get('title') or ''}"))
+        sig = Signature(reddit_id, exact_hash(scope + " " + " ".join(tokens)), None)
+        if len(tokens) >= MIN_NEAR_DUP_TOKENS:
+            sig.simhash = simhash(tokens)
+            sig.bands = [f"{scope[:16]}:{key}" for key in band_keys(sig.simhash, self._bands)]
+        return sig
+
+    def filter(self, nodes: List[TextNode]) -> DedupResult:
+        """Drop duplicate nodes; canonical nodes get a ``duplicate_ids`` metadata list."""
+        signatures: List[Optional[Signature]] = []
+        for node in nodes:
+            rid = _reddit_id(node)
+            signatures.append(self._signature(rid, node) if rid else None)
+
+        live = [s for s in signatures if s is not None]
+        # Ids that may have had a signature but no longer do (deleted, emptied).
+        retired = [
+            rid
+            for node, sig in zip(nodes, signatures, strict=True)
+            if sig is None and (rid := _reddit_id(node))
+        ]
+        try:
+            known_exact, known_bands = self._store.lookup(
+                {s.exact for s in live}, {b for s in live for b in s.bands}
+            )
+        except Exception as exc:
+            record_swallowed("dedup", exc)
+            logger.warning("Dedup signature lookup failed; deduplicating in batch", exc_info=True)
+            known_exact, known_bands = {}, {}
+
+        batch_exact: Dict[str, str] = {}
+        batch_bands: Dict[str, List[Tuple[str, int]]] = {}
+        kept: List[TextNode] = []
+        kept_by_id: Dict[str, TextNode] = {}
+        dropped: Dict[str, str] = {}
+        new_signatures: List[Signature] = []
+        duplicates: Dict[str, List[str]] = {}
+
+        for node, sig in zip(nodes, signatures, strict=True):
+            canonical = self._match(sig, batch_exact, batch_bands, known_exact, known_bands)
+            if canonical is None or sig is None:
+                kept.append(node)
+                if sig is not None:
+                    kept_by_id[sig.reddit_id] = node
+                    new_signatures.append(sig)
+                    batch_exact.setdefault(sig.exact, sig.reddit_id)
+                    for band in sig.bands:
+                        batch_bands.setdefault(band, []).append((sig.reddit_id, sig.simhash))
+                continue
+            dropped[sig.reddit_id] = canonical
+            duplicates.setdefault(canonical, []).append(sig.reddit_id)
+
+        merged_into_existing: Dict[str, List[str]] = {}
+        try:
+            self._store.save(new_signatures, duplicates, retired)
+            for canonical in duplicates:
+                ids = self._store.duplicates_of(canonical)
+                if canonical in kept_by_id:
+                    _set_duplicate_ids(kept_by_id[canonical], ids)
+                else:
+                    merged_into_existing[canonical] = ids
+        except Exception as exc:
+            record_swallowed("dedup", exc)
+            logger.warning("Dedup signature write failed", exc_info=True)
+            for canonical, ids in duplicates.items():
+                if canonical in kept_by_id:
+                    _set_duplicate_ids(kept_by_id[canonical], ids)
+
+        if dropped:
+            logger.info("Dedup dropped %d of %d nodes", len(dropped), len(nodes))
+        return DedupResult(kept, dropped, merged_into_existing)
+
+    def _match(
+        self,
+        sig: Optional[Signature],
+        batch_exact: Dict[str, str],
+        batch_bands: Dict[str, List[Tuple[str, int]]],
+        known_exact: Dict[str, str],
+        known_bands: Dict[str, List[Tuple[str, int]]],
+    ) -> Optional[str]:
+        """Id of the canonical node ``sig`` duplicates, or None if it is new."""
+        if sig is None:
+            return None
+        for table in (batch_exact, known_exact):
+            canonical = table.get(sig.exact)
+            if canonical is not None:
+                # Re-indexing the canonical node itself is an update, not a duplicate.
+                return None if canonical == sig.reddit_id else canonical
+        if sig.simhash is None:
+            return None
+        best: Optional[Tuple[int, str]] = None
+        for table in (batch_bands, known_bands):
+            for band in sig.bands:
+                for rid, other in table.get(band, ()):
+                    distance = (sig.simhash ^ other).bit_count()
+                    if distance <= self._max_distance and (best is None or distance < best[0]):
+                        best = (distance, rid)
+        if best is None or best[1] == sig.reddit_id:
+            return None
+        return best[1]
+
+
+def _set_duplicate_ids(node: TextNode, ids: List[str]) -> None:
+    node.metadata["duplicate_ids"] = ids
+    if "duplicate_ids" not in node.excluded_embed_metadata_keys:
+        # Provenance must not change the embedded text (and its cache key).
+        node.excluded_embed_metadata_keys.append("duplicate_ids")
+
+
+def build_deduplicator(collection_name: str) -> Deduplicator:
+    ttl = int(settings.dedup_ttl_days * 86400) if settings.dedup_ttl_days > 0 else None
+    return Deduplicator(RedisSignatureStore(collection_name, settings.redis_url, ttl_seconds=ttl))
@@ -0,0 +1,172 @@
+"""Multi-process embedding executor.
+
+Local embedding models (``local:BAAI/bge-small-en-v1.5``) run in the calling
+interpreter and keep one core busy. ``EmbeddingPool`` shards a list of texts
+into batches of ``EMBED_BATCH_SIZE`` and embeds them in ``EMBED_WORKERS``
+processes, each with ``EMBED_THREADS_PER_WORKER`` torch threads so the pool
+does not oversubscribe the machine.
+
+With the default ``fork`` start method the parent loads the model once and the
+workers inherit it: the weight tensors are shared copy-on-write, and
+``gc.freeze()`` before forking keeps the garbage collector from touching (and
+so copying) the pages of every inherited object. All workers are started when
+the pool is built. Forking a process that has already run torch inference (and
+so started its thread pools) is unsafe, so the shared pool is only ever created
+by :func:`start_shared_pool`, which the indexing worker calls at startup before
+any embedding; :func:`shared_pool` merely looks it up. The API process never
+starts one and embeds in-process. With ``spawn``/``forkserver`` each worker
+loads its own copy from the model alias instead.
+
+Vectors come back as float32 arrays (one pickle buffer per batch rather than a
+list of Python floats).
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..config import settings
+from ..metrics import record_swallowed
+
+logger = logging.getLogger(__name__)
+
+# The model of the worker process, set by ``_init_worker``.
+_worker_model: Any = None
+
+
+def _init_worker(model: Any, threads: int) -> None:
+    global _worker_model
+    os.environ["OMP_NUM_THREADS"] = str(threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "false"
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    if isinstance(model, str):
+        from .registry import resolve_embed_model
+
+        model = resolve_embed_model(model)
+    _worker_model = model
+
+
+def _embed_batch(texts: Sequence[str]) -> np.ndarray:
+    return np.asarray(_worker_model.get_text_embedding_batch(list(texts)), dtype=np.float32)
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class EmbeddingPool:
+    """Embed text batches in a pool of processes holding one model copy each.
+
+    ``spec`` is the model alias; it is only needed for the ``spawn`` and
+    ``forkserver`` start methods, where workers cannot inherit ``model``.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        *,
+        spec: Optional[str] = None,
+        workers: int = 2,
+        batch_size: int = 64,
+        threads_per_worker: int = 1,
+        start_method: str = "fork",
+    ) -> None:
+        if start_method != "fork" and spec is None:
+            raise ValueError(f"start method {start_method!r} needs the model alias (spec)")
+        self._batch_size = max(1, batch_size)
+        self._workers = max(1, workers)
+        context = multiprocessing.get_context(start_method)
+        if start_method == "fork":
+            initargs: tuple = (model, threads_per_worker)
+            gc.collect()
+            gc.freeze()
+        else:
+            initargs = (spec, threads_per_worker)
+        try:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=initargs,
+            )
+            # Start the workers now (a forked pool starts all of them on first use).
+            self._executor.submit(_ping).result()
+        finally:
+            if start_method == "fork":
+                gc.unfreeze()
+        logger.info(
+            "Embedding pool started: %d %s workers x %d threads, batches of %d",
+            self._workers,
+            start_method,
+            threads_per_worker,
+            self._batch_size,
+        )
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed ``texts`` across the pool; vectors are returned in input order."""
+        if not texts:
+            return []
+        batches = [
+            list(texts[i : i + self._batch_size]) for i in range(0, len(texts), self._batch_size)
+        ]
+        vectors: List[List[float]] = []
+        for batch in self._executor.map(_embed_batch, batches):
+            vectors.extend(batch.tolist())
+        return vectors
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Keyed by model identity; ``None`` records a pool that failed to start.
+_pools: Dict[int, Optional[EmbeddingPool]] = {}
+_pools_lock = threading.Lock()
+
+
+def shared_pool(model: Any) -> Optional[EmbeddingPool]:
+    """The pool started for ``model`` by :func:`start_shared_pool`, else ``None``."""
+    return _pools.get(id(model))
+
+
+def start_shared_pool(model: Any, spec: Optional[str] = None) -> Optional[EmbeddingPool]:
+    """Start the process-wide pool for ``model`` per ``EMBED_WORKERS``; ``None`` when disabled.
+
+    Call it before the process runs any inference of its own. ``EMBED_WORKERS=0``
+    (the default) embeds in the calling process. A pool that fails to start is
+    logged and the caller falls back to in-process embedding.
+    """
+    if settings.embed_workers <= 0:
+        return None
+    key = id(model)
+    if key in _pools:
+        return _pools[key]
+    with _pools_lock:
+        if key not in _pools:
+            pool = None
+            try:
+                pool = EmbeddingPool(
+                    model,
+                    spec=spec,
+                    workers=settings.embed_workers,
+                    batch_size=settings.embed_batch_size,
+                    threads_per_worker=settings.embed_threads_per_worker,
+                    start_method=settings.embed_pool_start_method,
+                )
+            except Exception as exc:
+                record_swallowed("embed_pool", exc)
+                logger.warning("Embedding pool unavailable; embedding in-process", exc_info=True)
+            _pools[key] = pool
+    return _pools[key]
@@ -0,0 +1,210 @@
+"""Content-hash embedding cache.
+
+Vectors are keyed by ``sha256(embedding_model_id + text)`` where ``text`` is
+exactly what is sent to the embedding model, so an unchanged post or comment is
+never embedded twice for the same model. Two backends are provided:
+
+- ``RedisEmbeddingCache``: shared across workers via ``settings.redis_url``;
+  eviction is delegated to Redis (``maxmemory-policy``) plus an optional TTL.
+- ``DiskEmbeddingCache``: local SQLite file with size-based LRU eviction.
+
+Cache failures never fail indexing; they are logged and treated as misses.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from array import array
+from typing import Dict, List, Optional, Sequence
+
+from ..config import settings
+from ..metrics import record_swallowed
+
+logger = logging.getLogger(__name__)
+
+# Writes between recounts of the disk cache size. The running count drifts when
+# several processes share the file.
+RECOUNT_EVERY_PUTS = 1000
+
+
+def _encode(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _decode(blob: bytes) -> List[float]:
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+class EmbeddingCache(ABC):
+    """Base class: maps embedded text to vectors for a given model id."""
+
+    def __init__(self, model_id: str) -> None:
+        self._model_id = model_id
+
+    def key(self, text: str) -> str:
+        digest = hashlib.sha256()
+        digest.update(self._model_id.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(text.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get_many(self, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        keys = [self.key(t) for t in texts]
+        try:
+            found = self._get(keys)
+        except Exception as exc:
+            record_swallowed("embedding_cache", exc)
+            logger.warning("Embedding cache lookup failed; embedding everything", exc_info=True)
+            return [None] * len(texts)
+        return [found.get(k) for k in keys]
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence[Sequence[float]]) -> None:
+        items = {self.key(t): _encode(v) for t, v in zip(texts, vectors, strict=True)}
+        if not items:
+            return
+        try:
+            self._put(items)
+        except Exception as exc:
+            record_swallowed("embedding_cache", exc)
+            logger.warning("Embedding cache write failed", exc_info=True)
+
+    @abstractmethod
+    def _get(self, keys: List[str]) -> Dict[str, List[float]]: ...
+
+    @abstractmethod
+    def _put(self, items: Dict[str, bytes]) -> None: ...
+
+
+class RedisEmbeddingCache(EmbeddingCache):
+    def __init__(
+        self,
+        model_id: str,
+        redis_url: str,
+        *,
+        ttl_seconds: Optional[int] = None,
+        prefix: str = "reddit_mcp:emb:",
+    ) -> None:
+        import redis
+
+        super().__init__(model_id)
+        self._client = redis.Redis.from_url(redis_url, socket_connect_timeout=1.0)
+        self._ttl = ttl_seconds or None
+        self._prefix = prefix
+
+    def _get(self, keys: List[str]) -> Dict[str, List[float]]:
+        blobs = self._client.mget([self._prefix + k for k in keys])
+        return {k: _decode(b) for k, b in zip(keys, blobs, strict=True) if b is not None}
+
+    def _put(self, items: Dict[str, bytes]) -> None:
+        pipe = self._client.pipeline(transaction=False)
+        for k, blob in items.items():
+            pipe.set(self._prefix + k, blob, ex=self._ttl)
+        pipe.execute()
+
+
+class DiskEmbeddingCache(EmbeddingCache):
+    """SQLite-backed cache evicting least recently used entries beyond ``max_bytes``."""
+
+    def __init__(self, model_id: str, path: str, *, max_bytes: int = 512 * 1024 * 1024) -> None:
+        super().__init__(model_id)
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY, vector BLOB NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed ON embeddings(accessed)")
+        self._conn.commit()
+        # Running size of the stored vectors, so writes do not scan the table.
+        self._bytes = self._total()
+        self._puts = 0
+
+    def _select(self, columns: str, keys: List[str]) -> List[tuple]:
+        rows: List[tuple] = []
+        # SQLite caps the number of bound parameters; query in slices.
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            marks = ",".join("?" * len(chunk))
+            rows.extend(
+                self._conn.execute(
+                    f"SELECT {columns} FROM embeddings WHERE key IN ({marks})", chunk
+                ).fetchall()
+            )
+        return rows
+
+    def _total(self) -> int:
+        (total,) = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings"
+        ).fetchone()
+        return total
+
+    def _get(self, keys: List[str]) -> Dict[str, List[float]]:
+        with self._lock:
+            found = {key: _decode(blob) for key, blob in self._select("key, vector", keys)}
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET accessed = ? WHERE key = ?",
+                    [(now, k) for k in found],
+                )
+                self._conn.commit()
+        return found
+
+    def _put(self, items: Dict[str, bytes]) -> None:
+        now = time.time()
+        with self._lock:
+            replaced = self._select("LENGTH(vector)", list(items))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, accessed) VALUES (?, ?, ?)",
+                [(k, blob, now) for k, blob in items.items()],
+            )
+            self._bytes += sum(len(b) for b in items.values()) - sum(r[0] for r in replaced)
+            self._puts += 1
+            if self._puts % RECOUNT_EVERY_PUTS == 0:
+                self._bytes = self._total()
+            if self._bytes > self._max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        # Walks the ``accessed`` index from the oldest entry and stops as soon
+        # as enough bytes are freed.
+        excess = self._bytes - self._max_bytes
+        victims: List[str] = []
+        for key, size in self._conn.execute(
+            "SELECT key, LENGTH(vector) FROM embeddings ORDER BY accessed ASC"
+        ):
+            victims.append(key)
+            excess -= size
+            self._bytes -= size
+            if excess <= 0:
+                break
+        self._conn.executemany("DELETE FROM embeddings WHERE key = ?", [(k,) for k in victims])
+
+
+def build_embedding_cache(model_id: Optional[str] = None) -> Optional[EmbeddingCache]:
+    """Build the cache selected by ``EMBEDDING_CACHE_BACKEND`` (redis, disk or none)."""
+    model_id = model_id or settings.embedding_model_id
+    backend = (settings.embedding_cache_backend or "none").lower()
+    if backend == "redis":
+        return RedisEmbeddingCache(
+            model_id, settings.redis_url, ttl_seconds=settings.embedding_cache_ttl_seconds
+        )
+    if backend == "disk":
+        return DiskEmbeddingCache(
+            model_id,
+            settings.embedding_cache_path,
+            max_bytes=settings.embedding_cache_max_bytes,
+        )
+    return None
@@ -0,0 +1,266 @@
+"""Freshness tracking for incremental refreshes (FR-20).
+
+For every ``(query, subreddit)`` the indexer remembers a ``FreshnessState``:
+
+- ``high_water``: the newest ``created_utc`` indexed so far;
+- ``fingerprints``: ``(score, edited, num_comments)`` of the submissions seen,
+  so a refresh can tell which already-indexed posts changed;
+- ``refreshed_at``: when the state was last written.
+
+A refresh lists the query sorted by "new" (one Reddit call per 100 items) and
+only expands comments, embeds and re-writes the submissions that are newer than
+the mark, unknown, or whose fingerprint changed. States older than
+``EXPIRATION_DAYS`` trigger a full re-fetch instead.
+
+Each state is a Redis hash written field by field (one field per fingerprint),
+so concurrent writers for the same pair merge instead of overwriting each
+other, and it expires ``EXPIRATION_DAYS`` after its last write.
+
+Store failures never fail indexing; a missing state just means a full refresh.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..config import settings
+from ..metrics import record_swallowed
+from .reddit_index_utils import SubmissionRecord, _reader
+
+logger = logging.getLogger(__name__)
+
+# Fingerprints kept per (query, subreddit); the newest submissions win.
+MAX_TRACKED_SUBMISSIONS = 1000
+# Score drift tolerated before a post is re-indexed (votes move constantly).
+SCORE_CHANGE_RATIO = 0.1
+SCORE_CHANGE_MIN = 2
+# Hash field prefix of a stored fingerprint.
+_FP_PREFIX = "fp:"
+
+Fingerprint = Tuple[Optional[int], Any, Optional[int]]
+
+
+def fingerprint(obj: Any) -> Fingerprint:
+    """Fingerprint of a PRAW submission or ``SubmissionRecord``.
+
+    Reads already-loaded attributes only, so listing items are never lazily
+    fetched one by one.
+    """
+    read = _reader(obj)
+    # PRAW reports ``edited`` as False or the edit timestamp.
+    return (read("score"), read("edited") or None, read("num_comments"))
+
+
+def _score_changed(old: Optional[int], new: Optional[int]) -> bool:
+    if old is None or new is None:
+        return old != new
+    return abs(new - old) >= max(SCORE_CHANGE_MIN, SCORE_CHANGE_RATIO * abs(old))
+
+
+@dataclass
+class FreshnessState:
+    high_water: float = 0.0
+    fingerprints: Dict[str, Fingerprint] = field(default_factory=dict)
+    refreshed_at: float = 0.0
+    # ``created_utc`` per fingerprinted id, to keep the newest when trimming.
+    created: Dict[str, float] = field(default_factory=dict)
+
+    def is_expired(self, expiration_days: float, now: Optional[float] = None) -> bool:
+        if expiration_days <= 0:
+            return False
+        now = time.time() if now is None else now
+        return now - self.refreshed_at > expiration_days * 86400
+
+    def needs_update(self, reddit_id: str, created_utc: Optional[float], fp: Fingerprint) -> bool:
+        """Whether a listed submission is new or changed since the last refresh."""
+        if created_utc is not None and created_utc > self.high_water:
+            return True
+        old = self.fingerprints.get(reddit_id)
+        if old is None:
+            return True
+        old_score, old_edited, old_comments = old
+        score, edited, comments = fp
+        return edited != old_edited or comments != old_comments or _score_changed(old_score, score)
+
+    def update(self, records: Iterable[SubmissionRecord], now: Optional[float] = None) -> None:
+        for r in records:
+            if not r.id:
+                continue
+            self.fingerprints[r.id] = fingerprint(r)
+            self.created[r.id] = float(r.created_utc or 0.0)
+            if r.created_utc and r.created_utc > self.high_water:
+                self.high_water = float(r.created_utc)
+        self.trim()
+        self.refreshed_at = time.time() if now is None else now
+
+    def trim(self) -> List[str]:
+        """Drop the oldest fingerprints beyond ``MAX_TRACKED_SUBMISSIONS``; returns their ids."""
+        if len(self.fingerprints) <= MAX_TRACKED_SUBMISSIONS:
+            return []
+        ordered = sorted(self.fingerprints, key=lambda i: self.created.get(i, 0.0), reverse=True)
+        dropped = ordered[MAX_TRACKED_SUBMISSIONS:]
+        for i in dropped:
+            del self.fingerprints[i]
+            self.created.pop(i, None)
+        return dropped
+
+    def to_fields(self) -> Dict[str, str]:
+        """Hash fields: ``refreshed_at`` and one ``fp:<id>`` per fingerprint.
+
+        Every field is written on its own, so concurrent writers for the same
+        (query, subreddit) merge their fingerprints instead of overwriting each
+        other; ``high_water`` is derived from the stored creation times.
+        """
+        fields = {
+            f"{_FP_PREFIX}{i}": json.dumps([*fp, self.created.get(i, 0.0)])
+            for i, fp in self.fingerprints.items()
+        }
+        if self.refreshed_at:
+            fields["refreshed_at"] = repr(self.refreshed_at)
+        return fields
+
+    @classmethod
+    def from_fields(cls, raw: Dict[Any, Any]) -> "FreshnessState":
+        state = cls()
+        for key, value in raw.items():
+            key = key.decode() if isinstance(key, bytes) else key
+            if key == "refreshed_at":
+                state.refreshed_at = float(value)
+            elif key.startswith(_FP_PREFIX):
+                score, edited, comments, created = json.loads(value)
+                reddit_id = key[len(_FP_PREFIX) :]
+                state.fingerprints[reddit_id] = (score, edited, comments)
+                state.created[reddit_id] = float(created)
+                state.high_water = max(state.high_water, float(created))
+        return state
+
+
+class FreshnessStore(ABC):
+    """Base class: persists one ``FreshnessState`` per (collection, query, subreddit)."""
+
+    def __init__(self, namespace: str) -> None:
+        self._namespace = namespace
+
+    def key(self, query: str, subreddit: Optional[str]) -> str:
+        raw = json.dumps([" ".join(query.casefold().split()), (subreddit or "").casefold()])
+        return f"{self._namespace}:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+    def get(self, query: str, subreddit: Optional[str]) -> Optional[FreshnessState]:
+        key = self.key(query, subreddit)
+        try:
+            raw = self._load(key)
+            if not raw:
+                return None
+            state = FreshnessState.from_fields(raw)
+            dropped = state.trim()
+            if dropped:
+                self._drop(key, [f"{_FP_PREFIX}{i}" for i in dropped])
+            return state
+        except Exception as exc:
+            record_swallowed("freshness", exc)
+            logger.warning("Freshness state lookup failed; doing a full refresh", exc_info=True)
+            return None
+
+    def put(self, query: str, subreddit: Optional[str], state: FreshnessState) -> None:
+        """Merge ``state`` into the stored one, field by field."""
+        fields = state.to_fields()
+        if not fields:
+            return
+        try:
+            self._merge(self.key(query, subreddit), fields)
+        except Exception as exc:
+            record_swallowed("freshness", exc)
+            logger.warning("Freshness state write failed", exc_info=True)
+
+    def record(
+        self,
+        query: str,
+        subreddit: Optional[str],
+        records: Iterable[SubmissionRecord],
+        now: Optional[float] = None,
+    ) -> None:
+        """Store the fingerprints of freshly indexed ``records`` and mark the pair refreshed."""
+        state = FreshnessState()
+        state.update(records, now)
+        self.put(query, subreddit, state)
+
+    def touch(self, query: str, subreddit: Optional[str], now: Optional[float] = None) -> None:
+        """Mark the pair refreshed without changing its fingerprints."""
+        self.put(query, subreddit, FreshnessState(refreshed_at=time.time() if now is None else now))
+
+    @abstractmethod
+    def _load(self, key: str) -> Dict[Any, Any]: ...
+
+    @abstractmethod
+    def _merge(self, key: str, fields: Dict[str, str]) -> None: ...
+
+    @abstractmethod
+    def _drop(self, key: str, fields: List[str]) -> None: ...
+
+
+class MemoryFreshnessStore(FreshnessStore):
+    def __init__(self, namespace: str = "freshness") -> None:
+        super().__init__(namespace)
+        self._data: Dict[str, Dict[str, str]] = {}
+
+    def _load(self, key: str) -> Dict[Any, Any]:
+        return dict(self._data.get(key, {}))
+
+    def _merge(self, key: str, fields: Dict[str, str]) -> None:
+        self._data.setdefault(key, {}).update(fields)
+
+    def _drop(self, key: str, fields: List[str]) -> None:
+        for name in fields:
+            self._data.get(key, {}).pop(name, None)
+
+
+class RedisFreshnessStore(FreshnessStore):
+    """One hash per (query, subreddit), expiring ``ttl_seconds`` after its last write."""
+
+    def __init__(
+        self, collection_name: str, redis_url: str, *, ttl_seconds: Optional[int] = None
+    ) -> None:
+        import redis
+
+        # v2: states are hashes now; the former JSON strings are left to age out.
+        super().__init__(f"reddit_mcp:freshness:v2:{collection_name}")
+        self._client = redis.Redis.from_url(redis_url, socket_connect_timeout=1.0)
+        self._ttl = ttl_seconds
+
+    def _load(self, key: str) -> Dict[Any, Any]:
+        return self._client.hgetall(key)
+
+    def _merge(self, key: str, fields: Dict[str, str]) -> None:
+        pipe = self._client.pipeline(transaction=True)
+        pipe.hset(key, mapping=fields)
+        if self._ttl:
+            pipe.expire(key, self._ttl)
+        pipe.execute()
+
+    def _drop(self, key: str, fields: List[str]) -> None:
+        self._client.hdel(key, *fields)
+
+
+def build_freshness_store(collection_name: str) -> FreshnessStore:
+    # Past EXPIRATION_DAYS a state only triggers a full refresh, so keep it no longer.
+    ttl = int(settings.expiration_days * 86400) if settings.expiration_days > 0 else None
+    return RedisFreshnessStore(collection_name, settings.redis_url, ttl_seconds=ttl)
+
+
+def select_changed(submissions: Iterable[Any], state: FreshnessState) -> Tuple[List[Any], int]:
+    """Split a listing into submissions to (re-)index; returns them and the skip count."""
+    changed: List[Any] = []
+    skipped = 0
+    for s in submissions:
+        read = _reader(s)
+        if state.needs_update(read("id"), read("created_utc"), fingerprint(s)):
+            changed.append(s)
+        else:
+            skipped += 1
+    return changed, skipped
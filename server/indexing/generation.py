@@ -0,0 +1,39 @@
+"""Per-collection generation counter.
+
+The indexer increments a Redis counter after every write to a collection;
+readers that cache derived data (the ``/search`` result caches) include the
+current generation in their keys, so one write invalidates all of them without
+scanning keys.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+from ..config import settings
+from ..metrics import record_swallowed
+
+logger = logging.getLogger(__name__)
+
+GENERATION_PREFIX = "reddit_mcp:generation:"
+
+
+def generation_key(collection_name: str) -> str:
+    return f"{GENERATION_PREFIX}{collection_name}"
+
+
+def invalidate_collection(collection_name: str, client: Any = None) -> None:
+    """Bump the collection generation, invalidating its cached search results.
+
+    Synchronous so the (thread-based) indexing path can call it directly.
+    """
+    try:
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(settings.redis_url, socket_connect_timeout=1.0)
+        client.incr(generation_key(collection_name))
+    except Exception as exc:
+        record_swallowed("cache_invalidation", exc)
+        logger.warning("Could not invalidate search cache for %s", collection_name, exc_info=True)
@@ -0,0 +1,247 @@
+"""Buffered, batched ingestion into Meilisearch.
+
+``RedditQueryIndex.upsert`` used to send a small ``add_documents`` call per query
+and block on ``wait_for_task``. ``MeiliIngestor`` instead buffers documents from
+many upserts and ships them in size- or time-bounded batches from a background
+thread, which is also where enqueued tasks are polled for completion. Request
+threads only append to the buffer. ``flush(wait=True)`` keeps a synchronous path
+for tests and scripts that need documents to be searchable immediately.
+
+Batches are drained and enqueued under one lock, whichever thread ships them.
+Meilisearch applies tasks in enqueue order, so an older version of a document
+can never overwrite a newer one.
+
+``on_applied`` is called once Meilisearch has processed enqueued batches (after
+``flush(wait=True)``, or when the background thread sees their tasks finish);
+``RedditQueryIndex`` uses it to invalidate cached search results a second time,
+once the lexical hits are actually searchable.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from ..metrics import INDEX_BYTES_WRITTEN_TOTAL, record_swallowed, track_stage
+
+logger = logging.getLogger(__name__)
+
+
+def approx_bytes(doc: dict) -> int:
+    """Rough serialized size of a document (no JSON encoding on the hot path)."""
+    return sum(len(k) + len(str(v)) for k, v in doc.items() if v is not None)
+
+
+def task_uid(task: Any) -> Optional[int]:
+    """Extract the task uid from the different SDK return shapes."""
+    if isinstance(task, dict):
+        return task.get("taskUid") or task.get("uid")
+    # Support SDKs that return a Task object
+    return (
+        getattr(task, "taskUid", None)
+        or getattr(task, "uid", None)
+        or getattr(task, "task_uid", None)
+    )
+
+
+class MeiliIngestor:
+    def __init__(
+        self,
+        client: Any,
+        index_name: str,
+        *,
+        batch_size: int = 1000,
+        flush_interval_seconds: float = 2.0,
+        primary_key: str = "id",
+        filterable_attributes: Sequence[str] = (),
+        on_applied: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._client = client
+        self._index = client.index(index_name)
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_interval_seconds
+        self._primary_key = primary_key
+        self._filterable_attributes = list(filterable_attributes)
+        self._settings_applied = not self._filterable_attributes
+        self._on_applied = on_applied
+
+        self._cond = threading.Condition()
+        # Held from draining a batch until its tasks are enqueued; taken before
+        # ``_cond``, never while holding it.
+        self._send_lock = threading.Lock()
+        # Keyed by primary key so a document re-sent before the flush is only
+        # shipped once, in its latest version.
+        self._buffer: Dict[Any, dict] = {}
+        self._oldest_at: Optional[float] = None
+        self._pending_tasks: List[int] = []
+        self._worker: Optional[threading.Thread] = None
+        self._closed = False
+
+    def add(self, documents: Iterable[dict], *, wait: bool = False) -> None:
+        """Buffer documents; the background thread ships them in batches.
+
+        With ``wait=True`` the buffer (including ``documents``) is flushed from the
+        calling thread, which blocks until Meilisearch has processed it.
+        """
+        with self._cond:
+            for doc in documents:
+                self._buffer[doc.get(self._primary_key)] = doc
+            if not wait and len(self._buffer) < 2 * self._batch_size:
+                if self._buffer and self._oldest_at is None:
+                    self._oldest_at = time.monotonic()
+                self._ensure_worker()
+                if len(self._buffer) >= self._batch_size:
+                    self._cond.notify_all()
+                return
+        # Synchronous flush, or backpressure: producers outrun the background
+        # thread, so the caller ships the batch itself.
+        self.flush(wait=wait)
+
+    def flush(self, wait: bool = False) -> List[int]:
+        """Send every buffered document now; optionally wait for Meilisearch.
+
+        Returns the uids of the enqueued tasks. With ``wait=True`` it also waits
+        for batches other threads enqueued before, which may hold documents the
+        caller added.
+        """
+        with self._send_lock:
+            with self._cond:
+                batch = self._drain()
+            uids = self._send(batch)
+            with self._cond:
+                self._pending_tasks.extend(uids)
+                waiting = list(self._pending_tasks)
+        if wait and waiting:
+            with track_stage("meili_wait"):
+                for uid in waiting:
+                    self._client.wait_for_task(uid)
+            with self._cond:
+                self._pending_tasks = [u for u in self._pending_tasks if u not in waiting]
+            self._applied()
+        return uids
+
+    def pending_tasks(self) -> List[int]:
+        with self._cond:
+            return list(self._pending_tasks)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join(timeout=self._flush_interval + 5)
+        self.flush()
+
+    def apply_settings(self) -> bool:
+        """Declare the filterable attributes once; returns whether they are in place.
+
+        Called at startup (see ``RedditQueryIndex.ensure_search_settings``) so
+        filters work on an existing index before anything is ingested, and again
+        before the first documents are sent if that failed.
+        """
+        if self._settings_applied:
+            return True
+        try:
+            self._index.update_filterable_attributes(self._filterable_attributes)
+            self._settings_applied = True
+        except Exception as exc:
+            record_swallowed("meili_settings", exc)
+            logger.warning("Could not update Meilisearch filterable attributes", exc_info=True)
+        return self._settings_applied
+
+    # ------------------------------------------------------------------
+    def _drain(self) -> List[dict]:
+        batch = list(self._buffer.values())
+        self._buffer.clear()
+        self._oldest_at = None
+        return batch
+
+    def _applied(self) -> None:
+        if self._on_applied is None:
+            return
+        try:
+            self._on_applied()
+        except Exception as exc:
+            record_swallowed("meili_applied", exc)
+            logger.warning("Meilisearch on_applied callback failed", exc_info=True)
+
+    def _send(self, documents: List[dict]) -> List[int]:
+        if documents:
+            self.apply_settings()
+        uids: List[int] = []
+        for start in range(0, len(documents), self._batch_size):
+            chunk = documents[start : start + self._batch_size]
+            try:
+                with track_stage("meili_write", items=len(chunk)):
+                    uid = task_uid(self._index.add_documents(chunk, self._primary_key))
+                INDEX_BYTES_WRITTEN_TOTAL.labels(sink="meilisearch").inc(
+                    sum(approx_bytes(doc) for doc in chunk)
+                )
+            except Exception as exc:
+                # Best-effort: do not fail indexing if Meilisearch is unavailable.
+                record_swallowed("meili_write", exc)
+                logger.warning(
+                    "Meilisearch add_documents failed (%d docs)", len(chunk), exc_info=True
+                )
+                continue
+            if uid is not None:
+                uids.append(uid)
+        return uids
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="meili-ingest", daemon=True)
+            self._worker.start()
+            atexit.register(self.close)
+
+    def _due(self) -> bool:
+        if not self._buffer:
+            return False
+        if len(self._buffer) >= self._batch_size:
+            return True
+        return (
+            self._oldest_at is not None
+            and time.monotonic() - self._oldest_at >= self._flush_interval
+        )
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and not self._due():
+                    timeout = self._flush_interval
+                    if self._oldest_at is not None:
+                        age = time.monotonic() - self._oldest_at
+                        timeout = max(0.0, self._flush_interval - age)
+                    self._cond.wait(timeout=timeout)
+                if self._closed:
+                    return
+                due = self._due()
+            if due:
+                self.flush()
+            self._poll_tasks()
+
+    def _poll_tasks(self) -> None:
+        with self._cond:
+            pending = list(self._pending_tasks)
+        done: List[int] = []
+        succeeded = False
+        for uid in pending:
+            try:
+                task = self._client.get_task(uid)
+            except Exception:
+                logger.debug("Could not poll Meilisearch task %s", uid, exc_info=True)
+                continue
+            status = task.get("status") if isinstance(task, dict) else getattr(task, "status", None)
+            if status in ("succeeded", "failed", "canceled"):
+                done.append(uid)
+                succeeded = succeeded or status == "succeeded"
+                if status != "succeeded":
+                    logger.warning("Meilisearch task %s finished with status %s", uid, status)
+        if done:
+            with self._cond:
+                self._pending_tasks = [u for u in self._pending_tasks if u not in done]
+        if succeeded:
+            self._applied()
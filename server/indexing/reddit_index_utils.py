@@ -2,206 +2,358 @@
 
 This module contains helpers to map PRAW models (Submission/Comment) to
 LlamaIndex TextNodes (Qdrant) and Meilisearch documents.
+
+PRAW objects are read once into compact, slotted records
+(``SubmissionRecord``/``CommentRecord``); both output formats are then built
+from those records, so the comment forest is flattened and every attribute is
+read a single time per object.
 """
 
 from __future__ import annotations
 
-from typing import Any, List
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from llama_index.core.schema import NodeRelationship, RelatedNodeInfo, TextNode
+
+from ..metrics import track_stage
+
+# Only these metadata keys are part of the text sent to the embedding model.
+# Everything else (query, score, counters, urls, ...) changes between fetches
+# and would defeat the content-hash embedding cache without adding meaning.
+EMBED_METADATA_KEYS = ("kind", "title", "subreddit")
+
+
+@dataclass(slots=True)
+class CommentRecord:
+    id: Optional[str]
+    body: Optional[str]
+    parent_id: Optional[str]
+    link_id: Optional[str]
+    submission_id: Optional[str]
+    author: Optional[str]
+    score: Optional[int]
+    created_utc: Optional[float]
+    is_submitter: Optional[bool]
+    depth: Optional[int]
+    controversiality: Optional[int]
+    stickied: Optional[bool]
+    locked: Optional[bool]
+    distinguished: Optional[str]
+    subreddit: Optional[str]
+    subreddit_id: Optional[str]
+    # When this object was fetched from Reddit (unix seconds).
+    retrieved_at: Optional[float] = None
+
+
+@dataclass(slots=True)
+class SubmissionRecord:
+    id: Optional[str]
+    title: Optional[str]
+    url: Optional[str]
+    permalink: Optional[str]
+    score: Optional[int]
+    num_comments: Optional[int]
+    created_utc: Optional[float]
+    created: Optional[float]
+    edited_ts: Optional[float]
+    edited: Any
+    subreddit: Optional[str]
+    subreddit_id: Optional[str]
+    author: Optional[str]
+    author_fullname: Optional[str]
+    is_self: Optional[bool]
+    selftext: Optional[str]
+    over_18: Optional[bool]
+    stickied: Optional[bool]
+    locked: Optional[bool]
+    spoiler: Optional[bool]
+    upvote_ratio: Optional[float]
+    link_flair_text: Optional[str]
+    link_flair_template_id: Optional[str]
+    num_crossposts: Optional[int]
+    gilded: Optional[int]
+    thumbnail: Optional[str]
+    domain: Optional[str]
+    fullname: Optional[str]
+    retrieved_at: Optional[float] = None
+    comments: List[CommentRecord] = field(default_factory=list)
+
+
+# Attributes copied verbatim from the PRAW object (author/subreddit are normalised to names).
+_SUBMISSION_ATTRS: Tuple[str, ...] = tuple(
+    f for f in SubmissionRecord.__dataclass_fields__ if f not in ("comments", "retrieved_at")
+)
+_COMMENT_ATTRS: Tuple[str, ...] = tuple(
+    f for f in CommentRecord.__dataclass_fields__ if f not in ("submission_id", "retrieved_at")
+)
+# Metadata (Qdrant payload / Meilisearch) fields, in output order.
+_SUBMISSION_META: Tuple[str, ...] = tuple(
+    f for f in SubmissionRecord.__dataclass_fields__ if f not in ("id", "selftext", "comments")
+)
+_COMMENT_META: Tuple[str, ...] = tuple(
+    f for f in CommentRecord.__dataclass_fields__ if f not in ("id", "body")
+)
+# Lowercased copies of the names that search filters match against: Reddit names
+# are case-insensitive, Qdrant and Meilisearch compare exactly.
+FILTER_NAME_FIELDS: Tuple[Tuple[str, str], ...] = (
+    ("subreddit", "subreddit_lc"),
+    ("author", "author_lc"),
+)
+
+
+def _reader(obj: Any) -> Callable[[str], Any]:
+    """Fast attribute reader for PRAW-like objects.
+
+    Reads from the instance ``__dict__`` and only falls back to ``getattr`` for
+    class-level attributes (e.g. PRAW's ``fullname`` property). Unknown names
+    return ``None`` without going through PRAW's lazy ``__getattr__``, which
+    would otherwise trigger a network fetch.
+    """
+    data = getattr(obj, "__dict__", None)
+    if data is None:
+        return lambda name: getattr(obj, name, None)
+    cls = type(obj)
+
+    def read(name: str) -> Any:
+        try:
+            return data[name]
+        except KeyError:
+            return getattr(obj, name, None) if hasattr(cls, name) else None
+
+    return read
+
+
+def _subreddit_name(value: Any) -> Optional[str]:
+    return str(value) if value else None
 
-from llama_index.core.schema import TextNode
+
+def _author_name(value: Any) -> Optional[str]:
+    return getattr(value, "name", None)
+
+
+def _add_filter_names(fields: Dict[str, Any]) -> Dict[str, Any]:
+    for name, lowered in FILTER_NAME_FIELDS:
+        value = fields.get(name)
+        fields[lowered] = value.lower() if value else None
+    return fields
+
+
+def _iso_datetime(timestamp: Optional[float]) -> Optional[str]:
+    """RFC 3339 UTC time for Qdrant's datetime payload index."""
+    if timestamp is None:
+        return None
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc).isoformat()
+
+
+def _submission_id(link_id: Any) -> Optional[str]:
+    if isinstance(link_id, str) and "_" in link_id:
+        return link_id.split("_", 1)[1]
+    return None
+
+
+def _flatten_comments(comments: Any) -> Iterable[Any]:
+    # If it's a CommentForest, flatten to include all replies
+    if hasattr(comments, "list"):
+        try:
+            return comments.list()
+        except Exception:
+            return list(comments)
+    return comments
+
+
+def _node(text: str, reddit_id: Optional[str], metadata: Dict[str, Any]) -> TextNode:
+    node = TextNode(
+        text=text,
+        id_=RedditIndexUtils.point_id(reddit_id),
+        metadata=metadata,
+        excluded_embed_metadata_keys=[k for k in metadata if k not in EMBED_METADATA_KEYS],
+    )
+    if reddit_id:
+        # Vector stores overwrite the ``doc_id`` payload key with ``ref_doc_id``;
+        # point it back at the Reddit id so payload filters on doc_id keep working.
+        node.relationships[NodeRelationship.SOURCE] = RelatedNodeInfo(node_id=reddit_id)
+    return node
 
 
 class RedditIndexUtils:
     """Namespace for reusable indexing utilities.
 
     Consolidates transformations from PRAW models to:
+    - compact ``SubmissionRecord``/``CommentRecord`` objects (single extraction pass)
     - LlamaIndex ``TextNode`` objects (Qdrant vector store)
     - Meilisearch documents (BM25/lexical search)
     """
 
     @staticmethod
-    def map_submissions_to_text_nodes(results: List[Any], query: str) -> List[TextNode]:
-        nodes: List[TextNode] = []
+    def point_id(reddit_id: Optional[str]) -> Optional[str]:
+        """Deterministic Qdrant point id (UUID) for a Reddit id.
+
+        Qdrant only accepts UUIDs or integers as point ids; deriving them from the
+        Reddit id makes repeated upserts overwrite instead of duplicating points.
+        """
+        if not reddit_id:
+            return None
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"reddit:{reddit_id}"))
+
+    # ------------------------------------------------------------------
+    # Extraction (PRAW -> records)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def extract_comment(c: Any, retrieved_at: Optional[float] = None) -> CommentRecord:
+        read = _reader(c)
+        values = {name: read(name) for name in _COMMENT_ATTRS}
+        values["author"] = _author_name(values["author"])
+        values["subreddit"] = _subreddit_name(values["subreddit"])
+        return CommentRecord(
+            submission_id=_submission_id(values["link_id"]),
+            retrieved_at=retrieved_at if retrieved_at is not None else time.time(),
+            **values,
+        )
+
+    @staticmethod
+    def extract_submission(r: Any) -> SubmissionRecord:
+        read = _reader(r)
+        values = {name: read(name) for name in _SUBMISSION_ATTRS}
+        values["author"] = _author_name(values["author"])
+        values["subreddit"] = _subreddit_name(values["subreddit"])
+        now = time.time()
+        record = SubmissionRecord(retrieved_at=now, **values)
+        comments = read("comments")
+        if comments:
+            record.comments = [
+                RedditIndexUtils.extract_comment(c, now) for c in _flatten_comments(comments)
+            ]
+        return record
+
+    @staticmethod
+    def extract_records(results: Iterable[Any]) -> List[SubmissionRecord]:
+        with track_stage("map_records") as stage:
+            records = [RedditIndexUtils.extract_submission(r) for r in results]
+            stage.add(sum(1 + len(r.comments) for r in records))
+        return records
+
+    @staticmethod
+    def iter_records(results: Iterable[Any]) -> Iterator[SubmissionRecord]:
+        """Lazily extract records; the PRAW object can be dropped once yielded."""
         for r in results:
-            text = getattr(r, "selftext", "") or ""
-            node = TextNode(
-                text=text,
-                id_=getattr(r, "id", None),
-                metadata={
-                    "doc_id": getattr(r, "id", None),
-                    "reddit_id": getattr(r, "id", None),
-                    "kind": "submission",
-                    "title": getattr(r, "title", None),
-                    "url": getattr(r, "url", None),
-                    "permalink": getattr(r, "permalink", None),
-                    "score": getattr(r, "score", None),
-                    "num_comments": getattr(r, "num_comments", None),
-                    "created_utc": getattr(r, "created_utc", None),
-                    "created": getattr(r, "created", None),
-                    "edited_ts": getattr(r, "edited_ts", None),
-                    "subreddit": (
-                        str(getattr(r, "subreddit", "")) if getattr(r, "subreddit", None) else None
-                    ),
-                    "subreddit_id": getattr(r, "subreddit_id", None),
-                    "author": getattr(getattr(r, "author", None), "name", None),
-                    "author_fullname": getattr(r, "author_fullname", None),
-                    "is_self": getattr(r, "is_self", None),
-                    "over_18": getattr(r, "over_18", None),
-                    "stickied": getattr(r, "stickied", None),
-                    "locked": getattr(r, "locked", None),
-                    "spoiler": getattr(r, "spoiler", None),
-                    "upvote_ratio": getattr(r, "upvote_ratio", None),
-                    "link_flair_text": getattr(r, "link_flair_text", None),
-                    "link_flair_template_id": getattr(r, "link_flair_template_id", None),
-                    "num_crossposts": getattr(r, "num_crossposts", None),
-                    "gilded": getattr(r, "gilded", None),
-                    "thumbnail": getattr(r, "thumbnail", None),
-                    "domain": getattr(r, "domain", None),
-                    "fullname": getattr(r, "fullname", None),
-                    "query": query,
-                    "source": "reddit",
-                },
-            )
-            nodes.append(node)
-            comments = getattr(r, "comments", None)
-            if comments:
-                flat_comments = comments
-                # If it's a CommentForest, flatten to include all replies
-                if hasattr(comments, "list"):
-                    try:
-                        flat_comments = comments.list()
-                    except Exception:
-                        flat_comments = list(comments)
-                nodes.extend(RedditIndexUtils.map_comments_to_text_nodes(flat_comments, query))
+            with track_stage("map_records") as stage:
+                record = RedditIndexUtils.extract_submission(r)
+                stage.add(1 + len(record.comments))
+            yield record
+
+    @staticmethod
+    def batch_records(
+        records: Iterable[SubmissionRecord], max_items: int
+    ) -> Iterator[List[SubmissionRecord]]:
+        """Group records into micro-batches of about ``max_items`` posts + comments.
+
+        A single submission larger than ``max_items`` forms its own batch.
+        """
+        batch: List[SubmissionRecord] = []
+        size = 0
+        for r in records:
+            batch.append(r)
+            size += 1 + len(r.comments)
+            if size >= max_items:
+                yield batch
+                batch, size = [], 0
+        if batch:
+            yield batch
+
+    # ------------------------------------------------------------------
+    # Records -> TextNodes / Meilisearch documents
+    # ------------------------------------------------------------------
+    @staticmethod
+    def submission_record_to_text_node(r: SubmissionRecord, query: str) -> TextNode:
+        metadata: Dict[str, Any] = {"doc_id": r.id, "reddit_id": r.id, "kind": "submission"}
+        for name in _SUBMISSION_META:
+            metadata[name] = getattr(r, name)
+        metadata["submission_id"] = r.id
+        metadata["created_at"] = _iso_datetime(r.created_utc)
+        metadata["query"] = query
+        metadata["source"] = "reddit"
+        return _node(r.selftext or "", r.id, _add_filter_names(metadata))
+
+    @staticmethod
+    def comment_record_to_text_node(c: CommentRecord, query: str) -> TextNode:
+        metadata: Dict[str, Any] = {"kind": "comment", "doc_id": c.id}
+        for name in _COMMENT_META:
+            metadata[name] = getattr(c, name)
+        metadata["created_at"] = _iso_datetime(c.created_utc)
+        metadata["query"] = query
+        metadata["source"] = "reddit"
+        return _node(c.body or "", c.id, _add_filter_names(metadata))
+
+    @staticmethod
+    def submission_record_to_meili_document(r: SubmissionRecord, query: str) -> dict:
+        doc: Dict[str, Any] = {name: getattr(r, name) for name in _SUBMISSION_ATTRS}
+        doc["kind"] = "submission"
+        doc["submission_id"] = r.id
+        doc["retrieved_at"] = r.retrieved_at
+        doc["query"] = query
+        doc["source"] = "reddit"
+        return _add_filter_names(doc)
+
+    @staticmethod
+    def comment_record_to_meili_document(c: CommentRecord, query: str) -> dict:
+        doc: Dict[str, Any] = {"id": c.id, "body": c.body, "kind": "comment"}
+        for name in _COMMENT_META:
+            doc[name] = getattr(c, name)
+        doc["query"] = query
+        doc["source"] = "reddit"
+        return _add_filter_names(doc)
+
+    @staticmethod
+    def records_to_text_nodes(records: Iterable[SubmissionRecord], query: str) -> List[TextNode]:
+        nodes: List[TextNode] = []
+        with track_stage("map_nodes") as stage:
+            for r in records:
+                nodes.append(RedditIndexUtils.submission_record_to_text_node(r, query))
+                for c in r.comments:
+                    nodes.append(RedditIndexUtils.comment_record_to_text_node(c, query))
+            stage.add(len(nodes))
         return nodes
 
     @staticmethod
-    def map_submissions_to_meili_documents(results: List[Any], query: str) -> List[dict]:
+    def records_to_meili_documents(records: Iterable[SubmissionRecord], query: str) -> List[dict]:
         docs: List[dict] = []
-        for r in results:
-            docs.append(
-                {
-                    "id": getattr(r, "id", None),
-                    "title": getattr(r, "title", None),
-                    "url": getattr(r, "url", None),
-                    "permalink": getattr(r, "permalink", None),
-                    "score": getattr(r, "score", None),
-                    "num_comments": getattr(r, "num_comments", None),
-                    "created_utc": getattr(r, "created_utc", None),
-                    "created": getattr(r, "created", None),
-                    "edited_ts": getattr(r, "edited_ts", None),
-                    "subreddit": (
-                        str(getattr(r, "subreddit", "")) if getattr(r, "subreddit", None) else None
-                    ),
-                    "subreddit_id": getattr(r, "subreddit_id", None),
-                    "author": getattr(getattr(r, "author", None), "name", None),
-                    "author_fullname": getattr(r, "author_fullname", None),
-                    "is_self": getattr(r, "is_self", None),
-                    "selftext": getattr(r, "selftext", None),
-                    "over_18": getattr(r, "over_18", None),
-                    "stickied": getattr(r, "stickied", None),
-                    "locked": getattr(r, "locked", None),
-                    "spoiler": getattr(r, "spoiler", None),
-                    "upvote_ratio": getattr(r, "upvote_ratio", None),
-                    "link_flair_text": getattr(r, "link_flair_text", None),
-                    "link_flair_template_id": getattr(r, "link_flair_template_id", None),
-                    "num_crossposts": getattr(r, "num_crossposts", None),
-                    "gilded": getattr(r, "gilded", None),
-                    "thumbnail": getattr(r, "thumbnail", None),
-                    "domain": getattr(r, "domain", None),
-                    "fullname": getattr(r, "fullname", None),
-                    "query": query,
-                    "source": "reddit",
-                }
-            )
-            comments = getattr(r, "comments", None)
-            if comments:
-                flat_comments = comments
-                if hasattr(comments, "list"):
-                    try:
-                        flat_comments = comments.list()
-                    except Exception:
-                        flat_comments = list(comments)
-                docs.extend(RedditIndexUtils.map_comments_to_meili_documents(flat_comments, query))
+        with track_stage("map_documents") as stage:
+            for r in records:
+                docs.append(RedditIndexUtils.submission_record_to_meili_document(r, query))
+                for c in r.comments:
+                    docs.append(RedditIndexUtils.comment_record_to_meili_document(c, query))
+            stage.add(len(docs))
         return docs
 
+    # ------------------------------------------------------------------
+    # PRAW -> TextNodes / Meilisearch documents (convenience wrappers)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def map_submissions_to_text_nodes(results: List[Any], query: str) -> List[TextNode]:
+        records = RedditIndexUtils.extract_records(results)
+        return RedditIndexUtils.records_to_text_nodes(records, query)
+
+    @staticmethod
+    def map_submissions_to_meili_documents(results: List[Any], query: str) -> List[dict]:
+        records = RedditIndexUtils.extract_records(results)
+        return RedditIndexUtils.records_to_meili_documents(records, query)
+
     @staticmethod
     def map_comments_to_text_nodes(comments: List[Any], query: str) -> List[TextNode]:
-        nodes: List[TextNode] = []
-        for c in comments:
-            text = getattr(c, "body", "") or ""
-            link_id = getattr(c, "link_id", None)
-            submission_id = None
-            if isinstance(link_id, str) and "_" in link_id:
-                try:
-                    submission_id = link_id.split("_", 1)[1]
-                except Exception:
-                    submission_id = None
-
-            node = TextNode(
-                text=text,
-                id_=getattr(c, "id", None),
-                metadata={
-                    "kind": "comment",
-                    "doc_id": getattr(c, "id", None),
-                    "parent_id": getattr(c, "parent_id", None),
-                    "link_id": link_id,
-                    "submission_id": submission_id,
-                    "author": getattr(getattr(c, "author", None), "name", None),
-                    "score": getattr(c, "score", None),
-                    "created_utc": getattr(c, "created_utc", None),
-                    "is_submitter": getattr(c, "is_submitter", None),
-                    "depth": getattr(c, "depth", None),
-                    "controversiality": getattr(c, "controversiality", None),
-                    "stickied": getattr(c, "stickied", None),
-                    "locked": getattr(c, "locked", None),
-                    "distinguished": getattr(c, "distinguished", None),
-                    "subreddit": (
-                        str(getattr(c, "subreddit", "")) if getattr(c, "subreddit", None) else None
-                    ),
-                    "subreddit_id": getattr(c, "subreddit_id", None),
-                    "query": query,
-                    "source": "reddit",
-                },
-            )
-            nodes.append(node)
-        return nodes
+        return [
+            RedditIndexUtils.comment_record_to_text_node(RedditIndexUtils.extract_comment(c), query)
+            for c in comments
+        ]
 
     @staticmethod
     def map_comments_to_meili_documents(comments: List[Any], query: str) -> List[dict]:
-        docs: List[dict] = []
-        for c in comments:
-            link_id = getattr(c, "link_id", None)
-            submission_id = None
-            if isinstance(link_id, str) and "_" in link_id:
-                try:
-                    submission_id = link_id.split("_", 1)[1]
-                except Exception:
-                    submission_id = None
-
-            docs.append(
-                {
-                    "id": getattr(c, "id", None),
-                    "body": getattr(c, "body", None),
-                    "kind": "comment",
-                    "parent_id": getattr(c, "parent_id", None),
-                    "link_id": link_id,
-                    "submission_id": submission_id,
-                    "author": getattr(getattr(c, "author", None), "name", None),
-                    "score": getattr(c, "score", None),
-                    "created_utc": getattr(c, "created_utc", None),
-                    "is_submitter": getattr(c, "is_submitter", None),
-                    "depth": getattr(c, "depth", None),
-                    "controversiality": getattr(c, "controversiality", None),
-                    "stickied": getattr(c, "stickied", None),
-                    "locked": getattr(c, "locked", None),
-                    "distinguished": getattr(c, "distinguished", None),
-                    "subreddit": (
-                        str(getattr(c, "subreddit", "")) if getattr(c, "subreddit", None) else None
-                    ),
-                    "subreddit_id": getattr(c, "subreddit_id", None),
-                    "query": query,
-                    "source": "reddit",
-                }
+        return [
+            RedditIndexUtils.comment_record_to_meili_document(
+                RedditIndexUtils.extract_comment(c), query
             )
-        return docs
+            for c in comments
+        ]
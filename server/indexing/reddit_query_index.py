@@ -3,22 +3,53 @@
 This module provides a small façade class, ``RedditQueryIndex``, that:
 1) fetches posts via the Reddit connector,
 2) converts them to LlamaIndex ``TextNode`` objects,
-3) embeds and upserts them into a Qdrant collection via ``QdrantVectorStore``.
+3) embeds them, reusing cached vectors for unchanged content,
+4) upserts them into a Qdrant collection via ``QdrantVectorStore``.
 
 """
 
 from __future__ import annotations
 
-from typing import Any, List, Optional
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Set
 
 import meilisearch
 import qdrant_client
-from llama_index.core import StorageContext, VectorStoreIndex
+from llama_index.core import VectorStoreIndex
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.schema import MetadataMode, TextNode
 from llama_index.vector_stores.qdrant import QdrantVectorStore
+from qdrant_client.http import models as qmodels
 
+from ..backends import fake_backends, is_fake_mode
 from ..config import settings
+from ..connectors.rate_limit import Priority
 from ..connectors.reddit import RedditConnector
-from .reddit_index_utils import RedditIndexUtils
+from ..metrics import EMBEDDING_BATCH_SIZE, INDEX_BYTES_WRITTEN_TOTAL, record_swallowed, track_stage
+from .chunking import TextChunker
+from .collection import ensure_collection
+from .dedup import Deduplicator, build_deduplicator
+from .embed_pool import shared_pool
+from .embedding_cache import EmbeddingCache, build_embedding_cache
+from .freshness import FreshnessStore, build_freshness_store, select_changed
+from .generation import invalidate_collection
+from .meili_ingest import MeiliIngestor
+from .reddit_index_utils import RedditIndexUtils, SubmissionRecord
+from .registry import registry, resolve_embed_spec
+
+logger = logging.getLogger(__name__)
+
+_FROM_SETTINGS: Any = object()
+
+# Meilisearch attributes usable in search filters.
+MEILI_FILTERABLE_ATTRIBUTES = (
+    "subreddit_lc",
+    "kind",
+    "author_lc",
+    "submission_id",
+    "created_utc",
+)
 
 
 class RedditQueryIndex:
@@ -33,91 +64,465 @@ class RedditQueryIndex:
         ``settings.embedding_model_id``. Accepts either a LlamaIndex embedding
         instance or a string alias (e.g., ``"local:BAAI/bge-small-en-v1.5"`` or
         an OpenAI model id).
+    embedding_cache:
+        Optional content-hash cache of embeddings. Defaults to the backend chosen by
+        ``settings.embedding_cache_backend``; pass ``None`` to disable caching.
+    meili_sync:
+        When true, every upsert flushes its Meilisearch documents and waits for
+        the indexing task (useful in tests). By default documents are batched
+        across upserts and flushed in the background.
+    freshness_store:
+        Where per-(query, subreddit) high-water marks for :meth:`refresh` are kept.
+        Defaults to Redis (``settings.redis_url``).
+    deduplicator:
+        Exact/near-duplicate filter applied before embedding. Defaults to one
+        with Redis-persisted signatures; pass ``None`` to disable deduplication.
     """
 
     def __init__(
         self,
-        collection_name: str = "reddit_mcp_posts",
+        collection_name: Optional[str] = None,
         embed_model: Optional[Any] = None,
+        embedding_cache: Optional[EmbeddingCache] = _FROM_SETTINGS,
+        meili_sync: bool = False,
+        freshness_store: Optional[FreshnessStore] = None,
+        deduplicator: Optional[Deduplicator] = _FROM_SETTINGS,
     ) -> None:
-        self._collection_name = collection_name
+        self._collection_name = collection_name or settings.qdrant_collection
         self._client = qdrant_client.QdrantClient(url=settings.qdrant_url)
         # Resolve embed model from config unless explicitly overridden (tests may override).
-        # If config contains an HF model id (e.g., "BAAI/bge-small-en-v1.5"),
-        # convert to the local alias so LlamaIndex loads the local provider.
-        if embed_model is not None:
-            self._embed_model = embed_model
-        else:
-            model_id = settings.embedding_model_id
-            if isinstance(model_id, str) and model_id.startswith("local:"):
-                self._embed_model = model_id
-            elif isinstance(model_id, str) and "/" in model_id:
-                # Heuristic: looks like a HF model id -> use local provider
-                self._embed_model = f"local:{model_id}"
-            else:
-                # Could be "default" (Mock/OpenAI in tests) or an OpenAI model id
-                self._embed_model = model_id
+        # The model itself is loaded lazily, once per process, by the registry.
+        self._embed_model = embed_model if embed_model is not None else resolve_embed_spec()
+        # Vector store / index handles are built on first upsert and then reused.
+        self._index: Optional[VectorStoreIndex] = None
+        self._index_lock = threading.Lock()
+        self._meili_sync = meili_sync
+        self._meili_ingestor: Optional[MeiliIngestor] = None
+        self._redis: Any = None
+        self._reddit_connector: Optional[RedditConnector] = None
+        self._freshness = freshness_store or build_freshness_store(self._collection_name)
+        if deduplicator is _FROM_SETTINGS:
+            deduplicator = build_deduplicator(self._collection_name)
+        self._dedup: Optional[Deduplicator] = deduplicator
+        self._chunker: Optional[TextChunker] = None
+        self._collection_ready = False
 
-    def upsert(self, query: str, subreddit: Optional[str] = None, limit: int = 10) -> List[object]:
+        if embedding_cache is _FROM_SETTINGS:
+            model_key = (
+                self._embed_model
+                if isinstance(self._embed_model, str)
+                else getattr(self._embed_model, "model_name", None)
+            )
+            embedding_cache = build_embedding_cache(model_key)
+        self._embedding_cache: Optional[EmbeddingCache] = embedding_cache
+
+    def upsert(
+        self,
+        query: str,
+        subreddit: Optional[str] = None,
+        limit: int = 10,
+        *,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> List[object]:
         """Fetch Reddit results and upsert them into Qdrant and Meilisearch.
 
         The function is idempotent with respect to repeated titles/IDs being
         embedded; Qdrant will upsert by point id. Caller is responsible for
         choosing ``collection_name`` consistent with the embedding dimension.
+        Background refreshes should pass ``priority=Priority.BACKGROUND`` so
+        interactive searches are admitted first by the Reddit rate limiter.
 
         Returns the list of results that were indexed (useful for downstream logs/tests).
         """
         if not query or not query.strip():
             return []
 
-        reddit = RedditConnector(
-            client_id=settings.reddit_client_id,
-            client_secret=settings.reddit_client_secret,
-            user_agent=settings.reddit_user_agent,
-        )
-        results = reddit.search(
+        results = self._connector().search(
             query=query,
             subreddit=subreddit,
             limit=limit,
             include_comments=True,
             comments_limit=50,
             replace_more_limit=None,
+            priority=priority,
         )
         if not results:
             return []
 
+        # Read every PRAW object once; both index formats are built from the records.
+        records = RedditIndexUtils.extract_records(results)
+        self.index_records(records, query)
+        self._remember(query, subreddit, records)
+        return results
+
+    def upsert_many(
+        self,
+        queries: List[str],
+        subreddit: Optional[str] = None,
+        limit: int = 10,
+        *,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> Dict[str, List[object]]:
+        """Fetch and index several (sub)queries in one pass.
+
+        Listings are fetched concurrently and submissions returned by more than
+        one query are expanded, mapped and embedded once (attributed to the first
+        query returning them). Returns the unique results per query.
+        """
+        results = self._connector().search_many(
+            queries,
+            subreddit=subreddit,
+            limit=limit,
+            include_comments=True,
+            replace_more_limit=None,
+            priority=priority,
+        )
+        for query, submissions in results.items():
+            if not submissions:
+                continue
+            records = RedditIndexUtils.extract_records(submissions)
+            self.index_records(records, query)
+            self._remember(query, subreddit, records)
+        return results
+
+    def refresh(
+        self,
+        query: str,
+        subreddit: Optional[str] = None,
+        limit: int = 100,
+        *,
+        priority: Priority = Priority.BACKGROUND,
+    ) -> int:
+        """Incrementally refresh a query; returns the number of submissions re-indexed.
+
+        The newest ``limit`` submissions are listed (one Reddit call per 100) and
+        only those newer than the stored high-water mark, not seen before, or
+        whose score/``edited``/comment count changed get their comments expanded
+        and are re-written; deterministic point ids make that a merge into the
+        existing Qdrant points and Meilisearch documents. Without a stored state,
+        or once it is older than ``EXPIRATION_DAYS``, everything listed is
+        re-indexed.
+        """
+        if not query or not query.strip():
+            return 0
+
+        state = self._freshness.get(query, subreddit)
+        if state is not None and state.is_expired(settings.expiration_days):
+            state = None
+        connector = self._connector()
+        listing = connector.search(
+            query=query,
+            subreddit=subreddit,
+            limit=limit,
+            include_comments=False,
+            priority=priority,
+            sort="new",
+        )
+        if state is None:
+            changed, skipped = listing, 0
+        else:
+            changed, skipped = select_changed(listing, state)
+        logger.info(
+            "Refresh %r (r/%s): %d new or changed, %d unchanged",
+            query,
+            subreddit or "all",
+            len(changed),
+            skipped,
+        )
+
+        if changed:
+            connector.expand_comments(changed, replace_more_limit=None, priority=priority)
+            records = RedditIndexUtils.extract_records(changed)
+            self.index_records(records, query)
+            self._freshness.record(query, subreddit, records)
+        else:
+            self._freshness.touch(query, subreddit)
+        return len(changed)
+
+    def upsert_stream(
+        self,
+        query: str,
+        subreddit: Optional[str] = None,
+        limit: int = 100,
+        *,
+        priority: Priority = Priority.BACKGROUND,
+        batch_size: Optional[int] = None,
+    ) -> int:
+        """Streaming upsert for large backfills; returns the number of submissions.
+
+        Submissions are mapped, embedded and written to Qdrant/Meilisearch in
+        micro-batches of about ``batch_size`` posts + comments while the connector
+        keeps fetching. Only the current micro-batch and the connector's
+        look-ahead window are held in memory, and results become searchable
+        before the whole fetch completes.
+        """
+        if not query or not query.strip():
+            return 0
+
+        submissions = self._connector().iter_search(
+            query=query,
+            subreddit=subreddit,
+            limit=limit,
+            include_comments=True,
+            replace_more_limit=None,
+            priority=priority,
+        )
+        records = RedditIndexUtils.iter_records(submissions)
+        count = 0
+        for batch in RedditIndexUtils.batch_records(
+            records, batch_size or settings.index_batch_size
+        ):
+            self.index_records(batch, query)
+            self._freshness.record(query, subreddit, batch)
+            count += len(batch)
+        return count
+
+    def index_records(self, records: List[SubmissionRecord], query: str) -> None:
+        """Embed and write already-extracted records to Qdrant and Meilisearch."""
+        if not records:
+            return
+
         # Convert domain objects to LlamaIndex nodes with structured metadata.
-        nodes = RedditIndexUtils.map_submissions_to_text_nodes(results, query)
+        nodes = RedditIndexUtils.records_to_text_nodes(records, query)
+
+        # Skip embedding reposts and copy-pasted comments; they stay searchable
+        # through the lexical index.
+        dropped: Dict[str, str] = {}
+        if self._dedup is not None:
+            with track_stage("dedup", items=len(nodes)):
+                dedup = self._dedup.filter(nodes)
+            nodes, dropped = dedup.nodes, dedup.dropped
+            self._record_duplicates(dedup.merged_into_existing)
+
+        # Split texts longer than the model's token limit instead of letting it
+        # truncate them, then order by length so each embedding batch holds
+        # similarly sized texts (little padding, tiny comments packed together).
+        embed_model = registry.embed_model(self._embed_model)
+        with track_stage("chunk") as stage:
+            nodes = self._text_chunker(embed_model).chunk_nodes(nodes)
+            stage.add(len(nodes))
+        nodes.sort(key=lambda n: len(n.text or ""))
+
+        # Embed only what the cache does not already hold, then upsert the nodes
+        # as-is: VectorStoreIndex skips embedding for nodes that carry a vector.
+        # Large threads are written in slices to bound peak memory.
+        index: Optional[VectorStoreIndex] = None
+        step = max(1, settings.index_batch_size)
+        for start in range(0, len(nodes), step):
+            chunk = nodes[start : start + step]
+            self._embed_nodes(chunk, embed_model)
+            if index is None:
+                # The first vectors give the dimension the collection is created with.
+                self.ensure_collection(len(chunk[0].embedding or ()))
+                index = self._vector_index(embed_model)
+            with track_stage("qdrant_write", items=len(chunk)):
+                index.insert_nodes(chunk)
+            INDEX_BYTES_WRITTEN_TOTAL.labels(sink="qdrant").inc(
+                sum(len(n.text or "") + 4 * len(n.embedding or ()) for n in chunk)
+            )
 
-        # Ensure collection exists and upsert using the configured embedding model.
-        vector_store = QdrantVectorStore(client=self._client, collection_name=self._collection_name)
-        storage_context = StorageContext.from_defaults(vector_store=vector_store)
-        VectorStoreIndex.from_documents(
-            nodes, storage_context=storage_context, embed_model=self._embed_model
+        # Chunk ids depend on the chunk count, so a post that was edited into
+        # more, fewer or no chunks leaves points behind. Drop every point of
+        # the written (or now duplicate) documents that this write did not replace.
+        self._delete_stale_points(
+            {n.metadata.get("doc_id") for n in nodes} | set(dropped), [n.node_id for n in nodes]
         )
 
-        # Also index into Meilisearch (BM25) for lexical search.
-        # Use the same collection/index name for parity with Qdrant.
+        # Also index into Meilisearch (BM25) for lexical search. Documents are
+        # buffered and shipped in batches by a background thread.
+        documents = RedditIndexUtils.records_to_meili_documents(records, query)
+        if dropped:
+            provenance = {
+                n.metadata.get("doc_id"): n.metadata["duplicate_ids"]
+                for n in nodes
+                if "duplicate_ids" in n.metadata
+            }
+            for doc in documents:
+                if doc.get("id") in provenance:
+                    doc["duplicate_ids"] = provenance[doc["id"]]
+                elif doc.get("id") in dropped:
+                    doc["duplicate_of"] = dropped[doc["id"]]
+        ingestor = self._meili()
+        if ingestor is not None:
+            # In sync mode, wait for task completion so tests can assert
+            # immediate availability.
+            ingestor.add(documents, wait=self._meili_sync)
+
+        # The vectors are searchable now, so cached /search results are stale.
+        # Buffered Meilisearch documents invalidate them again once applied
+        # (``_invalidate_cache`` is the ingestor's ``on_applied``), so results
+        # cached in between, without the new lexical hits, are not served on.
+        self._invalidate_cache()
+
+    def ensure_collection(self, vector_size: int) -> None:
+        """Create the collection with the configured layout and payload indexes.
+
+        Runs once per instance, before the vector store first touches the
+        collection; see ``collection.py`` for the settings involved. The
+        Meilisearch index gets its filterable attributes at the same time.
+        """
+        if not self._collection_ready:
+            ensure_collection(self._client, self._collection_name, vector_size)
+            self.ensure_search_settings()
+            self._collection_ready = True
+
+    def ensure_search_settings(self) -> bool:
+        """Declare ``MEILI_FILTERABLE_ATTRIBUTES`` on the Meilisearch index (best-effort).
+
+        The worker calls it at startup, so attributes added to the list take
+        effect on existing indexes without waiting for the next ingestion.
+        """
+        ingestor = self._meili()
+        return ingestor is not None and ingestor.apply_settings()
+
+    def _record_duplicates(self, merged: Dict[str, List[str]]) -> None:
+        """Update ``duplicate_ids`` of canonical points written by earlier upserts.
+
+        Points are selected by ``doc_id`` so every chunk of a chunked canonical
+        is updated too.
+        """
+        for canonical, ids in merged.items():
+            try:
+                self._client.set_payload(
+                    collection_name=self._collection_name,
+                    payload={"duplicate_ids": ids},
+                    points=_doc_filter([canonical]),
+                )
+            except Exception as exc:
+                record_swallowed("dedup", exc)
+                logger.warning("Could not record duplicates of %s", canonical, exc_info=True)
+
+    def _delete_stale_points(self, doc_ids: Set[Optional[str]], keep: List[str]) -> None:
+        """Delete points of ``doc_ids`` other than ``keep`` (best-effort)."""
+        doc_ids.discard(None)
+        if not doc_ids or not self._collection_ready:
+            return
+        selector = _doc_filter(sorted(doc_ids))
+        if keep:
+            selector.must_not = [qmodels.HasIdCondition(has_id=keep)]
         try:
-            meili_client = meilisearch.Client(settings.meili_url, settings.meili_master_key)
-            index = meili_client.index(self._collection_name)
-            documents = RedditIndexUtils.map_submissions_to_meili_documents(results, query)
-            task = index.add_documents(documents, "id")
-            # Wait for task completion so tests can assert immediate availability.
-            task_uid = None
-            if isinstance(task, dict):
-                task_uid = task.get("taskUid") or task.get("uid")
+            self._client.delete(
+                collection_name=self._collection_name, points_selector=selector, wait=False
+            )
+        except Exception as exc:
+            record_swallowed("qdrant_delete", exc)
+            logger.warning(
+                "Could not delete stale points of %d documents", len(doc_ids), exc_info=True
+            )
+
+    def _remember(
+        self, query: str, subreddit: Optional[str], records: List[SubmissionRecord]
+    ) -> None:
+        """Fold indexed submissions into the (query, subreddit) freshness state."""
+        self._freshness.record(query, subreddit, records)
+
+    def _connector(self) -> RedditConnector:
+        # Built once: the connector keeps a PRAW client per pool thread.
+        if self._reddit_connector is None:
+            if is_fake_mode():
+                self._reddit_connector = RedditConnector(
+                    reddit=fake_backends().reddit, max_concurrency=settings.queue_concurrency
+                )
             else:
-                # Support SDKs that return a Task object
-                task_uid = (
-                    getattr(task, "taskUid", None)
-                    or getattr(task, "uid", None)
-                    or getattr(task, "task_uid", None)
+                self._reddit_connector = RedditConnector(
+                    client_id=settings.reddit_client_id,
+                    client_secret=settings.reddit_client_secret,
+                    user_agent=settings.reddit_user_agent,
+                    max_concurrency=settings.queue_concurrency,
                 )
-            if task_uid is not None:
-                meili_client.wait_for_task(task_uid)
-        except Exception:
-            # Best-effort: do not fail the overall indexing if Meilisearch is unavailable.
-            pass
+        return self._reddit_connector
 
-        return results
+    def _invalidate_cache(self) -> None:
+        invalidate_collection(self._collection_name, self._redis_client())
+
+    def _redis_client(self) -> Any:
+        if self._redis is None:
+            import redis
+
+            self._redis = redis.Redis.from_url(settings.redis_url, socket_connect_timeout=1.0)
+        return self._redis
+
+    def _text_chunker(self, embed_model: BaseEmbedding) -> TextChunker:
+        if self._chunker is None:
+            self._chunker = TextChunker.for_embed_model(embed_model)
+        return self._chunker
+
+    def _vector_index(self, embed_model: BaseEmbedding) -> VectorStoreIndex:
+        """Return the long-lived index over the Qdrant collection."""
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    vector_store = QdrantVectorStore(
+                        client=self._client, collection_name=self._collection_name
+                    )
+                    self._index = VectorStoreIndex.from_vector_store(
+                        vector_store, embed_model=embed_model
+                    )
+        return self._index
+
+    def _meili(self) -> Optional[MeiliIngestor]:
+        """Return the batched Meilisearch ingestor (same index name as Qdrant)."""
+        if self._meili_ingestor is None:
+            with self._index_lock:
+                if self._meili_ingestor is None:
+                    try:
+                        if is_fake_mode():
+                            client = fake_backends().meili_client()
+                        else:
+                            client = meilisearch.Client(
+                                settings.meili_url, settings.meili_master_key
+                            )
+                        self._meili_ingestor = MeiliIngestor(
+                            client,
+                            self._collection_name,
+                            batch_size=settings.meili_batch_size,
+                            flush_interval_seconds=settings.meili_flush_interval_seconds,
+                            filterable_attributes=MEILI_FILTERABLE_ATTRIBUTES,
+                            on_applied=self._invalidate_cache,
+                        )
+                    except Exception as exc:
+                        # Best-effort: do not fail the overall indexing if Meilisearch
+                        # is unavailable.
+                        record_swallowed("meili_write", exc)
+                        logger.warning("Meilisearch client unavailable", exc_info=True)
+                        return None
+        return self._meili_ingestor
+
+    def _embed_nodes(self, nodes: List[TextNode], embed_model: BaseEmbedding) -> None:
+        """Attach an embedding to every node, reusing cached vectors on hash hits."""
+        texts = [n.get_content(metadata_mode=MetadataMode.EMBED) for n in nodes]
+        if self._embedding_cache is not None:
+            vectors = self._embedding_cache.get_many(texts)
+        else:
+            vectors = [None] * len(texts)
+
+        # Embed each distinct missing text once (reposted comments share vectors).
+        missing = list(dict.fromkeys(t for t, v in zip(texts, vectors, strict=True) if v is None))
+        missing.sort(key=len)
+        if missing:
+            EMBEDDING_BATCH_SIZE.observe(len(missing))
+            with track_stage("embed", items=len(missing)):
+                fresh = self._embed_texts(missing, embed_model)
+            by_text = dict(zip(missing, fresh, strict=True))
+            vectors = [
+                v if v is not None else by_text[t] for t, v in zip(texts, vectors, strict=True)
+            ]
+            if self._embedding_cache is not None:
+                self._embedding_cache.put_many(missing, fresh)
+
+        for node, vector in zip(nodes, vectors, strict=True):
+            node.embedding = vector
+
+    def _embed_texts(self, texts: List[str], embed_model: BaseEmbedding) -> List[List[float]]:
+        """Embed in the shared process pool if one was started, else in-process."""
+        pool = shared_pool(embed_model)
+        if pool is None:
+            return embed_model.get_text_embedding_batch(texts)
+        return pool.embed(texts)
+
+
+def _doc_filter(doc_ids: List[str]) -> qmodels.Filter:
+    """Points whose ``doc_id`` (the Reddit id, shared by all chunks) is in ``doc_ids``."""
+    return qmodels.Filter(
+        must=[qmodels.FieldCondition(key="doc_id", match=qmodels.MatchAny(any=doc_ids))]
+    )
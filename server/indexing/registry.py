@@ -0,0 +1,94 @@
+"""Process-wide registry of long-lived indexing resources.
+
+Resolving an embedding alias such as ``local:BAAI/bge-small-en-v1.5`` loads the
+HuggingFace weights, which takes seconds. The registry resolves each alias once
+per process, warms the model up at application startup and exposes a readiness
+flag that only flips once that warm-up batch has been embedded.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from ..config import settings
+
+if TYPE_CHECKING:
+    from llama_index.core.base.embeddings.base import BaseEmbedding
+
+logger = logging.getLogger(__name__)
+
+_WARMUP_TEXTS = [
+    "warm-up",
+    "What is the best Python web framework for a small REST API?",
+    "I have been using FastAPI for a year and the dependency injection is great.",
+]
+
+
+def resolve_embed_spec(model_id: Optional[str] = None) -> str:
+    """Map ``settings.embedding_model_id`` to a LlamaIndex embedding alias.
+
+    HuggingFace ids (e.g. ``"BAAI/bge-small-en-v1.5"``) become ``"local:<id>"`` so
+    LlamaIndex loads the local provider; other values ("default", OpenAI ids)
+    are passed through.
+    """
+    model_id = model_id or settings.embedding_model_id
+    if model_id.startswith("local:"):
+        return model_id
+    if "/" in model_id:
+        return f"local:{model_id}"
+    return model_id
+
+
+def resolve_embed_model(spec: str) -> BaseEmbedding:
+    """Build the LlamaIndex embedding model for ``spec``.
+
+    llama_index is imported here rather than at module level: it takes over a
+    second to import and is not needed until the first model is resolved.
+    """
+    from llama_index.core.embeddings.utils import resolve_embed_model as _resolve
+
+    return _resolve(spec)
+
+
+class ModelRegistry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._embed_models: Dict[str, BaseEmbedding] = {}
+        self._ready = threading.Event()
+
+    def embed_model(self, spec: Any = None) -> BaseEmbedding:
+        """Return the embedding model for ``spec``, loading it at most once.
+
+        ``spec`` may be an alias string, ``None`` (configured model) or an
+        already-built embedding instance, which is returned unchanged.
+        """
+        if spec is not None and not isinstance(spec, str):
+            return spec
+        key = spec or resolve_embed_spec()
+        model = self._embed_models.get(key)
+        if model is not None:
+            return model
+        with self._lock:
+            model = self._embed_models.get(key)
+            if model is None:
+                model = resolve_embed_model(key)
+                self._embed_models[key] = model
+        return model
+
+    def warm_up(self, spec: Any = None) -> None:
+        """Load the embedding model and embed a small batch, then mark ready."""
+        model = self.embed_model(spec)
+        model.get_text_embedding_batch(_WARMUP_TEXTS)
+        self._ready.set()
+        logger.info("Embedding model warmed up: %s", getattr(model, "model_name", spec))
+
+    def mark_ready(self) -> None:
+        self._ready.set()
+
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+
+registry = ModelRegistry()
@@ -0,0 +1,3 @@
+from .queue import IndexJob, JobQueue, build_job_queue
+
+__all__ = ["IndexJob", "JobQueue", "build_job_queue"]
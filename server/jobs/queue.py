@@ -0,0 +1,311 @@
+"""Redis-backed queue of background indexing jobs.
+
+A job refreshes one ``(query, subreddit)`` in the index. Keys, per collection:
+
+- ``reddit_mcp:jobs:<collection>:pending``: list of job ids waiting for a worker;
+- ``reddit_mcp:jobs:<collection>:processing:<worker>``: job ids a worker has
+  claimed (moved there atomically with ``BLMOVE``) and not yet completed;
+- ``reddit_mcp:jobs:<collection>:workers``: set of worker ids that may own a
+  processing list, and ``...:worker:<worker>``: heartbeat key of a live worker;
+- ``reddit_mcp:jobs:<collection>:job:<id>``: hash with the job and its status;
+- ``reddit_mcp:jobs:<collection>:active:<digest>``: id of the queued or running
+  job for a normalised ``(query, subreddit)``, claimed with ``SET NX`` once the
+  job hash is written, so concurrent requests for the same pair collapse into
+  one job; it is only ever deleted by a compare-and-delete script;
+- ``reddit_mcp:jobs:<collection>:done:<id>``: pub/sub channel announcing the
+  final status of a job.
+
+The ``active`` key expires after ``JOB_ACTIVE_TTL_SECONDS`` so a worker that dies
+mid-job cannot block its ``(query, subreddit)`` forever; job hashes expire after
+``JOB_TTL_SECONDS``.
+
+Claims are at-least-once: a worker refreshes its heartbeat (expiring after
+``JOB_HEARTBEAT_TTL_SECONDS``) while it is alive, and :meth:`JobQueue.recover`,
+run when a worker starts, puts the unfinished jobs of workers whose heartbeat
+has expired back on the pending list.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import settings
+from ..metrics import INDEX_JOBS_TOTAL
+from ..retrieval.cache import normalize_query
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "reddit_mcp:jobs:"
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+FINAL_STATUSES = (SUCCEEDED, FAILED)
+
+# Compare-and-delete, so a pointer replaced by another caller is left alone.
+_DELETE_IF_EQUAL = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass
+class IndexJob:
+    id: str
+    query: str
+    subreddit: Optional[str] = None
+    limit: int = 100
+    # Name of a ``connectors.rate_limit.Priority`` member.
+    priority: str = "BACKGROUND"
+    status: str = QUEUED
+    enqueued_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    indexed: Optional[int] = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in FINAL_STATUSES
+
+    def to_hash(self) -> Dict[str, str]:
+        return {k: json.dumps(v) for k, v in asdict(self).items()}
+
+    @classmethod
+    def from_hash(cls, raw: Dict[Any, Any]) -> "IndexJob":
+        data = {(k.decode() if isinstance(k, bytes) else k): json.loads(v) for k, v in raw.items()}
+        return cls(**{k: v for k, v in data.items() if k in cls.__dataclass_fields__})
+
+
+class JobQueue:
+    """Enqueue, claim and complete indexing jobs on a ``redis.asyncio`` client."""
+
+    def __init__(
+        self,
+        client: Any,
+        collection_name: str = "reddit_mcp_posts",
+        *,
+        active_ttl_seconds: int = 900,
+        job_ttl_seconds: int = 86400,
+        heartbeat_ttl_seconds: int = 60,
+        worker_id: Optional[str] = None,
+    ) -> None:
+        self._client = client
+        self._prefix = f"{KEY_PREFIX}{collection_name}:"
+        self._active_ttl = active_ttl_seconds
+        self._job_ttl = job_ttl_seconds
+        self._heartbeat_ttl = heartbeat_ttl_seconds
+        self.worker_id = worker_id or uuid.uuid4().hex
+        self._delete_if_equal = client.register_script(_DELETE_IF_EQUAL)
+
+    @property
+    def heartbeat_interval(self) -> float:
+        """How often a busy worker should call :meth:`heartbeat`."""
+        return self._heartbeat_ttl / 3
+
+    @property
+    def pending_key(self) -> str:
+        return f"{self._prefix}pending"
+
+    @property
+    def workers_key(self) -> str:
+        return f"{self._prefix}workers"
+
+    def processing_key(self, worker_id: Optional[str] = None) -> str:
+        return f"{self._prefix}processing:{worker_id or self.worker_id}"
+
+    def heartbeat_key(self, worker_id: Optional[str] = None) -> str:
+        return f"{self._prefix}worker:{worker_id or self.worker_id}"
+
+    def job_key(self, job_id: str) -> str:
+        return f"{self._prefix}job:{job_id}"
+
+    def active_key(self, query: str, subreddit: Optional[str]) -> str:
+        raw = json.dumps([normalize_query(query), (subreddit or "").casefold()])
+        return f"{self._prefix}active:{hashlib.sha256(raw.encode('utf-8')).hexdigest()}"
+
+    def channel(self, job_id: str) -> str:
+        return f"{self._prefix}done:{job_id}"
+
+    async def enqueue(
+        self,
+        query: str,
+        subreddit: Optional[str] = None,
+        limit: int = 100,
+        *,
+        priority: str = "BACKGROUND",
+    ) -> Tuple[IndexJob, bool]:
+        """Queue a refresh of ``(query, subreddit)``; returns the job and whether it is new.
+
+        If a job for the same normalised pair is already queued or running, that
+        job is returned instead of queueing another one.
+        """
+        job = IndexJob(
+            id=uuid.uuid4().hex,
+            query=query,
+            subreddit=subreddit,
+            limit=limit,
+            priority=priority,
+            enqueued_at=time.time(),
+        )
+        active = self.active_key(query, subreddit)
+        # Write the hash before publishing its id: a concurrent caller that finds
+        # the pointer must be able to load the job, or it would take it as stale.
+        await self._save(job)
+        while True:
+            if await self._client.set(active, job.id, nx=True, ex=self._active_ttl):
+                break
+            existing_id = await self._client.get(active)
+            if existing_id is None:
+                # The active job finished between SET NX and GET; try again.
+                continue
+            existing = await self.get(_text(existing_id))
+            if existing is not None and not existing.done:
+                await self._client.delete(self.job_key(job.id))
+                INDEX_JOBS_TOTAL.labels(outcome="deduplicated").inc()
+                return existing, False
+            # Stale pointer (job hash expired or already final): release it, unless
+            # another caller already replaced it, and race for it again.
+            await self._release(active, existing_id)
+
+        await self._client.lpush(self.pending_key, job.id)
+        INDEX_JOBS_TOTAL.labels(outcome="enqueued").inc()
+        return job, True
+
+    async def get(self, job_id: str) -> Optional[IndexJob]:
+        raw = await self._client.hgetall(self.job_key(job_id))
+        return IndexJob.from_hash(raw) if raw else None
+
+    async def heartbeat(self) -> None:
+        """Mark this worker alive so :meth:`recover` leaves its claimed jobs alone."""
+        await self._client.sadd(self.workers_key, self.worker_id)
+        await self._client.set(self.heartbeat_key(), b"1", ex=self._heartbeat_ttl)
+
+    async def claim(self, timeout: float = 5.0) -> Optional[IndexJob]:
+        """Move the oldest pending job to this worker's processing list and mark it running.
+
+        Returns ``None`` after ``timeout``. The job stays on the processing list
+        until :meth:`complete`, so it survives a crash of this worker.
+        """
+        await self.heartbeat()
+        job_id = await self._client.blmove(
+            self.pending_key, self.processing_key(), timeout, "RIGHT", "LEFT"
+        )
+        if job_id is None:
+            return None
+        await self.heartbeat()
+        job = await self.get(_text(job_id))
+        if job is None:
+            # Job hash expired while queued: nothing left to run.
+            await self._client.lrem(self.processing_key(), 0, job_id)
+            return None
+        job.status = RUNNING
+        job.started_at = time.time()
+        await self._save(job)
+        return job
+
+    async def complete(
+        self, job: IndexJob, *, indexed: Optional[int] = None, error: Optional[str] = None
+    ) -> None:
+        """Record the final status, release the ``(query, subreddit)`` and notify waiters."""
+        job.status = FAILED if error is not None else SUCCEEDED
+        job.finished_at = time.time()
+        job.indexed = indexed
+        job.error = error
+        await self._save(job)
+        await self._release(self.active_key(job.query, job.subreddit), job.id)
+        await self._client.lrem(self.processing_key(), 0, job.id)
+        await self._client.publish(self.channel(job.id), job.status)
+        INDEX_JOBS_TOTAL.labels(outcome=job.status).inc()
+
+    async def recover(self) -> int:
+        """Requeue the unfinished jobs of workers whose heartbeat has expired.
+
+        Returns the number of jobs put back on the pending list, where they are
+        claimed next. Concurrent calls recover each dead worker only once.
+        """
+        requeued = 0
+        for raw in await self._client.smembers(self.workers_key):
+            worker_id = _text(raw)
+            if worker_id == self.worker_id or await self._client.exists(
+                self.heartbeat_key(worker_id)
+            ):
+                continue
+            if not await self._client.srem(self.workers_key, worker_id):
+                continue  # Another worker is recovering it.
+            processing = self.processing_key(worker_id)
+            for job_id in await self._client.lrange(processing, 0, -1):
+                job = await self.get(_text(job_id))
+                if job is None or job.done:
+                    continue
+                job.status = QUEUED
+                job.started_at = None
+                await self._save(job)
+                await self._client.rpush(self.pending_key, job.id)
+                INDEX_JOBS_TOTAL.labels(outcome="requeued").inc()
+                requeued += 1
+            await self._client.delete(processing)
+        if requeued:
+            logger.warning("Requeued %d jobs left by stopped workers", requeued)
+        return requeued
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[IndexJob]:
+        """Wait up to ``timeout`` seconds for a job to finish; returns its latest state."""
+        pubsub = self._client.pubsub()
+        await pubsub.subscribe(self.channel(job_id))
+        try:
+            # Subscribe first, then read: a completion between the two is not lost.
+            job = await self.get(job_id)
+            if job is None or job.done:
+                return job
+            deadline = time.monotonic() + timeout
+            while (remaining := deadline - time.monotonic()) > 0:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=min(remaining, 1.0)
+                )
+                if message is not None:
+                    break
+            return await self.get(job_id)
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+    async def _release(self, active: str, job_id: Any) -> None:
+        """Delete the ``active`` pointer if it still holds ``job_id``."""
+        await self._delete_if_equal(keys=[active], args=[job_id])
+
+    async def _save(self, job: IndexJob) -> None:
+        await self._client.hset(self.job_key(job.id), mapping=job.to_hash())
+        await self._client.expire(self.job_key(job.id), self._job_ttl)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def _text(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else str(value)
+
+
+def build_job_queue(collection_name: Optional[str] = None) -> Optional[JobQueue]:
+    """Build the queue from settings; ``JOB_QUEUE_ENABLED=false`` disables it."""
+    if not settings.job_queue_enabled:
+        return None
+    import redis.asyncio
+
+    client = redis.asyncio.Redis.from_url(settings.redis_url, socket_connect_timeout=1.0)
+    return JobQueue(
+        client,
+        collection_name or settings.qdrant_collection,
+        active_ttl_seconds=settings.job_active_ttl_seconds,
+        job_ttl_seconds=settings.job_ttl_seconds,
+        heartbeat_ttl_seconds=settings.job_heartbeat_ttl_seconds,
+    )
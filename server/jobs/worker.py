@@ -0,0 +1,140 @@
+"""Indexing worker: consumes jobs from the Redis queue and refreshes the index.
+
+Run one or more per deployment, separately from the API processes::
+
+    python -m server.jobs.worker
+
+Each worker runs one job at a time (``RedditQueryIndex.refresh`` in a thread, so
+the event loop keeps the Redis connection alive) and exposes its Prometheus
+metrics on ``WORKER_METRICS_PORT``. SIGTERM/SIGINT finish the current job and
+then stop. A worker keeps its heartbeat fresh while it runs a job and, when it
+starts, requeues the jobs that workers which died mid-job had claimed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import signal
+import time
+from typing import Any, Optional, Sequence
+
+from ..config import settings
+from ..connectors.rate_limit import Priority
+from ..metrics import INDEX_JOB_DURATION_SECONDS, INDEX_JOB_QUEUE_WAIT_SECONDS, record_swallowed
+from .queue import IndexJob, JobQueue, build_job_queue
+
+logger = logging.getLogger(__name__)
+
+
+class JobWorker:
+    def __init__(self, queue: JobQueue, index: Any, *, poll_seconds: float = 5.0) -> None:
+        self._queue = queue
+        self._index = index
+        self._poll = poll_seconds
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run(self) -> None:
+        try:
+            await self._queue.recover()
+        except Exception as exc:
+            record_swallowed("job_recover", exc)
+            logger.warning("Could not requeue jobs of stopped workers", exc_info=True)
+        while not self._stopping.is_set():
+            try:
+                await self.run_once()
+            except Exception:
+                # Redis unreachable: back off instead of spinning.
+                logger.warning("Job queue unavailable; retrying", exc_info=True)
+                await asyncio.sleep(self._poll)
+
+    async def run_once(self) -> Optional[IndexJob]:
+        """Claim and run at most one job; returns it, or ``None`` if none was queued."""
+        job = await self._queue.claim(timeout=self._poll)
+        if job is None:
+            return None
+        INDEX_JOB_QUEUE_WAIT_SECONDS.observe(max(0.0, (job.started_at or 0.0) - job.enqueued_at))
+        logger.info("Running job %s: %r (r/%s)", job.id, job.query, job.subreddit or "all")
+        started = time.perf_counter()
+        beat = asyncio.create_task(self._heartbeat())
+        try:
+            indexed = await asyncio.to_thread(self._refresh, job)
+        except Exception as exc:
+            logger.exception("Job %s failed", job.id)
+            await self._queue.complete(job, error=f"{type(exc).__name__}: {exc}")
+        else:
+            await self._queue.complete(job, indexed=indexed)
+        finally:
+            beat.cancel()
+        INDEX_JOB_DURATION_SECONDS.observe(time.perf_counter() - started)
+        return job
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self._queue.heartbeat_interval)
+            try:
+                await self._queue.heartbeat()
+            except Exception as exc:
+                record_swallowed("job_heartbeat", exc)
+                logger.warning("Job heartbeat failed", exc_info=True)
+
+    def _refresh(self, job: IndexJob) -> int:
+        priority = Priority.__members__.get(job.priority, Priority.BACKGROUND)
+        return self._index.refresh(job.query, job.subreddit, job.limit, priority=priority)
+
+
+async def _main(collection_name: Optional[str], poll_seconds: float) -> None:
+    from ..indexing.embed_pool import start_shared_pool
+    from ..indexing.reddit_query_index import RedditQueryIndex
+    from ..indexing.registry import registry, resolve_embed_spec
+
+    queue = build_job_queue(collection_name)
+    if queue is None:
+        raise SystemExit("JOB_QUEUE_ENABLED is false; nothing to consume")
+    index = RedditQueryIndex(collection_name=collection_name)
+    # Search filters need these even before this worker ingests anything.
+    await asyncio.to_thread(index.ensure_search_settings)
+    if settings.embed_workers > 0:
+        # Load the model and fork the embedding pool before this process runs
+        # any inference of its own; the pool workers do all the embedding.
+        spec = resolve_embed_spec()
+        await asyncio.to_thread(lambda: start_shared_pool(registry.embed_model(spec), spec))
+    elif settings.embedding_warmup:
+        await asyncio.to_thread(registry.warm_up)
+
+    worker = JobWorker(queue, index, poll_seconds=poll_seconds)
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, worker.stop)
+    logger.info("Indexing worker consuming %s", queue.pending_key)
+    try:
+        await worker.run()
+    finally:
+        await queue.aclose()
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Consume background indexing jobs.")
+    parser.add_argument("--collection", help="Qdrant collection (default: QDRANT_COLLECTION)")
+    parser.add_argument(
+        "--poll-seconds", type=float, default=5.0, help="blocking pop timeout per iteration"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    logging.basicConfig(level=settings.log_level)
+    if settings.worker_metrics_port > 0:
+        from prometheus_client import start_http_server
+
+        start_http_server(settings.worker_metrics_port)
+    asyncio.run(_main(args.collection, args.poll_seconds))
+
+
+if __name__ == "__main__":
+    main()
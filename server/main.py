@@ -1,11 +1,57 @@
+import asyncio
+import importlib
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from prometheus_client import make_asgi_app
 
+from .config import settings
+from .indexing.registry import registry
 from .metrics import instrument_app
+from .routes.jobs import router as jobs_router
 from .routes.search import router as search_router
 
-app = FastAPI(title="Reddit MCP Service")
+logger = logging.getLogger(__name__)
+
+
+# Heavy modules the package imports lazily; loaded after startup so the first
+# request does not pay for them.
+_PRELOAD_MODULES = (
+    "qdrant_client",
+    "llama_index.core",
+    "server.indexing.reddit_query_index",
+)
+
+
+def _preload() -> None:
+    for name in _PRELOAD_MODULES:
+        importlib.import_module(name)
+
+
+async def _warm_up() -> None:
+    try:
+        await asyncio.to_thread(_preload)
+        if settings.embedding_warmup:
+            await asyncio.to_thread(registry.warm_up)
+        else:
+            registry.mark_ready()
+    except Exception:
+        logger.exception("Warm-up failed; service stays not ready")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so /healthz answers while modules and the
+    # embedding model load; /readyz reports 503 until both are done.
+    task = asyncio.create_task(_warm_up())
+    yield
+    if not task.done():
+        task.cancel()
+
+
+app = FastAPI(title="Reddit MCP Service", lifespan=lifespan)
 
 
 @app.get("/healthz")
@@ -13,6 +59,13 @@ async def healthz() -> JSONResponse:
     return JSONResponse({"status": "ok"})
 
 
+@app.get("/readyz")
+async def readyz() -> JSONResponse:
+    if registry.is_ready():
+        return JSONResponse({"status": "ready"})
+    return JSONResponse({"status": "warming_up"}, status_code=503)
+
+
 # Note: Metrics are served by the mounted ASGI app at /metrics
 
 # Mount Prometheus metrics ASGI app
@@ -21,6 +74,7 @@ app.mount("/metrics", metrics_app)
 
 # Routers
 app.include_router(search_router)
+app.include_router(jobs_router)
 
 # Metrics middleware
 instrument_app(app)
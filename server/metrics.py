@@ -1,9 +1,11 @@
+import re
 import time
-from typing import Callable
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
 
-from fastapi import Request, Response
 from prometheus_client import Counter, Gauge, Histogram
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.routing import BaseRoute, Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 # Prometheus metrics
 HTTP_REQUESTS_TOTAL = Counter(
@@ -35,38 +37,237 @@ HTTP_REQUESTS_IN_PROGRESS = Gauge(
     "http_requests_in_progress", "HTTP requests in progress", labelnames=("method", "path")
 )
 
+SEARCH_CACHE_REQUESTS_TOTAL = Counter(
+    "search_cache_requests_total",
+    "Search result cache lookups",
+    labelnames=("result",),
+)
+
+SEMANTIC_CACHE_REQUESTS_TOTAL = Counter(
+    "semantic_cache_requests_total",
+    "Semantic (query embedding) cache lookups",
+    labelnames=("result",),
+)
+
+RERANK_REQUESTS_TOTAL = Counter(
+    "rerank_requests_total",
+    "LLM re-rank requests by outcome",
+    labelnames=("outcome",),
+)
+
+RERANK_DURATION_SECONDS = Histogram(
+    "rerank_duration_seconds",
+    "LLM re-rank latency in seconds",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0),
+)
+
+LLM_TOKENS_TOTAL = Counter(
+    "llm_tokens_total",
+    "LLM tokens consumed",
+    labelnames=("stage", "kind"),
+)
+
+# Indexing pipeline stages: reddit_search, replace_more, map_records, map_nodes,
+# map_documents, dedup, chunk, embed, qdrant_write, meili_write, meili_wait.
+INDEX_STAGE_DURATION_SECONDS = Histogram(
+    "index_stage_duration_seconds",
+    "Indexing pipeline stage duration in seconds",
+    labelnames=("stage",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+INDEX_STAGE_CALLS_TOTAL = Counter(
+    "index_stage_calls_total",
+    "Indexing pipeline stage invocations",
+    labelnames=("stage", "outcome"),
+)
+
+INDEX_STAGE_ITEMS_TOTAL = Counter(
+    "index_stage_items_total",
+    "Items (submissions, comments, nodes, documents) processed per indexing stage",
+    labelnames=("stage",),
+)
+
+REDDIT_COMMENTS_EXPANDED_TOTAL = Counter(
+    "reddit_comments_expanded_total",
+    "Comments loaded by expanding submission comment forests",
+)
+
+EMBEDDING_BATCH_SIZE = Histogram(
+    "embedding_batch_size",
+    "Texts sent to the embedding model per call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024),
+)
+
+INDEX_BYTES_WRITTEN_TOTAL = Counter(
+    "index_bytes_written_total",
+    "Approximate bytes written to the indexes (text plus vectors)",
+    labelnames=("sink",),
+)
+
+SWALLOWED_EXCEPTIONS_TOTAL = Counter(
+    "swallowed_exceptions_total",
+    "Exceptions logged and tolerated by best-effort code paths",
+    labelnames=("stage", "exception"),
+)
+
+# Background indexing jobs: enqueued, deduplicated, requeued, succeeded, failed.
+INDEX_JOBS_TOTAL = Counter(
+    "index_jobs_total",
+    "Background indexing jobs by outcome",
+    labelnames=("outcome",),
+)
+
+INDEX_JOB_DURATION_SECONDS = Histogram(
+    "index_job_duration_seconds",
+    "Background indexing job run time in seconds (claim to completion)",
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+
+INDEX_JOB_QUEUE_WAIT_SECONDS = Histogram(
+    "index_job_queue_wait_seconds",
+    "Time background indexing jobs spend queued before a worker claims them",
+    buckets=(0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+
+
+class StageTimer:
+    """Handle yielded by :func:`track_stage`; counts the items a stage processed."""
+
+    def __init__(self, stage: str) -> None:
+        self.stage = stage
+
+    def add(self, items: int) -> None:
+        if items > 0:
+            INDEX_STAGE_ITEMS_TOTAL.labels(stage=self.stage).inc(items)
+
+
+@contextmanager
+def track_stage(stage: str, items: Optional[int] = None) -> Iterator[StageTimer]:
+    """Time an indexing stage and count its calls (ok/error) and items."""
+    timer = StageTimer(stage)
+    if items is not None:
+        timer.add(items)
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield timer
+        outcome = "ok"
+    finally:
+        INDEX_STAGE_DURATION_SECONDS.labels(stage=stage).observe(time.perf_counter() - start)
+        INDEX_STAGE_CALLS_TOTAL.labels(stage=stage, outcome=outcome).inc()
+
+
+def record_swallowed(stage: str, exc: BaseException) -> None:
+    """Count an exception that a best-effort path logs and then ignores."""
+    SWALLOWED_EXCEPTIONS_TOTAL.labels(stage=stage, exception=type(exc).__name__).inc()
+
+
+# Label for requests that matched no route (404s, scanners probing random URLs),
+# so unknown paths cannot create unbounded label sets.
+UNMATCHED_PATH = "__unmatched__"
+
+# Any other method (WebDAV verbs, garbage from scanners) is labelled "OTHER".
+_STANDARD_METHODS = frozenset(
+    {"GET", "HEAD", "POST", "PUT", "DELETE", "CONNECT", "OPTIONS", "TRACE", "PATCH"}
+)
+
+_TRACEPARENT_RE = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-[0-9a-f]{16}-[0-9a-f]{2}$")
+# OpenMetrics caps exemplar label sets at 128 characters.
+_MAX_EXEMPLAR_VALUE = 64
+
+
+def _route_template(scope: Scope, root_path: str) -> str:
+    """Route template resolved by the router (read after the app has run)."""
+    # Mounted sub-apps (e.g. /metrics) extend root_path by their prefix.
+    mount = scope.get("root_path", "")[len(root_path) :]
+    path = getattr(scope.get("route"), "path", None)
+    if path:
+        return mount + path
+    return mount or UNMATCHED_PATH
+
+
+def _method_label(method: str) -> str:
+    return method if method in _STANDARD_METHODS else "OTHER"
+
+
+def _match_route(scope: Scope, routes: Sequence[BaseRoute]) -> str:
+    """Template of the route that will handle ``scope``, resolved before the app runs."""
+    partial = None
+    for route in routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", UNMATCHED_PATH)
+        if match == Match.PARTIAL and partial is None:
+            partial = route
+    return getattr(partial, "path", UNMATCHED_PATH)
+
+
+def _exemplar(headers: Iterable[Tuple[bytes, bytes]]) -> Optional[Dict[str, str]]:
+    """Trace id from a W3C ``traceparent`` header, else the ``x-request-id``."""
+    request_id = None
+    for name, value in headers:
+        if name == b"traceparent":
+            match = _TRACEPARENT_RE.match(value.decode("latin-1").strip().lower())
+            if match:
+                return {"trace_id": match.group(1)}
+        elif name == b"x-request-id":
+            request_id = value.decode("latin-1").strip()[:_MAX_EXEMPLAR_VALUE]
+    return {"request_id": request_id} if request_id else None
+
+
+class PrometheusMiddleware:
+    """Pure ASGI request metrics.
+
+    Unlike ``BaseHTTPMiddleware`` it adds no task or stream wrapping, so
+    streaming responses pass through untouched. The ``path`` label is the route
+    template the router stored in the scope, read once the request is done;
+    unmatched URLs share the ``__unmatched__`` label. Trace or request ids are
+    attached to the duration histogram as exemplars (OpenMetrics scrapes only).
+    The in-progress gauge needs its path before the app runs, so it is matched
+    against ``routes`` up front (the top-level template, e.g. ``/prom`` for a
+    mount). Non-standard HTTP methods share the ``OTHER`` method label.
+    """
+
+    def __init__(self, app: ASGIApp, routes: Sequence[BaseRoute] = ()) -> None:
+        self.app = app
+        self.routes = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-def _get_path_template(request: Request) -> str:
-    # Prefer route path template to limit cardinality
-    route = request.scope.get("route")
-    if getattr(route, "path", None):
-        return route.path  # type: ignore[attr-defined]
-    return request.url.path
+        method = _method_label(scope["method"])
+        root_path = scope.get("root_path", "")
+        status_code = 500
 
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
 
-class PrometheusMiddleware(BaseHTTPMiddleware):
-    async def dispatch(
-        self,
-        request: Request,
-        call_next: Callable[[Request], Response],
-    ) -> Response:
-        method = request.method
-        path = _get_path_template(request)
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(
+            method=method, path=_match_route(scope, self.routes)
+        )
+        in_progress.inc()
         start = time.perf_counter()
-        HTTP_REQUESTS_IN_PROGRESS.labels(method=method, path=path).inc()
-        status_code = "500"
         try:
-            response = await call_next(request)
-            status_code = str(response.status_code)
-            return response
+            await self.app(scope, receive, send_wrapper)
         finally:
             elapsed = time.perf_counter() - start
-            HTTP_REQUESTS_TOTAL.labels(method=method, path=path, status_code=status_code).inc()
-            HTTP_REQUEST_DURATION_SECONDS.labels(
-                method=method, path=path, status_code=status_code
-            ).observe(elapsed)
-            HTTP_REQUESTS_IN_PROGRESS.labels(method=method, path=path).dec()
+            in_progress.dec()
+            labels = {
+                "method": method,
+                "path": _route_template(scope, root_path),
+                "status_code": str(status_code),
+            }
+            exemplar = _exemplar(scope.get("headers", ()))
+            HTTP_REQUESTS_TOTAL.labels(**labels).inc(exemplar=exemplar)
+            HTTP_REQUEST_DURATION_SECONDS.labels(**labels).observe(elapsed, exemplar=exemplar)
 
 
 def instrument_app(app) -> None:
-    app.add_middleware(PrometheusMiddleware)
+    # The router's route list is live, so routes added after this call are seen.
+    app.add_middleware(PrometheusMiddleware, routes=app.router.routes)
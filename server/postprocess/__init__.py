@@ -0,0 +1,3 @@
+from .rerank import LLMReranker, RerankCache
+
+__all__ = ["LLMReranker", "RerankCache"]
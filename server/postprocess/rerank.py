@@ -0,0 +1,242 @@
+"""Budgeted, batched LLM re-ranking (FR-14).
+
+The top ``RERANK_TOP_K`` fused candidates are judged by the LLM
+(``LLM_MODEL_ID``) in as few prompts as possible: each prompt carries up to
+``RERANK_BATCH_SIZE`` numbered snippets and asks for a JSON list of 0-10
+relevance scores. Batches run concurrently under one per-request deadline
+(``RERANK_TIMEOUT_SECONDS``); on timeout or LLM error the candidates are
+returned in fusion order.
+
+Judgments are cached by ``(query hash, document content hash)``, so repeated
+and overlapping queries only pay for documents the LLM has not yet seen for
+that query. Latency, outcomes and prompt/completion tokens are exported as
+Prometheus metrics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from ..backends import fake_backends, is_fake_mode
+from ..config import settings
+from ..metrics import LLM_TOKENS_TOTAL, RERANK_DURATION_SECONDS, RERANK_REQUESTS_TOTAL
+from ..retrieval.hybrid import SearchCandidate
+
+logger = logging.getLogger(__name__)
+
+# Characters of each candidate sent to the LLM; keeps prompts within budget.
+SNIPPET_CHARS = 700
+
+_PROMPT = """You are ranking Reddit posts and comments for a search query.
+Rate how well each numbered document answers the query on a scale from 0
+(irrelevant) to 10 (perfect answer). Reply with JSON only, including every id:
+{{"scores": [{{"id": <number>, "score": <0-10>}}, ...]}}
+
+Query: {query}
+
+Documents:
+{documents}
+"""
+
+_JSON_RE = re.compile(r"\{.*\}", re.DOTALL)
+_PAIR_RE = re.compile(r"(\d+)\s*[:=\-]\s*(\d+(?:\.\d+)?)")
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def parse_scores(text: str, count: int) -> Dict[int, float]:
+    """Parse ``{"scores": [{"id": i, "score": s}]}`` (or ``i: s`` lines) from a reply."""
+    scores: Dict[int, float] = {}
+    match = _JSON_RE.search(text or "")
+    if match:
+        try:
+            data = json.loads(match.group(0))
+            for item in data.get("scores", []):
+                scores[int(item["id"])] = float(item["score"])
+        except (ValueError, TypeError, KeyError, AttributeError):
+            scores = {}
+    if not scores:
+        for doc_id, score in _PAIR_RE.findall(text or ""):
+            scores[int(doc_id)] = float(score)
+    return {i: s for i, s in scores.items() if 1 <= i <= count}
+
+
+class RerankCache:
+    """Bounded in-process LRU of LLM judgments keyed by (query, content) hashes."""
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        self._max_entries = max(1, max_entries)
+        self._data: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Optional[float]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Tuple[str, str], score: float) -> None:
+        with self._lock:
+            self._data[key] = score
+            self._data.move_to_end(key)
+            while len(self._data) > self._max_entries:
+                self._data.popitem(last=False)
+
+
+class LLMReranker:
+    def __init__(
+        self,
+        llm: Any = None,
+        *,
+        top_k: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        timeout_seconds: Optional[float] = None,
+        cache: Optional[RerankCache] = None,
+    ) -> None:
+        self._llm = llm
+        self._top_k = top_k or settings.rerank_top_k
+        self._batch_size = max(1, batch_size or settings.rerank_batch_size)
+        self._timeout = (
+            settings.rerank_timeout_seconds if timeout_seconds is None else timeout_seconds
+        )
+        self._cache = cache or RerankCache(settings.cache_max_entries)
+        self._tokenizer: Any = None
+
+    @property
+    def window(self) -> int:
+        """How many fused candidates the caller should retrieve for reranking."""
+        return self._top_k
+
+    async def rerank(self, query: str, candidates: List[SearchCandidate]) -> List[SearchCandidate]:
+        """Reorder the first ``RERANK_TOP_K`` candidates by LLM relevance.
+
+        Candidates beyond the window keep their order after the reranked ones.
+        """
+        if not candidates or not query.strip():
+            return candidates
+        window, rest = candidates[: self._top_k], candidates[self._top_k :]
+        query_hash = _digest(" ".join(query.casefold().split()))
+        keys = [(query_hash, _digest(self._snippet(c))) for c in window]
+
+        scores: List[Optional[float]] = [self._cache.get(k) for k in keys]
+        missing = [i for i, s in enumerate(scores) if s is None]
+        started = time.perf_counter()
+        outcome = "cached"
+        if missing:
+            try:
+                judged = await asyncio.wait_for(
+                    self._judge(query, [window[i] for i in missing]), timeout=self._timeout
+                )
+                outcome = "ok"
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "LLM rerank timed out after %.1fs; using fusion order", self._timeout
+                )
+                outcome = "timeout"
+            except Exception:
+                logger.warning("LLM rerank failed; using fusion order", exc_info=True)
+                outcome = "error"
+            if outcome != "ok":
+                RERANK_REQUESTS_TOTAL.labels(outcome=outcome).inc()
+                RERANK_DURATION_SECONDS.observe(time.perf_counter() - started)
+                return candidates
+            for i, score in zip(missing, judged, strict=True):
+                scores[i] = score
+                if score is not None:
+                    self._cache.put(keys[i], score)
+        RERANK_REQUESTS_TOTAL.labels(outcome=outcome).inc()
+        RERANK_DURATION_SECONDS.observe(time.perf_counter() - started)
+
+        for cand, score in zip(window, scores, strict=True):
+            cand.rerank_score = score
+        # Unjudged candidates rank below judged ones; ties keep fusion order.
+        order = sorted(
+            range(len(window)),
+            key=lambda i: (scores[i] is None, -(scores[i] or 0.0), i),
+        )
+        return [window[i] for i in order] + rest
+
+    async def _judge(
+        self, query: str, candidates: Sequence[SearchCandidate]
+    ) -> List[Optional[float]]:
+        batches = [
+            candidates[start : start + self._batch_size]
+            for start in range(0, len(candidates), self._batch_size)
+        ]
+        results = await asyncio.gather(*(self._judge_batch(query, b) for b in batches))
+        return [score for batch in results for score in batch]
+
+    async def _judge_batch(
+        self, query: str, batch: Sequence[SearchCandidate]
+    ) -> List[Optional[float]]:
+        documents = "\n\n".join(f"[{i}] {self._snippet(c)}" for i, c in enumerate(batch, start=1))
+        prompt = _PROMPT.format(query=query, documents=documents)
+        response = await self._get_llm().acomplete(prompt)
+        text = getattr(response, "text", None) or str(response)
+        self._count_tokens(prompt, text, getattr(response, "raw", None))
+        parsed = parse_scores(text, len(batch))
+        return [parsed.get(i) for i in range(1, len(batch) + 1)]
+
+    @staticmethod
+    def _snippet(c: SearchCandidate) -> str:
+        title = c.title or ""
+        body = " ".join((c.text or "").split())[:SNIPPET_CHARS]
+        return f"{title}\n{body}".strip()
+
+    def _count_tokens(self, prompt: str, completion: str, raw: Any) -> None:
+        usage = _field(raw, "usage")
+        prompt_tokens = _field(usage, "prompt_tokens", "input_tokens")
+        completion_tokens = _field(usage, "completion_tokens", "output_tokens")
+        if prompt_tokens is None or completion_tokens is None:
+            if self._tokenizer is None:
+                from llama_index.core.utils import get_tokenizer
+
+                self._tokenizer = get_tokenizer()
+            prompt_tokens = len(self._tokenizer(prompt))
+            completion_tokens = len(self._tokenizer(completion))
+        LLM_TOKENS_TOTAL.labels(stage="rerank", kind="prompt").inc(prompt_tokens)
+        LLM_TOKENS_TOTAL.labels(stage="rerank", kind="completion").inc(completion_tokens)
+
+    def _get_llm(self) -> Any:
+        if self._llm is None and is_fake_mode():
+            self._llm = fake_backends().llm
+        if self._llm is None:
+            from llama_index.llms.openai import OpenAI
+
+            self._llm = OpenAI(
+                model=settings.llm_model_id,
+                temperature=settings.llm_temperature,
+                api_key=settings.openai_api_key,
+            )
+        return self._llm
+
+
+def build_reranker() -> Optional[LLMReranker]:
+    """The configured reranker, or None when ``RERANK_ENABLED`` is off."""
+    if not settings.rerank_enabled:
+        return None
+    return LLMReranker()
+
+
+def _field(obj: Any, *names: str) -> Any:
+    """First of ``names`` set on ``obj``, read as a mapping key or an attribute.
+
+    Providers return usage as a dict (raw JSON responses) or as an SDK object,
+    and name the counts ``prompt/completion_tokens`` or ``input/output_tokens``.
+    """
+    for name in names:
+        value = obj.get(name) if isinstance(obj, Mapping) else getattr(obj, name, None)
+        if value is not None:
+            return value
+    return None
@@ -0,0 +1,25 @@
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .decompose import decompose_query
+    from .executor import QueryProcessor, QueryResult
+
+_EXPORTS = {
+    "QueryProcessor": ".executor",
+    "QueryResult": ".executor",
+    "decompose_query": ".decompose",
+}
+
+__all__ = ["QueryProcessor", "QueryResult", "decompose_query"]
+
+
+def __getattr__(name: str) -> Any:
+    # PEP 562: submodules are imported on first access, so importing the
+    # package (or a light submodule of it) does not pull in the indexing stack.
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,79 @@
+"""Heuristic query decomposition (FR-4).
+
+A multi-facet query such as ``"fastapi vs flask: async performance, docker
+deployment and unit testing"`` is turned into the full query followed by one
+subquery per facet (``"fastapi vs flask async performance"``, ...). Facets are
+split on commas, semicolons and the conjunctions "and", "or", "vs"/"versus",
+but only where the clauses on both sides of the separator are at least two
+words long, so phrases like "rock and roll" or "pros and cons" stay whole.
+Text before a colon followed by whitespace is treated as shared context and
+prefixed to every facet. Quoted spans, URLs and ``field:value`` tokens (e.g.
+``subreddit:python``) are never split.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import List, Optional
+
+from ..config import settings
+
+_FACET_SPLIT_RE = re.compile(
+    r"(\s*(?:[,;&]|\band\b|\bor\b|\bvs\b\.?|\bversus\b)\s*)", re.IGNORECASE
+)
+# Spans that are masked before splitting: quoted text, URLs and field:value tokens.
+_PROTECTED_RE = re.compile(r"\"[^\"]*\"|'[^']*'|\b(?:https?://|www\.)\S+|\b\w+:[^\s:]\S*")
+_CONTEXT_RE = re.compile(r":\s+")
+_PLACEHOLDER_RE = re.compile("\x00(\\d+)\x00")
+_MIN_CLAUSE_WORDS = 2
+
+
+def decompose_query(query: str, max_subqueries: Optional[int] = None) -> List[str]:
+    """Return up to ``max_subqueries`` subqueries, the full query first."""
+    limit = max(1, max_subqueries or settings.query_max_subqueries)
+    base = " ".join(query.split())
+    if not base:
+        return []
+
+    protected: List[str] = []
+
+    def _mask(match: re.Match) -> str:
+        protected.append(match.group(0))
+        return f"\x00{len(protected) - 1}\x00"
+
+    masked = _PROTECTED_RE.sub(_mask, base)
+    parts = _CONTEXT_RE.split(masked, maxsplit=1)
+    context, facets_text = (parts[0], parts[1]) if len(parts) == 2 else ("", masked)
+    facets = _split_facets(facets_text)
+
+    candidates = [f"{context} {facets_text}".strip()]
+    if len(facets) > 1 or context:
+        candidates.extend(f"{context} {f}".strip() for f in facets)
+
+    subqueries: List[str] = []
+    seen = set()
+    for candidate in candidates:
+        candidate = _PLACEHOLDER_RE.sub(lambda m: protected[int(m.group(1))], candidate)
+        key = candidate.casefold()
+        if key not in seen:
+            seen.add(key)
+            subqueries.append(candidate)
+    return subqueries[:limit]
+
+
+def _split_facets(text: str) -> List[str]:
+    """Split ``text`` at separators whose neighbouring clauses are both multi-word."""
+    pieces = _FACET_SPLIT_RE.split(text)
+    clauses, separators = pieces[0::2], pieces[1::2]
+    facets = [clauses[0]]
+    for i, sep in enumerate(separators):
+        left, right = clauses[i], clauses[i + 1]
+        if _is_clause(left) and _is_clause(right):
+            facets.append(right)
+        else:
+            facets[-1] += sep + right
+    return [f.strip() for f in facets if f.strip()]
+
+
+def _is_clause(text: str) -> bool:
+    return len(text.split()) >= _MIN_CLAUSE_WORDS
@@ -0,0 +1,99 @@
+"""Concurrent execution of subqueries (FR-4).
+
+``QueryProcessor`` decomposes a query, fetches and indexes every subquery in a
+single pass (listings in parallel, overlapping submissions expanded and embedded
+once, see ``RedditQueryIndex.upsert_many``) and then runs the hybrid lookups of
+all subqueries concurrently, merging their rankings with reciprocal rank
+fusion. Reddit calls share the process-wide rate limiter and the
+``QUEUE_CONCURRENCY`` worker budget, so N facets no longer cost N sequential
+round trips.
+
+This is a library entry point: ``POST /search`` only reads the indexes and
+leaves fetching to refresh jobs, so no route calls it. Use it from scripts or
+tools that may spend Reddit quota per query.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from ..config import settings
+from ..connectors.rate_limit import Priority
+from ..indexing.reddit_query_index import RedditQueryIndex
+from ..retrieval.fusion import reciprocal_rank_fusion
+from ..retrieval.hybrid import HybridSearchEngine, SearchCandidate
+from .decompose import decompose_query
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class QueryResult:
+    query: str
+    subqueries: List[str]
+    results: List[SearchCandidate] = field(default_factory=list)
+
+
+class QueryProcessor:
+    def __init__(
+        self,
+        index: RedditQueryIndex,
+        engine: HybridSearchEngine,
+        *,
+        max_subqueries: Optional[int] = None,
+    ) -> None:
+        self._index = index
+        self._engine = engine
+        self._max_subqueries = max_subqueries or settings.query_max_subqueries
+
+    async def run(
+        self,
+        query: str,
+        *,
+        subreddit: Optional[str] = None,
+        top_k: int = 10,
+        fetch_limit: int = 10,
+        fetch: bool = True,
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> QueryResult:
+        subqueries = decompose_query(query, self._max_subqueries)
+        if not subqueries:
+            return QueryResult(query, [])
+
+        if fetch:
+            try:
+                await asyncio.to_thread(
+                    self._index.upsert_many,
+                    subqueries,
+                    subreddit,
+                    fetch_limit,
+                    priority=priority,
+                )
+            except Exception:
+                # Serve what is already indexed rather than failing the query.
+                logger.warning("Fetching subqueries for %r failed", query, exc_info=True)
+
+        rankings = await asyncio.gather(
+            *(self._engine.search(sq, top_k=top_k, subreddit=subreddit) for sq in subqueries),
+            return_exceptions=True,
+        )
+        candidates: Dict[str, SearchCandidate] = {}
+        ranked_ids: List[List[str]] = []
+        for sq, ranking in zip(subqueries, rankings, strict=True):
+            if isinstance(ranking, BaseException):
+                logger.warning("Lookup for subquery %r failed: %s", sq, ranking)
+                continue
+            ranked_ids.append([c.doc_id for c in ranking])
+            for c in ranking:
+                candidates.setdefault(c.doc_id, c)
+
+        fused = reciprocal_rank_fusion(ranked_ids, k=settings.hybrid_rrf_k)
+        results = []
+        for doc_id, score in fused[:top_k]:
+            cand = candidates[doc_id]
+            cand.score = score
+            results.append(cand)
+        return QueryResult(query, subqueries, results)
@@ -0,0 +1,14 @@
+from .cache import SearchResultCache, invalidate_collection, normalize_query
+from .fusion import reciprocal_rank_fusion
+from .hybrid import HybridSearchEngine, SearchCandidate
+from .semantic_cache import SemanticQueryCache
+
+__all__ = [
+    "HybridSearchEngine",
+    "SearchCandidate",
+    "SearchResultCache",
+    "SemanticQueryCache",
+    "invalidate_collection",
+    "normalize_query",
+    "reciprocal_rank_fusion",
+]
@@ -0,0 +1,153 @@
+"""Redis-backed cache of ``/search`` results.
+
+Entries are keyed by the normalised query, subreddit and ``top_k`` and expire
+after ``CACHE_TTL_SECONDS``. Every key also embeds a per-collection generation
+number that the indexer increments after writing to the collection (and again
+once its buffered Meilisearch batch has been applied), so an upsert invalidates
+all cached results for that collection at once without scanning keys; stale
+generations simply age out through their TTL.
+
+Redis failures never fail a search; they are logged and counted as errors.
+After a failure the cache is bypassed for ``CACHE_RETRY_AFTER_SECONDS``, so an
+unreachable Redis costs one connect timeout per window instead of two per
+search.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from dataclasses import asdict
+from typing import Any, Callable, List, Optional
+
+from ..config import settings
+from ..indexing.generation import generation_key, invalidate_collection
+from ..metrics import SEARCH_CACHE_REQUESTS_TOTAL
+from .hybrid import SearchCandidate
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "SearchResultCache",
+    "build_result_cache",
+    "generation_key",
+    "invalidate_collection",
+    "normalize_query",
+]
+
+KEY_PREFIX = "reddit_mcp:search:"
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold and collapse whitespace so trivially different queries share a key."""
+    return " ".join(query.casefold().split())
+
+
+class SearchResultCache:
+    def __init__(
+        self,
+        client: Any,
+        collection_name: str = "reddit_mcp_posts",
+        *,
+        ttl_seconds: int = 3600,
+        retry_after_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._client = client
+        self._collection_name = collection_name
+        self._ttl = ttl_seconds
+        self._retry_after = retry_after_seconds
+        self._clock = clock
+        # Redis is not called again before this time after a failure.
+        self._down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return self._clock() >= self._down_until
+
+    def _failed(self, what: str) -> None:
+        if self.available:
+            logger.warning(
+                "Search cache %s failed; bypassing the cache for %.1fs",
+                what,
+                self._retry_after,
+                exc_info=True,
+            )
+        self._down_until = self._clock() + self._retry_after
+
+    def key(self, query: str, subreddit: Optional[str], top_k: int, generation: int) -> str:
+        raw = json.dumps([normalize_query(query), (subreddit or "").casefold(), top_k])
+        digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}{self._collection_name}:{generation}:{digest}"
+
+    async def get(
+        self,
+        query: str,
+        subreddit: Optional[str],
+        top_k: int,
+        generation: Optional[int] = None,
+    ) -> Optional[List[SearchCandidate]]:
+        if generation is None:
+            generation = await self.generation()
+        if not self.available:
+            SEARCH_CACHE_REQUESTS_TOTAL.labels(result="error").inc()
+            return None
+        try:
+            raw = await self._client.get(self.key(query, subreddit, top_k, generation))
+        except Exception:
+            self._failed("lookup")
+            SEARCH_CACHE_REQUESTS_TOTAL.labels(result="error").inc()
+            return None
+        if raw is None:
+            SEARCH_CACHE_REQUESTS_TOTAL.labels(result="miss").inc()
+            return None
+        SEARCH_CACHE_REQUESTS_TOTAL.labels(result="hit").inc()
+        return [SearchCandidate(**item) for item in json.loads(raw)]
+
+    async def set(
+        self,
+        query: str,
+        subreddit: Optional[str],
+        top_k: int,
+        results: List[SearchCandidate],
+        generation: Optional[int] = None,
+    ) -> None:
+        if generation is None:
+            generation = await self.generation()
+        if not self.available:
+            return
+        payload = json.dumps([asdict(r) for r in results], default=str)
+        try:
+            await self._client.set(
+                self.key(query, subreddit, top_k, generation), payload, ex=self._ttl
+            )
+        except Exception:
+            self._failed("write")
+
+    async def generation(self) -> int:
+        """Current generation of the collection (0 if never written or unreachable)."""
+        if not self.available:
+            return 0
+        try:
+            value = await self._client.get(generation_key(self._collection_name))
+        except Exception:
+            self._failed("generation lookup")
+            return 0
+        return int(value) if value is not None else 0
+
+
+def build_result_cache(collection_name: Optional[str] = None) -> Optional[SearchResultCache]:
+    """Build the cache from settings; ``CACHE_TTL_SECONDS <= 0`` disables it."""
+    if settings.cache_ttl_seconds <= 0:
+        return None
+    import redis.asyncio
+
+    client = redis.asyncio.Redis.from_url(settings.redis_url, socket_connect_timeout=1.0)
+    return SearchResultCache(
+        client,
+        collection_name or settings.qdrant_collection,
+        ttl_seconds=settings.cache_ttl_seconds,
+        retry_after_seconds=settings.cache_retry_after_seconds,
+    )
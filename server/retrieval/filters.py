@@ -0,0 +1,117 @@
+"""Server-side search filters pushed down into Qdrant and Meilisearch.
+
+Both backends filter before ranking (Qdrant on its payload indexes, Meilisearch
+on its filterable attributes), so a filtered query still gets its full
+``SEMANTIC_TOP_K``/``BM25_TOP_K`` of matching candidates instead of losing
+slots to hits that a post-filter would drop. Subreddit and author filters match
+the lowercased ``subreddit_lc``/``author_lc`` copies that ``RedditIndexUtils``
+stores next to the display names, with lowercased values, so ``r/Python`` and
+``r/python`` select the same documents.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from qdrant_client.http import models as qmodels
+
+
+def _names(values: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    return tuple(dict.fromkeys(v.strip().lower() for v in values or () if v and v.strip()))
+
+
+@dataclass(frozen=True)
+class SearchFilters:
+    """Conjunction of filters; within a field any listed value matches."""
+
+    subreddits: Tuple[str, ...] = ()
+    kinds: Tuple[str, ...] = ()
+    authors: Tuple[str, ...] = ()
+    # Unix seconds, inclusive, compared against ``created_utc``.
+    created_after: Optional[float] = None
+    created_before: Optional[float] = None
+
+    @classmethod
+    def build(
+        cls,
+        *,
+        subreddit: Optional[str] = None,
+        subreddits: Optional[Iterable[str]] = None,
+        kinds: Optional[Iterable[str]] = None,
+        authors: Optional[Iterable[str]] = None,
+        created_after: Optional[float] = None,
+        created_before: Optional[float] = None,
+    ) -> "SearchFilters":
+        return cls(
+            subreddits=_names([subreddit or "", *(subreddits or ())]),
+            kinds=_names(kinds),
+            authors=_names(authors),
+            created_after=created_after,
+            created_before=created_before,
+        )
+
+    def __bool__(self) -> bool:
+        return any(v not in ((), None) for v in asdict(self).values())
+
+    def scope(self) -> Optional[str]:
+        """Cache-key component; a lone subreddit keeps the pre-filter key format."""
+        if not self:
+            return None
+        if self == SearchFilters(subreddits=self.subreddits) and len(self.subreddits) == 1:
+            return self.subreddits[0]
+        data = asdict(self)
+        for name in ("subreddits", "kinds", "authors"):
+            data[name] = sorted(v.casefold() for v in data[name])
+        return json.dumps(data, sort_keys=True)
+
+    def to_qdrant(self) -> Optional["qmodels.Filter"]:
+        if not self:
+            return None
+        from qdrant_client.http import models as qmodels
+
+        must: List[Any] = [
+            qmodels.FieldCondition(
+                key=key,
+                match=(
+                    qmodels.MatchValue(value=values[0])
+                    if len(values) == 1
+                    else qmodels.MatchAny(any=list(values))
+                ),
+            )
+            for key, values in self._keywords()
+        ]
+        if self.created_after is not None or self.created_before is not None:
+            must.append(
+                qmodels.FieldCondition(
+                    key="created_utc",
+                    range=qmodels.Range(gte=self.created_after, lte=self.created_before),
+                )
+            )
+        return qmodels.Filter(must=must)
+
+    def to_meili(self) -> Optional[str]:
+        """Meilisearch filter expression (attributes must be filterable)."""
+        clauses = [
+            (
+                f"{key} = {json.dumps(values[0])}"
+                if len(values) == 1
+                else f"{key} IN [{', '.join(json.dumps(v) for v in values)}]"
+            )
+            for key, values in self._keywords()
+        ]
+        if self.created_after is not None:
+            clauses.append(f"created_utc >= {self.created_after}")
+        if self.created_before is not None:
+            clauses.append(f"created_utc <= {self.created_before}")
+        return " AND ".join(clauses) or None
+
+    def _keywords(self) -> List[Tuple[str, Tuple[str, ...]]]:
+        pairs = (
+            ("subreddit_lc", self.subreddits),
+            ("kind", self.kinds),
+            ("author_lc", self.authors),
+        )
+        return [(key, values) for key, values in pairs if values]
@@ -0,0 +1,26 @@
+"""Rank fusion for hybrid (lexical + semantic) retrieval."""
+
+from __future__ import annotations
+
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Hashable]],
+    *,
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None,
+) -> List[Tuple[Hashable, float]]:
+    """Merge ranked id lists with (weighted) reciprocal rank fusion.
+
+    ``score(d) = sum_i w_i / (k + rank_i(d))`` with 1-based ranks; ids missing from
+    a list contribute nothing for it. Returns ``(id, score)`` sorted by score,
+    ties broken by first appearance.
+    """
+    if weights is None:
+        weights = [1.0] * len(rankings)
+    scores: Dict[Hashable, float] = {}
+    for ranking, weight in zip(rankings, weights, strict=True):
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
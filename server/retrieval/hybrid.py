@@ -0,0 +1,234 @@
+"""Hybrid retrieval over Qdrant (semantic) and Meilisearch (BM25) (FR-8).
+
+Both backends are queried concurrently with non-blocking clients
+(``AsyncQdrantClient`` and ``httpx.AsyncClient`` against the Meilisearch REST
+API), so latency tracks the slower of the two rather than their sum. The two
+ranked lists are merged with weighted reciprocal rank fusion; if one backend
+fails the other one still answers. The fused list is then rescored for recency
+and engagement (``temporal.py``) before it is cut to ``top_k``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
+import httpx
+
+from ..backends import fake_backends, is_fake_mode
+from ..config import settings
+from ..indexing.registry import registry
+from .filters import SearchFilters
+from .fusion import reciprocal_rank_fusion
+from .temporal import temporal_rescore
+
+if TYPE_CHECKING:
+    from qdrant_client import AsyncQdrantClient
+
+logger = logging.getLogger(__name__)
+
+REDDIT_BASE_URL = "https://www.reddit.com"
+
+
+@dataclass
+class SearchCandidate:
+    """A fused search hit, keyed by Reddit id."""
+
+    doc_id: str
+    score: float
+    kind: Optional[str] = None
+    title: Optional[str] = None
+    text: str = ""
+    url: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    semantic_score: Optional[float] = None
+    fusion_score: Optional[float] = None
+    rerank_score: Optional[float] = None
+    semantic_rank: Optional[int] = None
+    lexical_rank: Optional[int] = None
+
+
+def _reddit_url(meta: Dict[str, Any]) -> Optional[str]:
+    permalink = meta.get("permalink")
+    if permalink:
+        return permalink if permalink.startswith("http") else f"{REDDIT_BASE_URL}{permalink}"
+    if meta.get("kind") == "comment" and meta.get("submission_id"):
+        return f"{REDDIT_BASE_URL}/comments/{meta['submission_id']}/_/{meta.get('doc_id')}/"
+    return meta.get("url")
+
+
+def _display_title(meta: Dict[str, Any], text: str) -> str:
+    title = meta.get("title")
+    if title:
+        return title
+    snippet = " ".join(text.split())[:120]
+    subreddit = meta.get("subreddit")
+    prefix = f"Comment in r/{subreddit}" if subreddit else "Comment"
+    return f"{prefix}: {snippet}" if snippet else prefix
+
+
+class HybridSearchEngine:
+    def __init__(
+        self,
+        collection_name: Optional[str] = None,
+        *,
+        qdrant: Optional[AsyncQdrantClient] = None,
+        http: Optional[httpx.AsyncClient] = None,
+        embed_model: Any = None,
+    ) -> None:
+        self._collection_name = collection_name or settings.qdrant_collection
+        if qdrant is None:
+            from qdrant_client import AsyncQdrantClient
+
+            qdrant = AsyncQdrantClient(url=settings.qdrant_url)
+        self._qdrant = qdrant
+        if http is None:
+            http = fake_backends().meili_http() if is_fake_mode() else self._meili_http()
+        self._http = http
+        self._embed_model = embed_model
+
+    @staticmethod
+    def _meili_http() -> httpx.AsyncClient:
+        headers = {}
+        if settings.meili_master_key:
+            headers["Authorization"] = f"Bearer {settings.meili_master_key}"
+        return httpx.AsyncClient(base_url=settings.meili_url, headers=headers, timeout=10.0)
+
+    async def embed_query(self, query: str) -> List[float]:
+        model = registry.embed_model(self._embed_model)
+        return await model.aget_query_embedding(query)
+
+    async def search(
+        self,
+        query: str,
+        top_k: int = 10,
+        *,
+        subreddit: Optional[str] = None,
+        filters: Optional[SearchFilters] = None,
+        query_vector: Optional[Sequence[float]] = None,
+    ) -> List[SearchCandidate]:
+        """Run semantic and lexical search concurrently and fuse the results.
+
+        ``filters`` (and the ``subreddit`` shorthand, added to its subreddits) are
+        applied by both backends before they rank.
+        """
+        if not query or not query.strip():
+            return []
+        filters = filters or SearchFilters()
+        if subreddit:
+            filters = replace(filters, subreddits=(subreddit.lower(), *filters.subreddits))
+
+        semantic, lexical = await asyncio.gather(
+            self._semantic(query, filters, query_vector),
+            self._lexical(query, filters),
+            return_exceptions=True,
+        )
+        if isinstance(semantic, BaseException):
+            logger.warning("Semantic search failed: %s", semantic)
+            semantic = []
+        if isinstance(lexical, BaseException):
+            logger.warning("Lexical search failed: %s", lexical)
+            lexical = []
+
+        candidates: Dict[str, SearchCandidate] = {}
+        for rank, hit in enumerate(semantic, start=1):
+            cand = candidates.setdefault(hit.doc_id, hit)
+            cand.semantic_rank = rank
+        for rank, hit in enumerate(lexical, start=1):
+            cand = candidates.setdefault(hit.doc_id, hit)
+            cand.lexical_rank = rank
+
+        alpha = settings.hybrid_alpha
+        fused = reciprocal_rank_fusion(
+            [[h.doc_id for h in semantic], [h.doc_id for h in lexical]],
+            k=settings.hybrid_rrf_k,
+            weights=[alpha, 1.0 - alpha],
+        )
+        results: List[SearchCandidate] = []
+        for doc_id, score in fused:
+            cand = candidates[doc_id]
+            cand.score = cand.fusion_score = score
+            results.append(cand)
+        # Rescore the whole fused set for recency/engagement before any cut.
+        results = temporal_rescore(results)
+        return results[: max(top_k, 0)]
+
+    async def _semantic(
+        self,
+        query: str,
+        filters: SearchFilters,
+        query_vector: Optional[Sequence[float]],
+    ) -> List[SearchCandidate]:
+        from ..indexing.collection import search_params
+
+        vector = list(query_vector) if query_vector is not None else await self.embed_query(query)
+        response = await self._qdrant.query_points(
+            collection_name=self._collection_name,
+            query=vector,
+            query_filter=filters.to_qdrant(),
+            search_params=search_params(),
+            limit=settings.semantic_top_k,
+            with_payload=True,
+        )
+        hits: List[SearchCandidate] = []
+        seen: set = set()
+        for point in response.points:
+            payload = dict(point.payload or {})
+            text = ""
+            node_content = payload.pop("_node_content", None)
+            if node_content:
+                try:
+                    text = json.loads(node_content).get("text") or ""
+                except (TypeError, ValueError):
+                    text = ""
+            doc_id = payload.get("doc_id") or str(point.id)
+            if doc_id in seen:
+                # Further chunks of an already ranked post/comment.
+                continue
+            seen.add(doc_id)
+            hits.append(
+                SearchCandidate(
+                    doc_id=doc_id,
+                    score=float(point.score),
+                    kind=payload.get("kind"),
+                    title=_display_title(payload, text),
+                    text=text,
+                    url=_reddit_url(payload),
+                    metadata=payload,
+                    semantic_score=float(point.score),
+                )
+            )
+        return hits
+
+    async def _lexical(self, query: str, filters: SearchFilters) -> List[SearchCandidate]:
+        body: Dict[str, Any] = {"q": query, "limit": settings.bm25_top_k}
+        expression = filters.to_meili()
+        if expression:
+            body["filter"] = expression
+        resp = await self._http.post(f"/indexes/{self._collection_name}/search", json=body)
+        resp.raise_for_status()
+        hits: List[SearchCandidate] = []
+        for doc in resp.json().get("hits", []):
+            meta = dict(doc)
+            meta.setdefault("doc_id", meta.get("id"))
+            meta.setdefault("kind", "comment" if "body" in meta else "submission")
+            text = meta.get("selftext") or meta.get("body") or ""
+            hits.append(
+                SearchCandidate(
+                    doc_id=str(meta.get("id")),
+                    score=0.0,
+                    kind=meta.get("kind"),
+                    title=_display_title(meta, text),
+                    text=text,
+                    url=_reddit_url(meta),
+                    metadata=meta,
+                )
+            )
+        return hits
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
+        await self._qdrant.close()
@@ -0,0 +1,135 @@
+"""In-memory semantic cache of ``/search`` results.
+
+The exact-key cache (``cache.py``) misses paraphrases such as "best python web
+framework" and "which python web framework is best". This cache stores the
+query embedding next to each answered search; a new query whose embedding has
+cosine similarity of at least ``SEMANTIC_CACHE_THRESHOLD`` with a live entry
+for the same subreddit is answered from that entry. Vectors live in one
+preallocated, L2-normalised ``numpy`` matrix, so a lookup is a single
+matrix-vector product over at most ``CACHE_MAX_ENTRIES`` rows. The product runs
+outside the lock; only the per-slot bookkeeping is read under it, and a slot
+rewritten in the meantime (its version changed) is not served.
+
+Embedding models differ in how similarity is spread: BGE-style models score
+even unrelated queries around 0.7-0.8, so the threshold has to be calibrated
+per model (the default of 0.95 is deliberately strict).
+
+Entries expire after ``CACHE_TTL_SECONDS`` and are tagged with the collection
+generation used by the exact cache, so they are invalidated by upserts too.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+from ..config import settings
+from ..metrics import SEMANTIC_CACHE_REQUESTS_TOTAL
+from .hybrid import SearchCandidate
+
+
+class SemanticQueryCache:
+    def __init__(
+        self,
+        *,
+        threshold: float = 0.95,
+        ttl_seconds: float = 3600,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._threshold = threshold
+        self._ttl = ttl_seconds
+        self._capacity = max(1, max_entries)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None
+        # Per-slot bookkeeping; a slot with expires_at <= now is free.
+        self._expires_at = np.zeros(self._capacity, dtype=np.float64)
+        self._keys: List[Optional[tuple]] = [None] * self._capacity
+        # hash() of each key, to match keys without a Python loop over the slots.
+        self._key_hashes = np.zeros(self._capacity, dtype=np.int64)
+        # Bumped on every write to a slot.
+        self._versions = np.zeros(self._capacity, dtype=np.int64)
+        self._top_k = np.zeros(self._capacity, dtype=np.int64)
+        self._results: List[Optional[List[SearchCandidate]]] = [None] * self._capacity
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(np.count_nonzero(self._expires_at > self._clock()))
+
+    def lookup(
+        self,
+        vector: Sequence[float],
+        subreddit: Optional[str],
+        top_k: int,
+        generation: int = 0,
+    ) -> Optional[List[SearchCandidate]]:
+        """Return the results of the most similar live query, if similar enough."""
+        query = _normalise(vector)
+        key = ((subreddit or "").casefold(), generation)
+        with self._lock:
+            vectors = self._vectors
+            if vectors is None or vectors.shape[1] != query.shape[0]:
+                SEMANTIC_CACHE_REQUESTS_TOTAL.labels(result="miss").inc()
+                return None
+            live = (
+                (self._expires_at > self._clock())
+                & (self._top_k >= top_k)
+                & (self._key_hashes == hash(key))
+            )
+            versions = self._versions.copy()
+        if live.any():
+            sims = np.where(live, vectors @ query, -np.inf)
+            best = int(np.argmax(sims))
+            if sims[best] >= self._threshold:
+                with self._lock:
+                    if self._versions[best] == versions[best] and self._keys[best] == key:
+                        SEMANTIC_CACHE_REQUESTS_TOTAL.labels(result="hit").inc()
+                        return list(self._results[best][:top_k])
+        SEMANTIC_CACHE_REQUESTS_TOTAL.labels(result="miss").inc()
+        return None
+
+    def store(
+        self,
+        vector: Sequence[float],
+        subreddit: Optional[str],
+        top_k: int,
+        results: List[SearchCandidate],
+        generation: int = 0,
+    ) -> None:
+        query = _normalise(vector)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != query.shape[0]:
+                # First entry, or the embedding model changed: start over.
+                self._vectors = np.zeros((self._capacity, query.shape[0]), dtype=np.float32)
+                self._expires_at[:] = 0.0
+                self._versions += 1
+            # Expired slots have the smallest expiry; otherwise evict the oldest entry.
+            slot = int(np.argmin(self._expires_at))
+            self._vectors[slot] = query
+            self._expires_at[slot] = self._clock() + self._ttl
+            self._keys[slot] = key = ((subreddit or "").casefold(), generation)
+            self._key_hashes[slot] = hash(key)
+            self._versions[slot] += 1
+            self._top_k[slot] = top_k
+            self._results[slot] = list(results)
+
+
+def _normalise(vector: Sequence[float]) -> np.ndarray:
+    arr = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(arr))
+    return arr / norm if norm > 0 else arr
+
+
+def build_semantic_cache() -> Optional[SemanticQueryCache]:
+    """Build the cache from settings; disabled when the TTL or max entries is 0."""
+    if settings.cache_ttl_seconds <= 0 or settings.cache_max_entries <= 0:
+        return None
+    return SemanticQueryCache(
+        threshold=settings.semantic_cache_threshold,
+        ttl_seconds=settings.cache_ttl_seconds,
+        max_entries=settings.cache_max_entries,
+    )
@@ -0,0 +1,83 @@
+"""Temporal and engagement rescoring of fused candidates (FR-9).
+
+Runs over the whole fused candidate list before it is cut to ``top_k`` (and
+later to ``RERANK_TOP_K``), so recent and well-received content can move up
+without widening the expensive rerank window. All signals are computed as NumPy
+arrays over every candidate at once:
+
+- relevance: the fusion score, scaled to [0, 1] by the best candidate;
+- recency: ``0.5 ** (age_days / TEMPORAL_DECAY_HALF_LIFE_DAYS)``;
+- engagement: ``log1p(score) + log1p(num_comments)`` weighted by
+  ``upvote_ratio``, scaled to [0, 1] by the best candidate.
+
+The final score is ``(1 - wt - we) * relevance + wt * recency + we * engagement``
+with ``wt = TEMPORAL_WEIGHT`` and ``we = ENGAGEMENT_WEIGHT``. Candidates without
+a timestamp get a neutral recency of 0.5.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+import numpy as np
+
+from ..config import settings
+
+if TYPE_CHECKING:  # pragma: no cover - hybrid imports this module
+    from .hybrid import SearchCandidate
+
+_SECONDS_PER_DAY = 86400.0
+
+
+def _column(candidates: Sequence[SearchCandidate], key: str, default: float) -> np.ndarray:
+    values = np.full(len(candidates), default, dtype=np.float64)
+    for i, c in enumerate(candidates):
+        value = c.metadata.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            values[i] = value
+    return values
+
+
+def _scale(values: np.ndarray) -> np.ndarray:
+    top = values.max(initial=0.0)
+    return values / top if top > 0 else np.zeros_like(values)
+
+
+def temporal_rescore(
+    candidates: List[SearchCandidate],
+    *,
+    now: Optional[float] = None,
+    half_life_days: Optional[float] = None,
+    temporal_weight: Optional[float] = None,
+    engagement_weight: Optional[float] = None,
+) -> List[SearchCandidate]:
+    """Rescore ``candidates`` in place and return them sorted by the new score."""
+    if not candidates:
+        return candidates
+    wt = settings.temporal_weight if temporal_weight is None else temporal_weight
+    we = settings.engagement_weight if engagement_weight is None else engagement_weight
+    if wt <= 0 and we <= 0:
+        return candidates
+    half_life = settings.temporal_decay_half_life_days if half_life_days is None else half_life_days
+    if half_life <= 0:
+        raise ValueError(f"half_life_days must be positive, got {half_life}")
+    now = time.time() if now is None else now
+
+    relevance = _scale(np.array([c.score for c in candidates], dtype=np.float64))
+
+    created = _column(candidates, "created_utc", np.nan)
+    age_days = np.clip((now - created) / _SECONDS_PER_DAY, 0.0, None)
+    recency = np.where(np.isnan(created), 0.5, np.exp2(-age_days / half_life))
+
+    votes = np.clip(_column(candidates, "score", 0.0), 0.0, None)
+    comments = np.clip(_column(candidates, "num_comments", 0.0), 0.0, None)
+    ratio = np.clip(_column(candidates, "upvote_ratio", 1.0), 0.0, 1.0)
+    engagement = _scale((np.log1p(votes) + np.log1p(comments)) * ratio)
+
+    final = (1.0 - wt - we) * relevance + wt * recency + we * engagement
+    for c, score in zip(candidates, final.tolist(), strict=True):
+        c.score = score
+    # Stable sort keeps fusion order among equal scores.
+    order = np.argsort(-final, kind="stable")
+    return [candidates[i] for i in order]
@@ -0,0 +1,77 @@
+from dataclasses import asdict
+from functools import lru_cache
+from typing import Annotated, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+
+from ..config import settings
+from ..jobs.queue import IndexJob, JobQueue, build_job_queue
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+class JobRequest(BaseModel):
+    query: str
+    subreddit: Optional[str] = None
+    limit: Optional[int] = None
+
+
+class JobStatus(BaseModel):
+    id: str
+    status: str
+    query: str
+    subreddit: Optional[str] = None
+    limit: int
+    enqueued_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    indexed: Optional[int] = None
+    error: Optional[str] = None
+    # False when the request joined a job already queued or running.
+    created: Optional[bool] = None
+
+    @classmethod
+    def from_job(cls, job: IndexJob, created: Optional[bool] = None) -> "JobStatus":
+        data = asdict(job)
+        data.pop("priority")
+        return cls(**data, created=created)
+
+
+@lru_cache(maxsize=1)
+def get_job_queue() -> Optional[JobQueue]:
+    return build_job_queue()
+
+
+def _require(queue: Optional[JobQueue]) -> JobQueue:
+    if queue is None:
+        raise HTTPException(status_code=503, detail="Job queue is disabled")
+    return queue
+
+
+@router.post("", response_model=JobStatus, status_code=202)
+async def enqueue_job(
+    req: JobRequest,
+    queue: Annotated[Optional[JobQueue], Depends(get_job_queue)],
+) -> JobStatus:
+    if not req.query.strip():
+        raise HTTPException(status_code=422, detail="query must not be empty")
+    job, created = await _require(queue).enqueue(
+        req.query, req.subreddit, req.limit or settings.job_default_limit
+    )
+    return JobStatus.from_job(job, created)
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+async def get_job(
+    job_id: str,
+    queue: Annotated[Optional[JobQueue], Depends(get_job_queue)],
+    wait: Annotated[float, Query(ge=0, description="seconds to wait for completion")] = 0,
+) -> JobStatus:
+    """Job status; with ``wait`` > 0, block until the job finishes or the wait runs out."""
+    queue = _require(queue)
+    wait = min(wait, settings.job_wait_max_seconds)
+    job = await (queue.wait(job_id, wait) if wait > 0 else queue.get(job_id))
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job")
+    return JobStatus.from_job(job)
@@ -1,14 +1,53 @@
-from typing import List
+import logging
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Annotated, List, Literal, Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 
+from ..config import settings
+from ..jobs.queue import JobQueue
+from ..metrics import record_swallowed
+from ..postprocess.rerank import LLMReranker, build_reranker
+from ..retrieval.cache import SearchResultCache, build_result_cache
+from ..retrieval.filters import SearchFilters
+from ..retrieval.hybrid import HybridSearchEngine, SearchCandidate
+from ..retrieval.semantic_cache import SemanticQueryCache, build_semantic_cache
+from .jobs import JobStatus, get_job_queue
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/search", tags=["search"])
 
 
+def _timestamp(value: Optional[datetime]) -> Optional[float]:
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+class SearchFilterParams(BaseModel):
+    """Filters applied by the search backends before ranking; fields are ANDed."""
+
+    subreddits: List[str] = []
+    kinds: List[Literal["submission", "comment"]] = []
+    authors: List[str] = []
+    # ISO 8601 or unix seconds; naive datetimes are UTC.
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+
 class SearchRequest(BaseModel):
     query: str
     top_k: int = 10
+    subreddit: Optional[str] = None
+    filters: Optional[SearchFilterParams] = None
+    # Queue a background refresh of (query, subreddit); the response carries the
+    # job, which can be awaited with ``GET /jobs/{id}?wait=...``.
+    refresh: bool = False
 
 
 class SearchItem(BaseModel):
@@ -20,26 +59,109 @@ class SearchItem(BaseModel):
 class SearchResponse(BaseModel):
     query: str
     results: List[SearchItem]
+    job: Optional[JobStatus] = None
+
+
+@lru_cache(maxsize=1)
+def get_search_engine() -> HybridSearchEngine:
+    # One engine (and its connection pools) per process.
+    return HybridSearchEngine()
+
+
+@lru_cache(maxsize=1)
+def get_result_cache() -> Optional[SearchResultCache]:
+    return build_result_cache()
+
+
+@lru_cache(maxsize=1)
+def get_semantic_cache() -> Optional[SemanticQueryCache]:
+    return build_semantic_cache()
+
+
+@lru_cache(maxsize=1)
+def get_reranker() -> Optional[LLMReranker]:
+    return build_reranker()
 
 
 @router.post("", response_model=SearchResponse)
-async def search(req: SearchRequest) -> SearchResponse:
-    # Minimal stub: echo query and return stubbed results
-    stubbed_results = [
-        SearchItem(
-            title="Stubbed result 1",
-            url="https://example.com/stubbed-result-1",
-            score=0.95,
-        ),
-        SearchItem(
-            title="Stubbed result 2",
-            url="https://example.com/stubbed-result-2",
-            score=0.92,
-        ),
-        SearchItem(
-            title="Stubbed result 3",
-            url="https://example.com/stubbed-result-3",
-            score=0.88,
-        ),
-    ]
-    return SearchResponse(query=req.query, results=stubbed_results)
+async def search(
+    req: SearchRequest,
+    engine: Annotated[HybridSearchEngine, Depends(get_search_engine)],
+    cache: Annotated[Optional[SearchResultCache], Depends(get_result_cache)],
+    semantic_cache: Annotated[Optional[SemanticQueryCache], Depends(get_semantic_cache)],
+    reranker: Annotated[Optional[LLMReranker], Depends(get_reranker)],
+    jobs: Annotated[Optional[JobQueue], Depends(get_job_queue)],
+) -> SearchResponse:
+    # Queue before searching so the refresh is under way while we answer with
+    # what is indexed now.
+    job = await _enqueue_refresh(req, jobs) if req.refresh else None
+    candidates = await _cached_search(req, engine, cache, semantic_cache, reranker)
+    results = [SearchItem(title=c.title or "", url=c.url or "", score=c.score) for c in candidates]
+    return SearchResponse(query=req.query, results=results, job=job)
+
+
+def search_filters(req: SearchRequest) -> SearchFilters:
+    """Backend filters for a request; ``subreddit`` joins ``filters.subreddits``."""
+    params = req.filters or SearchFilterParams()
+    return SearchFilters.build(
+        subreddit=req.subreddit,
+        subreddits=params.subreddits,
+        kinds=params.kinds,
+        authors=params.authors,
+        created_after=_timestamp(params.created_after),
+        created_before=_timestamp(params.created_before),
+    )
+
+
+async def _enqueue_refresh(req: SearchRequest, jobs: Optional[JobQueue]) -> Optional[JobStatus]:
+    if jobs is None or not req.query.strip():
+        return None
+    try:
+        job, created = await jobs.enqueue(
+            req.query, req.subreddit, settings.job_default_limit, priority="INTERACTIVE"
+        )
+    except Exception as exc:
+        # Never fail a search because the queue is unreachable.
+        record_swallowed("job_enqueue", exc)
+        logger.warning("Could not queue refresh job", exc_info=True)
+        return None
+    return JobStatus.from_job(job, created)
+
+
+async def _cached_search(
+    req: SearchRequest,
+    engine: HybridSearchEngine,
+    cache: Optional[SearchResultCache],
+    semantic_cache: Optional[SemanticQueryCache],
+    reranker: Optional[LLMReranker] = None,
+) -> List[SearchCandidate]:
+    """Exact-key cache, then semantic cache, then hybrid search (+ optional LLM rerank)."""
+    filters = search_filters(req)
+    scope = filters.scope()
+    generation = await cache.generation() if cache is not None else 0
+    if cache is not None:
+        candidates = await cache.get(req.query, scope, req.top_k, generation)
+        if candidates is not None:
+            return candidates
+
+    # Embed once: the vector serves both the semantic cache and Qdrant.
+    vector = None
+    if semantic_cache is not None and req.query.strip():
+        vector = await engine.embed_query(req.query)
+        candidates = semantic_cache.lookup(vector, scope, req.top_k, generation)
+        if candidates is not None:
+            return candidates
+
+    window = max(req.top_k, reranker.window) if reranker is not None else req.top_k
+    candidates = await engine.search(req.query, top_k=window, filters=filters, query_vector=vector)
+    if reranker is not None:
+        candidates = (await reranker.rerank(req.query, candidates))[: req.top_k]
+        if not any(c.rerank_score is not None for c in candidates):
+            # Rerank fell back to fusion order (timeout/error): do not cache that.
+            return candidates
+    if candidates:
+        if cache is not None:
+            await cache.set(req.query, scope, req.top_k, candidates, generation)
+        if semantic_cache is not None and vector is not None:
+            semantic_cache.store(vector, scope, req.top_k, candidates, generation)
+    return candidates
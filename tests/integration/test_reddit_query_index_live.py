@@ -23,7 +23,8 @@ def test_upsert_live():
         pytest.skip("Reddit credentials not configured; skipping integration test")
 
     index_name = "test_upsert_live"
-    rqi = RedditQueryIndex(collection_name=index_name)
+    # Documents must be searchable in Meilisearch before the assertions below.
+    rqi = RedditQueryIndex(collection_name=index_name, meili_sync=True)
     results = rqi.upsert("reddit mcp", subreddit="mcp", limit=1)
     if not results:
         pytest.skip("No results from Reddit; skipping assertion")
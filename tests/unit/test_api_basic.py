@@ -2,6 +2,27 @@ import pytest
 from httpx import ASGITransport, AsyncClient
 
 from server.main import app
+from server.retrieval.hybrid import SearchCandidate
+from server.routes.search import (
+    get_reranker,
+    get_result_cache,
+    get_search_engine,
+    get_semantic_cache,
+)
+
+
+class FakeSearchEngine:
+    async def search(self, query, top_k=10, **kwargs):
+        hits = [
+            SearchCandidate(
+                doc_id=f"id{i}",
+                score=1.0 / (i + 1),
+                title=f"Result {i}",
+                url=f"https://www.reddit.com/r/test/comments/id{i}/",
+            )
+            for i in range(5)
+        ]
+        return hits[:top_k]
 
 
 @pytest.mark.asyncio
@@ -15,10 +36,37 @@ async def test_healthz():
 
 @pytest.mark.asyncio
 async def test_search_minimal():
+    app.dependency_overrides[get_search_engine] = FakeSearchEngine
+    app.dependency_overrides[get_result_cache] = lambda: None
+    app.dependency_overrides[get_semantic_cache] = lambda: None
+    app.dependency_overrides[get_reranker] = lambda: None
+    transport = ASGITransport(app=app)
+    try:
+        async with AsyncClient(transport=transport, base_url="http://test") as ac:
+            resp = await ac.post("/search", json={"query": "hello", "top_k": 3})
+            assert resp.status_code == 200
+            data = resp.json()
+            assert data["query"] == "hello"
+            assert isinstance(data["results"], list)
+            assert len(data["results"]) == 3
+            assert data["results"][0]["url"].startswith("https://www.reddit.com/")
+    finally:
+        app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_readyz_flips_after_warm_up(monkeypatch):
+    from server.indexing.registry import ModelRegistry
+
+    fresh = ModelRegistry()
+    monkeypatch.setattr("server.main.registry", fresh)
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
-        resp = await ac.post("/search", json={"query": "hello", "top_k": 3})
+        resp = await ac.get("/readyz")
+        assert resp.status_code == 503
+
+        monkeypatch.setenv("IS_TESTING", "1")
+        fresh.warm_up("default")
+        resp = await ac.get("/readyz")
         assert resp.status_code == 200
-        data = resp.json()
-        assert data["query"] == "hello"
-        assert isinstance(data["results"], list)
+        assert resp.json()["status"] == "ready"
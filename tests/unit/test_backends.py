@@ -0,0 +1,117 @@
+import json
+
+import httpx
+import pytest
+
+from server.backends import (
+    BackendError,
+    FakeLLM,
+    FakeMeiliClient,
+    FakeMeiliTransport,
+    FakeReddit,
+    FaultProfile,
+    LexicalStore,
+    QuotaWindow,
+)
+from server.backends.synthetic import SyntheticConfig, SyntheticReddit, to_dict
+from server.connectors.rate_limit import RateLimitScheduler
+from server.connectors.reddit import RedditConnector
+from server.indexing.meili_ingest import MeiliIngestor
+from server.postprocess.rerank import LLMReranker
+from server.retrieval.filters import SearchFilters
+from server.retrieval.hybrid import HybridSearchEngine, SearchCandidate
+
+
+def _scheduler(sleeps):
+    return RateLimitScheduler(
+        max_calls=1000, window_seconds=1, retry_max_attempts=10, sleep=sleeps.append
+    )
+
+
+def test_fake_reddit_serves_stable_listings_through_the_connector():
+    reddit = FakeReddit(synthetic=SyntheticConfig(comments_per_submission=4))
+    conn = RedditConnector(reddit=reddit, scheduler=_scheduler([]), max_concurrency=2)
+
+    first = conn.search("python asyncio", limit=5)
+    again = conn.search("python asyncio", limit=5)
+    other = conn.search("gardening", limit=5)
+
+    assert [s.id for s in first] == [s.id for s in again]
+    assert not {s.id for s in first} & {s.id for s in other}
+    assert all(s.title.startswith("python asyncio") for s in first)
+    # One listing page plus one comment expansion per submission, per search.
+    assert reddit.requests == 3 * (1 + 5)
+
+
+def test_injected_429s_are_retried_by_the_scheduler():
+    sleeps = []
+    reddit = FakeReddit(profile=FaultProfile(rate_limit_rate=0.5, seed=3))
+    conn = RedditConnector(reddit=reddit, scheduler=_scheduler(sleeps))
+
+    results = conn.search("python", limit=3, include_comments=False)
+
+    assert len(results) == 3
+    assert sleeps  # at least one 429 was retried with backoff
+
+
+def test_quota_window_reports_limits_then_rate_limits():
+    quota = QuotaWindow(2)
+    assert quota.consume()["remaining"] == 1
+    assert quota.consume()["remaining"] == 0
+    with pytest.raises(BackendError) as info:
+        quota.consume()
+    assert info.value.response.status_code == 429
+    assert QuotaWindow(0).consume() == {}
+
+
+def test_recorded_listings_round_trip(tmp_path):
+    submissions = SyntheticReddit(SyntheticConfig(submissions=3, topic="rust")).submissions()
+    path = tmp_path / "listings.json"
+    path.write_text(json.dumps([to_dict(s) for s in submissions]))
+
+    reddit = FakeReddit.from_file(str(path))
+    listing = list(reddit.subreddit("all").search("rust", limit=2))
+
+    assert [s.id for s in listing] == [s.id for s in submissions[:2]]
+    assert len(listing[0].comments.list()) == len(submissions[0].comments.list())
+
+
+@pytest.mark.asyncio
+async def test_documents_ingested_into_the_fake_are_searchable():
+    store = LexicalStore()
+    ingestor = MeiliIngestor(FakeMeiliClient(store), "idx", filterable_attributes=["subreddit_lc"])
+    ingestor.add(
+        [
+            {"id": "a", "title": "Python packaging", "subreddit_lc": "python"},
+            {"id": "b", "title": "Python gardening", "subreddit_lc": "gardening"},
+            {"id": "c", "body": "unrelated"},
+        ],
+        wait=True,
+    )
+    http = httpx.AsyncClient(transport=FakeMeiliTransport(store), base_url="http://meili")
+    engine = HybridSearchEngine("idx", qdrant=object(), http=http)
+
+    hits = await engine._lexical("python packaging", SearchFilters())
+    filtered = await engine._lexical("python", SearchFilters(subreddits=("gardening",)))
+
+    assert [h.doc_id for h in hits] == ["a", "b"]
+    assert [h.doc_id for h in filtered] == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_fake_meili_errors_surface_as_http_errors():
+    transport = FakeMeiliTransport(LexicalStore(), FaultProfile(error_rate=1.0))
+    http = httpx.AsyncClient(transport=transport, base_url="http://meili")
+    resp = await http.post("/indexes/idx/search", json={"q": "x"})
+    assert resp.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_fake_llm_drives_the_reranker():
+    titles = ["cooking pasta", "python web framework", "python web"]
+    cands = [SearchCandidate(doc_id=str(i), score=1.0, title=t) for i, t in enumerate(titles)]
+
+    out = await LLMReranker(FakeLLM(), top_k=3, batch_size=2).rerank("python web", cands)
+
+    assert [c.title for c in out][-1] == "cooking pasta"
+    assert out[0].rerank_score == 10.0
@@ -0,0 +1,57 @@
+import json
+
+from benchmarks.run import main
+from server.backends.synthetic import SyntheticConfig, SyntheticReddit
+from server.indexing.reddit_index_utils import RedditIndexUtils
+
+
+def _depth(comment, level=1):
+    return max([level] + [_depth(r, level + 1) for r in comment.replies])
+
+
+def test_synthetic_forest_is_reproducible_and_bounded():
+    config = SyntheticConfig(submissions=3, comments_per_submission=30, max_depth=3, seed=7)
+    first = SyntheticReddit(config).submissions()
+    second = SyntheticReddit(config).submissions()
+
+    assert [s.title for s in first] == [s.title for s in second]
+    for s in first:
+        comments = s.comments.list()
+        assert len(comments) == 30
+        assert max(_depth(c) for c in s.comments) <= 3
+        assert all(c.link_id == f"t3_{s.id}" for c in comments)
+
+    records = RedditIndexUtils.extract_records(first)
+    assert sum(len(r.comments) for r in records) == 90
+    assert records[0].comments[0].submission_id == first[0].id
+
+
+def test_benchmark_run_writes_json(tmp_path):
+    out = tmp_path / "results.json"
+    main(
+        [
+            "--out",
+            str(out),
+            "--submissions",
+            "4",
+            "--comments",
+            "5",
+            "--limit",
+            "2",
+            "--repeat",
+            "1",
+            "--requests",
+            "6",
+            "--concurrency",
+            "3",
+            "--embed-dim",
+            "8",
+        ]
+    )
+    results = json.loads(out.read_text())
+
+    assert results["mapping"]["items"] == 24
+    assert results["upsert"]["points"] > 0
+    assert results["upsert"]["per_upsert"]["count"] == 2
+    assert results["search"]["errors"] == 0
+    assert results["search"]["latency"]["count"] == 6
@@ -0,0 +1,48 @@
+from llama_index.core.schema import MetadataMode
+from llama_index.core.utils import get_tokenizer
+
+from server.indexing.chunking import TextChunker
+from server.indexing.reddit_index_utils import RedditIndexUtils, SubmissionRecord
+
+PARAGRAPH = (
+    "FastAPI makes request validation easy. Pydantic models describe the payloads. "
+    "The generated OpenAPI schema keeps clients in sync. "
+)
+
+
+def _submission(id, selftext):
+    fields = dict.fromkeys(SubmissionRecord.__dataclass_fields__)
+    fields.update(id=id, title="Framework notes", subreddit="python", selftext=selftext)
+    del fields["comments"]
+    return RedditIndexUtils.submission_record_to_text_node(SubmissionRecord(**fields), "q")
+
+
+def test_long_text_is_split_within_budget_with_parent_metadata():
+    tokenizer = get_tokenizer()
+    chunker = TextChunker(max_tokens=80, overlap_tokens=10, tokenizer=tokenizer)
+    long_node = _submission("p1", "\n\n".join([PARAGRAPH * 2] * 6))
+    short_node = _submission("p2", "Short post.")
+
+    out = chunker.chunk_nodes([long_node, short_node])
+
+    chunks = [n for n in out if n.metadata.get("parent_doc_id") == "p1"]
+    assert len(chunks) > 1
+    assert out[-1] is short_node
+    assert [c.metadata["chunk_index"] for c in chunks] == list(range(len(chunks)))
+    assert {c.metadata["chunk_count"] for c in chunks} == {len(chunks)}
+    assert len({c.node_id for c in chunks}) == len(chunks)
+    for c in chunks:
+        assert c.ref_doc_id == "p1" and c.metadata["doc_id"] == "p1"
+        embedded = c.get_content(metadata_mode=MetadataMode.EMBED)
+        assert len(tokenizer(embedded)) <= 80
+        assert "chunk_index" not in embedded
+    # Chunk boundaries fall on sentences.
+    assert all(c.text.rstrip().endswith(".") for c in chunks)
+
+
+def test_chunker_respects_model_limit():
+    class FakeModel:
+        max_length = 128
+
+    chunker = TextChunker.for_embed_model(FakeModel())
+    assert chunker.max_tokens == 120
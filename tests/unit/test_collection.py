@@ -0,0 +1,101 @@
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as qmodels
+
+from server.config import settings
+from server.indexing.collection import (
+    collection_config,
+    ensure_collection,
+    migrate_collection,
+    search_params,
+)
+
+
+@pytest.fixture
+def client():
+    client = QdrantClient(location=":memory:")
+    yield client
+    client.close()
+
+
+def _fill(client, name, count):
+    client.create_collection(
+        name, vectors_config=qmodels.VectorParams(size=3, distance=qmodels.Distance.COSINE)
+    )
+    client.upsert(
+        name,
+        points=[
+            qmodels.PointStruct(id=i, vector=[1.0, float(i), 0.5], payload={"doc_id": f"d{i}"})
+            for i in range(count)
+        ],
+    )
+
+
+def test_layout_follows_settings(monkeypatch):
+    assert collection_config(8)["quantization_config"] is None
+    assert search_params() is None
+
+    monkeypatch.setattr(settings, "qdrant_quantization", "scalar")
+    monkeypatch.setattr(settings, "qdrant_on_disk_vectors", True)
+    monkeypatch.setattr(settings, "qdrant_hnsw_m", 32)
+    config = collection_config(8)
+    assert config["quantization_config"].scalar.type == qmodels.ScalarType.INT8
+    assert config["vectors_config"].on_disk and config["hnsw_config"].m == 32
+    params = search_params()
+    assert params.quantization.rescore and params.quantization.oversampling == 2.0
+
+    monkeypatch.setattr(settings, "qdrant_quantization", "binary")
+    monkeypatch.setattr(settings, "qdrant_hnsw_ef", 128)
+    assert collection_config(8)["quantization_config"].binary.always_ram
+    assert search_params().hnsw_ef == 128
+
+    monkeypatch.setattr(settings, "qdrant_quantization", "product")
+    with pytest.raises(ValueError):
+        collection_config(8)
+
+
+def test_ensure_collection_creates_once(client, monkeypatch):
+    monkeypatch.setattr(settings, "qdrant_quantization", "scalar")
+    calls = []
+    create = client.create_collection
+    monkeypatch.setattr(client, "create_collection", lambda **kw: calls.append(kw) or create(**kw))
+    assert ensure_collection(client, "posts", 4) is True
+    assert ensure_collection(client, "posts", 4) is False
+
+    # Local mode does not keep quantization configs, so check what was requested.
+    assert len(calls) == 1 and calls[0]["quantization_config"].scalar.quantile == 0.99
+    assert client.get_collection("posts").config.params.vectors.size == 4
+
+
+def test_migrate_copies_vectors_and_switches_alias(client, monkeypatch):
+    _fill(client, "posts_v1", 7)
+    client.update_collection_aliases(
+        change_aliases_operations=[
+            qmodels.CreateAliasOperation(
+                create_alias=qmodels.CreateAlias(collection_name="posts_v1", alias_name="posts")
+            )
+        ]
+    )
+    monkeypatch.setattr(settings, "qdrant_quantization", "binary")
+
+    assert migrate_collection(client, "posts_v1", "posts_v2", alias="posts", batch_size=3) == 7
+
+    aliases = {a.alias_name: a.collection_name for a in client.get_aliases().aliases}
+    assert aliases == {"posts": "posts_v2"}
+    point = client.retrieve("posts", ids=[5], with_vectors=True)[0]
+    original = client.retrieve("posts_v1", ids=[5], with_vectors=True)[0]
+    assert point.vector == original.vector and point.payload == {"doc_id": "d5"}
+    assert ensure_collection(client, "posts", 3) is False
+
+    with pytest.raises(ValueError):
+        migrate_collection(client, "posts_v1", "posts_v2")
+
+
+def test_migrate_can_take_over_the_source_name(client):
+    _fill(client, "posts", 2)
+    with pytest.raises(ValueError):
+        migrate_collection(client, "posts", "posts_v2", alias="posts")
+
+    migrate_collection(client, "posts", "posts_v2", alias="posts", drop_source=True)
+    assert [c.name for c in client.get_collections().collections] == ["posts_v2"]
+    assert client.count("posts").count == 2
@@ -0,0 +1,123 @@
+from llama_index.core.schema import MetadataMode
+
+from server.indexing.dedup import (
+    Deduplicator,
+    MemorySignatureStore,
+    band_keys,
+    max_distance,
+    normalize_text,
+    simhash,
+    similarity,
+)
+from server.indexing.reddit_index_utils import CommentRecord, RedditIndexUtils, SubmissionRecord
+
+LONG = (
+    "I switched our internal API from Flask to FastAPI last year and the automatic "
+    "validation plus the generated OpenAPI docs saved us a lot of boilerplate code"
+)
+
+
+def _submission(id, title, selftext, subreddit="python"):
+    fields = dict.fromkeys(SubmissionRecord.__dataclass_fields__)
+    fields.update(id=id, title=title, selftext=selftext, subreddit=subreddit, comments=[])
+    return RedditIndexUtils.submission_record_to_text_node(SubmissionRecord(**fields), "q")
+
+
+def _comment(id, body):
+    fields = dict.fromkeys(CommentRecord.__dataclass_fields__)
+    fields.update(id=id, body=body, subreddit="python")
+    return RedditIndexUtils.comment_record_to_text_node(CommentRecord(**fields), "q")
+
+
+def test_simhash_is_close_for_near_duplicates():
+    tokens = normalize_text(LONG).split()
+    edited = normalize_text(LONG.replace("last year", "last summer")).split()
+    other = normalize_text("Completely unrelated text about cooking pasta at home").split()
+
+    assert similarity(simhash(tokens), simhash(edited)) >= 0.8
+    assert similarity(simhash(tokens), simhash(other)) < 0.8
+    assert max_distance(0.92) == 5
+    assert len(band_keys(simhash(tokens), 6)) == 6
+
+
+def test_exact_and_near_duplicates_are_dropped_with_provenance():
+    dedup = Deduplicator(MemorySignatureStore(), threshold=0.85)
+    nodes = [
+        _comment("c1", LONG),
+        _comment("c2", LONG.upper() + "!!"),  # exact after normalisation
+        _comment("c3", LONG.replace("boilerplate", "boiler plate")),  # near duplicate
+        _comment("c4", "Completely unrelated text about cooking pasta at home tonight"),
+        _comment("c5", ""),  # empty texts are never deduplicated
+        _comment("c6", ""),
+    ]
+    embed_before = nodes[0].get_content(metadata_mode=MetadataMode.EMBED)
+
+    result = dedup.filter(nodes)
+
+    assert [n.metadata["doc_id"] for n in result.nodes] == ["c1", "c4", "c5", "c6"]
+    assert result.dropped == {"c2": "c1", "c3": "c1"}
+    assert result.nodes[0].metadata["duplicate_ids"] == ["c2", "c3"]
+    # Provenance does not change what gets embedded.
+    assert result.nodes[0].get_content(metadata_mode=MetadataMode.EMBED) == embed_before
+
+
+def test_signatures_persist_across_batches():
+    store = MemorySignatureStore()
+    Deduplicator(store, threshold=0.92).filter([_comment("c1", LONG)])
+
+    dedup = Deduplicator(store, threshold=0.92)
+    result = dedup.filter([_comment("c1", LONG), _comment("c9", LONG + " ")])
+
+    # Re-indexing the canonical comment is an update, the repost is merged into it.
+    assert [n.metadata["doc_id"] for n in result.nodes] == ["c1"]
+    assert result.nodes[0].metadata["duplicate_ids"] == ["c9"]
+
+    result = dedup.filter([_comment("c10", LONG)])
+    assert result.nodes == []
+    assert result.merged_into_existing == {"c1": ["c10", "c9"]}
+
+
+def test_short_texts_and_different_titles_are_never_merged():
+    dedup = Deduplicator(MemorySignatureStore(), threshold=0.85)
+    nodes = [
+        _comment("c1", "Thanks!"),
+        _comment("c2", "thanks"),
+        _comment("c3", "[deleted]"),
+        _comment("c4", "[deleted]"),
+        _submission("s1", "Weekly FastAPI thread", LONG),
+        _submission("s2", "Weekly Django thread", LONG),
+        _submission("s3", "Weekly FastAPI thread", LONG + " Edit: typo."),
+    ]
+
+    result = dedup.filter(nodes)
+
+    assert result.dropped == {"s3": "s1"}
+
+
+def test_crossposts_merge_and_edited_canonicals_release_their_duplicates():
+    store = MemorySignatureStore()
+    dedup = Deduplicator(store, threshold=0.92)
+    result = dedup.filter(
+        [_submission("s1", "FastAPI tips", LONG), _submission("s2", "FastAPI tips", LONG, "webdev")]
+    )
+    assert result.dropped == {"s2": "s1"}
+
+    # The canonical is edited: the crosspost no longer matches and gets indexed.
+    dedup.filter([_submission("s1", "FastAPI tips", "Edit: removed, see the pinned comment.")])
+    result = dedup.filter([_submission("s2", "FastAPI tips", LONG, "webdev")])
+    assert result.dropped == {} and [n.metadata["doc_id"] for n in result.nodes] == ["s2"]
+    assert store.duplicates_of("s1") == []
+
+    # Deleted canonicals ("[deleted]" is too short to sign) are retired as well.
+    dedup.filter([_submission("s2", "FastAPI tips", "[deleted]")])
+    result = dedup.filter([_submission("s3", "FastAPI tips", LONG)])
+    assert result.dropped == {}
+
+
+def test_lsh_buckets_keep_only_the_newest_signatures():
+    store = MemorySignatureStore(max_band_members=2)
+    dedup = Deduplicator(store, threshold=0.92)
+    for i in range(4):
+        dedup.filter([_comment(f"c{i}", f"{LONG} variant number {i} with extra words")])
+
+    assert store._bands and max(len(members) for members in store._bands.values()) <= 2
@@ -0,0 +1,74 @@
+import os
+import zlib
+
+import pytest
+from llama_index.core.base.embeddings.base import BaseEmbedding
+
+from server.config import settings
+from server.indexing import embed_pool
+from server.indexing.embed_pool import EmbeddingPool, shared_pool, start_shared_pool
+
+
+class PidEmbedding(BaseEmbedding):
+    """Deterministic vector per text, tagged with the pid of the embedding process."""
+
+    def _vector(self, text):
+        return [float(zlib.crc32(text.encode()) % 10007), float(len(text)), float(os.getpid())]
+
+    def _get_text_embedding(self, text):
+        return self._vector(text)
+
+    def _get_query_embedding(self, query):
+        return self._vector(query)
+
+    async def _aget_query_embedding(self, query):
+        return self._vector(query)
+
+
+@pytest.fixture
+def no_shared_pools(monkeypatch):
+    monkeypatch.setattr(embed_pool, "_pools", {})
+    yield
+    for pool in embed_pool._pools.values():
+        if pool is not None:
+            pool.shutdown()
+
+
+def test_pool_embeds_in_worker_processes_in_input_order():
+    model = PidEmbedding()
+    texts = [f"text number {i}" + "x" * (i % 7) for i in range(23)]
+    pool = EmbeddingPool(model, workers=2, batch_size=4)
+    try:
+        vectors = pool.embed(texts)
+    finally:
+        pool.shutdown()
+
+    expected = [model._vector(t)[:2] for t in texts]
+    assert [v[:2] for v in vectors] == expected
+    assert {v[2] for v in vectors}.isdisjoint({float(os.getpid())})
+    assert pool.embed([]) == []
+
+
+def test_shared_pool_is_disabled_by_default_and_only_started_explicitly(
+    monkeypatch, no_shared_pools
+):
+    model = PidEmbedding()
+    monkeypatch.setattr(settings, "embed_workers", 0)
+    assert start_shared_pool(model) is None
+
+    monkeypatch.setattr(settings, "embed_workers", 2)
+    monkeypatch.setattr(settings, "embed_batch_size", 8)
+    # Looking the pool up never starts one: only start_shared_pool forks.
+    assert shared_pool(model) is None
+    pool = start_shared_pool(model)
+    assert pool is not None and start_shared_pool(model) is pool
+    assert shared_pool(model) is pool
+
+
+def test_shared_pool_falls_back_when_the_pool_cannot_start(monkeypatch, no_shared_pools):
+    monkeypatch.setattr(settings, "embed_workers", 2)
+    monkeypatch.setattr(settings, "embed_pool_start_method", "spawn")
+    # spawn workers must load the model from its alias, which an instance lacks.
+    model = PidEmbedding()
+    assert start_shared_pool(model) is None
+    assert start_shared_pool(model) is None
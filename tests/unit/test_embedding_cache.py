@@ -0,0 +1,57 @@
+from llama_index.core.embeddings import MockEmbedding
+from llama_index.core.schema import TextNode
+
+from server.indexing.embedding_cache import DiskEmbeddingCache
+from server.indexing.reddit_query_index import RedditQueryIndex
+
+
+class CountingEmbedding(MockEmbedding):
+    calls: int = 0
+
+    def _get_text_embeddings(self, texts):
+        self.calls += len(texts)
+        return super()._get_text_embeddings(texts)
+
+
+def test_disk_cache_roundtrip_is_keyed_by_model(tmp_path):
+    path = str(tmp_path / "emb.sqlite")
+    cache = DiskEmbeddingCache("model-a", path)
+    cache.put_many(["hello"], [[0.5, 0.25]])
+
+    assert cache.get_many(["hello", "other"]) == [[0.5, 0.25], None]
+    assert DiskEmbeddingCache("model-b", path).get_many(["hello"]) == [None]
+
+
+def test_disk_cache_evicts_least_recently_used(tmp_path):
+    # Each 2-dim float32 vector is 8 bytes; room for two entries.
+    cache = DiskEmbeddingCache("m", str(tmp_path / "emb.sqlite"), max_bytes=16)
+    cache.put_many(["a", "b"], [[1.0, 1.0], [2.0, 2.0]])
+    cache.get_many(["a"])  # touch "a" so "b" is the oldest
+    cache.put_many(["c"], [[3.0, 3.0]])
+
+    assert cache.get_many(["a", "b", "c"]) == [[1.0, 1.0], None, [3.0, 3.0]]
+
+
+def test_disk_cache_tracks_its_size_across_rewrites(tmp_path):
+    path = str(tmp_path / "emb.sqlite")
+    cache = DiskEmbeddingCache("m", path, max_bytes=16)
+    cache.put_many(["a"], [[1.0, 1.0]])
+    cache.put_many(["a", "b"], [[1.5, 1.5], [2.0, 2.0]])  # rewriting "a" adds no bytes
+
+    assert cache.get_many(["a", "b"]) == [[1.5, 1.5], [2.0, 2.0]]
+    assert cache._bytes == 16
+    assert DiskEmbeddingCache("m", path, max_bytes=16)._bytes == 16
+
+
+def test_embed_nodes_skips_cached_texts(tmp_path):
+    cache = DiskEmbeddingCache("m", str(tmp_path / "emb.sqlite"))
+    rqi = RedditQueryIndex(collection_name="test_embedding_cache", embedding_cache=cache)
+    model = CountingEmbedding(embed_dim=4)
+
+    rqi._embed_nodes([TextNode(text="same"), TextNode(text="same")], model)
+    assert model.calls == 1
+
+    nodes = [TextNode(text="same"), TextNode(text="new")]
+    rqi._embed_nodes(nodes, model)
+    assert model.calls == 2
+    assert all(n.embedding is not None for n in nodes)
@@ -0,0 +1,109 @@
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from server.indexing import freshness
+from server.indexing.freshness import (
+    FreshnessState,
+    MemoryFreshnessStore,
+    RedisFreshnessStore,
+    select_changed,
+)
+from server.indexing.reddit_index_utils import RedditIndexUtils
+from server.indexing.reddit_query_index import RedditQueryIndex
+
+
+def _post(id, created, score=10, edited=False, num_comments=0):
+    return SimpleNamespace(
+        id=id, title=id, created_utc=created, score=score, edited=edited, num_comments=num_comments
+    )
+
+
+def test_state_tracks_high_water_and_changes():
+    state = FreshnessState()
+    state.update(RedditIndexUtils.extract_records([_post("a", 100.0), _post("b", 200.0)]))
+    assert state.high_water == 200.0
+
+    listing = [
+        _post("c", 300.0),  # newer than the mark
+        _post("b", 200.0, score=11),  # small score drift: unchanged
+        _post("a", 100.0, edited=150.0),  # edited since last refresh
+        _post("d", 50.0),  # old but never seen
+    ]
+    changed, skipped = select_changed(listing, state)
+    assert [s.id for s in changed] == ["c", "a", "d"]
+    assert skipped == 1
+
+    assert state.needs_update("b", 200.0, (30, None, 0))  # large score change
+    assert state.needs_update("b", 200.0, (10, None, 4))  # new comments
+
+
+def test_state_roundtrip_and_expiry():
+    state = FreshnessState()
+    state.update(RedditIndexUtils.extract_records([_post("a", 100.0)]), now=1000.0)
+    store = MemoryFreshnessStore()
+    store.put("Python  tips", "py", state)
+
+    loaded = store.get("python tips", "PY")
+    assert loaded == state
+    assert not loaded.is_expired(1, now=1000.0 + 3600)
+    assert loaded.is_expired(1, now=1000.0 + 2 * 86400)
+
+
+def test_concurrent_writers_merge_fingerprints(monkeypatch):
+    store = MemoryFreshnessStore()
+    # Both writers start from the same (empty) state, as _remember and refresh() can.
+    assert store.get("q", None) is None
+    store.record("q", None, RedditIndexUtils.extract_records([_post("a", 100.0)]), now=1.0)
+    store.record("q", None, RedditIndexUtils.extract_records([_post("b", 50.0)]), now=2.0)
+    store.touch("q", None, now=3.0)
+
+    state = store.get("q", None)
+    assert set(state.fingerprints) == {"a", "b"}
+    assert state.high_water == 100.0 and state.refreshed_at == 3.0
+
+    monkeypatch.setattr(freshness, "MAX_TRACKED_SUBMISSIONS", 1)
+    assert set(store.get("q", None).fingerprints) == {"a"}
+    monkeypatch.setattr(freshness, "MAX_TRACKED_SUBMISSIONS", 10)
+    assert set(store.get("q", None).fingerprints) == {"a"}
+
+
+def test_redis_store_writes_fields_with_a_ttl():
+    with patch("redis.Redis.from_url") as from_url:
+        store = RedisFreshnessStore("posts", "redis://x", ttl_seconds=86400)
+    pipe = from_url.return_value.pipeline.return_value
+    store.record("q", None, RedditIndexUtils.extract_records([_post("a", 100.0)]), now=5.0)
+
+    key = store.key("q", None)
+    fields = pipe.hset.call_args.kwargs["mapping"]
+    assert pipe.hset.call_args.args == (key,) and set(fields) == {"fp:a", "refreshed_at"}
+    pipe.expire.assert_called_once_with(key, 86400)
+    pipe.execute.assert_called_once_with()
+    from_url.return_value.set.assert_not_called()
+
+
+@patch("server.indexing.reddit_query_index.qdrant_client.QdrantClient")
+@patch("server.indexing.reddit_query_index.RedditConnector")
+def test_refresh_only_reindexes_new_or_changed(mock_reddit, mock_qdrant_client):
+    connector = mock_reddit.return_value
+    store = MemoryFreshnessStore()
+    rqi = RedditQueryIndex(
+        collection_name="test_refresh",
+        embed_model="default",
+        embedding_cache=None,
+        freshness_store=store,
+    )
+    indexed = []
+    with patch.object(RedditQueryIndex, "index_records", lambda self, r, q: indexed.append(r)):
+        connector.search.return_value = [_post("a", 100.0), _post("b", 200.0)]
+        assert rqi.refresh("q") == 2
+
+        connector.search.return_value = [_post("c", 300.0), _post("b", 200.0), _post("a", 100.0)]
+        assert rqi.refresh("q") == 1
+
+    assert [r.id for r in indexed[-1]] == ["c"]
+    assert indexed[-1][0].retrieved_at is not None
+    kwargs = connector.search.call_args.kwargs
+    assert kwargs["sort"] == "new" and kwargs["include_comments"] is False
+    expanded = connector.expand_comments.call_args.args[0]
+    assert [s.id for s in expanded] == ["c"]
+    assert store.get("q", None).high_water == 300.0
@@ -0,0 +1,103 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from server.retrieval.fusion import reciprocal_rank_fusion
+from server.retrieval.hybrid import HybridSearchEngine
+
+
+def test_rrf_rewards_agreement_between_rankings():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "d"]], k=60)
+    assert [doc_id for doc_id, _ in fused] == ["b", "a", "d", "c"]
+    assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+
+
+class FakeQdrant:
+    def __init__(self, points, delay=0.0, fail=False):
+        self.points = points
+        self.delay = delay
+        self.fail = fail
+        self.calls = []
+
+    async def query_points(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("qdrant down")
+        return SimpleNamespace(points=self.points)
+
+
+def _point(doc_id, score, **payload):
+    payload.update(doc_id=doc_id, _node_content=json.dumps({"text": f"text of {doc_id}"}))
+    return SimpleNamespace(id=doc_id, score=score, payload=payload)
+
+
+def _meili(hits, delay=0.0):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(delay)
+        handler.bodies.append(json.loads(request.content))
+        return httpx.Response(200, json={"hits": hits})
+
+    handler.bodies = []
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://meili")
+    return client, handler
+
+
+@pytest.mark.asyncio
+async def test_search_fuses_both_backends_concurrently():
+    qdrant = FakeQdrant(
+        [
+            _point("p1", 0.9, kind="submission", title="Post one", permalink="/r/py/comments/p1/"),
+            _point("c1", 0.8, kind="comment", submission_id="p1", subreddit="py"),
+        ],
+        delay=0.2,
+    )
+    http, handler = _meili(
+        [{"id": "c1", "body": "text of c1", "submission_id": "p1"}, {"id": "p2", "title": "Two"}],
+        delay=0.2,
+    )
+    engine = HybridSearchEngine("idx", qdrant=qdrant, http=http)
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    results = await engine.search("python", top_k=3, query_vector=[0.1, 0.2])
+    elapsed = loop.time() - started
+
+    assert elapsed < 0.35  # both backends ran at the same time
+    assert [r.doc_id for r in results] == ["c1", "p1", "p2"]
+    assert results[0].semantic_rank == 2 and results[0].lexical_rank == 1
+    assert results[1].url == "https://www.reddit.com/r/py/comments/p1/"
+    assert results[0].title.startswith("Comment in r/py")
+    assert handler.bodies[0]["q"] == "python"
+
+
+@pytest.mark.asyncio
+async def test_search_survives_a_failing_backend_and_applies_subreddit_filter():
+    qdrant = FakeQdrant([], fail=True)
+    http, handler = _meili([{"id": "p2", "title": "Two", "permalink": "/r/py/comments/p2/"}])
+    engine = HybridSearchEngine("idx", qdrant=qdrant, http=http)
+
+    results = await engine.search("python", subreddit="py", query_vector=[0.1])
+    assert [r.doc_id for r in results] == ["p2"]
+    assert handler.bodies[0]["filter"] == 'subreddit_lc = "py"'
+    assert qdrant.calls[0]["query_filter"].must[0].key == "subreddit_lc"
+
+
+@pytest.mark.asyncio
+async def test_chunks_of_one_post_are_grouped_into_a_single_hit():
+    qdrant = FakeQdrant(
+        [
+            _point("p1", 0.9, title="Long post", chunk_index=3),
+            _point("p1", 0.8, title="Long post", chunk_index=0),
+            _point("p2", 0.7, title="Other"),
+        ]
+    )
+    http, _ = _meili([])
+    engine = HybridSearchEngine("idx", qdrant=qdrant, http=http)
+
+    results = await engine.search("python", query_vector=[0.1])
+    assert [r.doc_id for r in results] == ["p1", "p2"]
+    assert results[0].metadata["chunk_index"] == 3
@@ -0,0 +1,284 @@
+import asyncio
+from collections import defaultdict
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from server.jobs.queue import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue
+from server.jobs.worker import JobWorker
+from server.main import app
+from server.routes.jobs import get_job_queue
+from server.routes.search import (
+    get_reranker,
+    get_result_cache,
+    get_search_engine,
+    get_semantic_cache,
+)
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self._redis = redis
+        self._messages = asyncio.Queue()
+        self._channels = []
+
+    async def subscribe(self, channel):
+        self._channels.append(channel)
+        self._redis.subscribers[channel].append(self._messages)
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=None):
+        try:
+            return await asyncio.wait_for(self._messages.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def unsubscribe(self):
+        for channel in self._channels:
+            self._redis.subscribers[channel].remove(self._messages)
+
+    async def aclose(self):
+        pass
+
+
+class FakeAsyncRedis:
+    """The handful of ``redis.asyncio`` commands the job queue uses."""
+
+    def __init__(self):
+        self.strings = {}
+        self.hashes = defaultdict(dict)
+        self.lists = defaultdict(list)
+        self.sets = defaultdict(set)
+        self.subscribers = defaultdict(list)
+
+    async def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.strings:
+            return None
+        self.strings[key] = value if isinstance(value, bytes) else value.encode()
+        return True
+
+    async def get(self, key):
+        return self.strings.get(key)
+
+    async def exists(self, key):
+        return int(key in self.strings)
+
+    async def delete(self, key):
+        self.strings.pop(key, None)
+        self.hashes.pop(key, None)
+        self.lists.pop(key, None)
+
+    async def hset(self, key, mapping):
+        self.hashes[key].update({k.encode(): v.encode() for k, v in mapping.items()})
+
+    async def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+    async def expire(self, key, seconds):
+        pass
+
+    async def lpush(self, key, value):
+        self.lists[key].insert(0, value.encode())
+
+    async def rpush(self, key, value):
+        self.lists[key].append(value.encode())
+
+    async def blmove(self, source, destination, timeout, src="LEFT", dest="RIGHT"):
+        assert (src, dest) == ("RIGHT", "LEFT")
+        if not self.lists[source]:
+            await asyncio.sleep(0)
+            return None
+        value = self.lists[source].pop()
+        self.lists[destination].insert(0, value)
+        return value
+
+    async def lrem(self, key, count, value):
+        value = value if isinstance(value, bytes) else value.encode()
+        before = len(self.lists[key])
+        self.lists[key] = [v for v in self.lists[key] if v != value]
+        return before - len(self.lists[key])
+
+    async def lrange(self, key, start, end):
+        return list(self.lists[key])
+
+    async def sadd(self, key, value):
+        self.sets[key].add(value.encode())
+
+    async def srem(self, key, value):
+        members = self.sets[key]
+        if value.encode() in members:
+            members.discard(value.encode())
+            return 1
+        return 0
+
+    async def smembers(self, key):
+        return set(self.sets[key])
+
+    async def publish(self, channel, message):
+        for queue in self.subscribers[channel]:
+            queue.put_nowait({"type": "message", "channel": channel, "data": message})
+
+    def pubsub(self):
+        return FakePubSub(self)
+
+    def register_script(self, script):
+        assert "DEL" in script
+
+        async def delete_if_equal(keys, args):
+            value = args[0] if isinstance(args[0], bytes) else args[0].encode()
+            if self.strings.get(keys[0]) != value:
+                return 0
+            del self.strings[keys[0]]
+            return 1
+
+        return delete_if_equal
+
+
+class YieldingRedis(FakeAsyncRedis):
+    """Lets other coroutines run in the middle of every hash write."""
+
+    async def hset(self, key, mapping):
+        await asyncio.sleep(0)
+        await super().hset(key, mapping)
+
+
+class RecordingIndex:
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    def refresh(self, query, subreddit=None, limit=100, *, priority=None):
+        self.calls.append((query, subreddit, limit, priority.name))
+        if self.fail:
+            raise RuntimeError("reddit down")
+        return 3
+
+
+class EmptyEngine:
+    async def search(self, query, top_k=10, **kwargs):
+        return []
+
+
+@pytest.mark.asyncio
+async def test_enqueue_collapses_duplicates_until_the_job_finishes():
+    queue = JobQueue(FakeAsyncRedis())
+    first, created = await queue.enqueue("Python  Web", "Python")
+    again, created_again = await queue.enqueue("python web", "python")
+    other, _ = await queue.enqueue("python web", None)
+    assert created and not created_again
+    assert again.id == first.id and other.id != first.id
+
+    claimed = await queue.claim(timeout=0)
+    assert claimed.id == first.id and claimed.status == RUNNING
+    # Still in flight: duplicates keep joining the running job.
+    assert (await queue.enqueue("python web", "python"))[0].id == first.id
+
+    await queue.complete(claimed, indexed=2)
+    fresh, created = await queue.enqueue("python web", "python")
+    assert created and fresh.id != first.id
+
+
+@pytest.mark.asyncio
+async def test_concurrent_enqueues_create_a_single_job():
+    redis = YieldingRedis()
+    queue = JobQueue(redis)
+    results = await asyncio.gather(*(queue.enqueue("python web") for _ in range(5)))
+    assert sum(created for _, created in results) == 1
+    assert len({job.id for job, _ in results}) == 1
+    assert len(redis.lists[queue.pending_key]) == 1
+
+    # Same when they all find the pointer of a finished job.
+    job = await queue.claim(timeout=0)
+    await queue.complete(job, indexed=1)
+    redis.strings[queue.active_key("python web", None)] = job.id.encode()
+    results = await asyncio.gather(*(queue.enqueue("python web") for _ in range(5)))
+    assert sum(created for _, created in results) == 1
+    assert len({job.id for job, _ in results}) == 1
+    # Losers do not leave job hashes behind.
+    assert len(redis.hashes) == 2
+
+
+@pytest.mark.asyncio
+async def test_worker_runs_jobs_and_wakes_waiters():
+    queue = JobQueue(FakeAsyncRedis())
+    index = RecordingIndex()
+    job, _ = await queue.enqueue("rust async", "rust", 25, priority="INTERACTIVE")
+
+    waiter = asyncio.create_task(queue.wait(job.id, timeout=5))
+    await asyncio.sleep(0)
+    await JobWorker(queue, index, poll_seconds=0).run_once()
+    done = await waiter
+
+    assert index.calls == [("rust async", "rust", 25, "INTERACTIVE")]
+    assert done.status == SUCCEEDED and done.indexed == 3
+    assert await JobWorker(queue, index, poll_seconds=0).run_once() is None
+
+
+@pytest.mark.asyncio
+async def test_failed_job_records_error_and_releases_the_pair():
+    queue = JobQueue(FakeAsyncRedis())
+    job, _ = await queue.enqueue("golang")
+    await JobWorker(queue, RecordingIndex(fail=True), poll_seconds=0).run_once()
+
+    failed = await queue.get(job.id)
+    assert failed.status == FAILED and "reddit down" in failed.error
+    assert (await queue.enqueue("golang"))[1] is True
+
+
+@pytest.mark.asyncio
+async def test_jobs_of_a_dead_worker_are_requeued_on_worker_start():
+    redis = FakeAsyncRedis()
+    dead = JobQueue(redis, worker_id="dead")
+    job, _ = await dead.enqueue("zig comptime")
+    finished, _ = await dead.enqueue("nim macros")
+    assert (await dead.claim(timeout=0)).id == job.id
+    assert (await dead.claim(timeout=0)).id == finished.id
+    await dead.complete(finished, indexed=1)
+    assert redis.lists[dead.processing_key()] == [job.id.encode()]
+
+    alive = JobQueue(redis, worker_id="alive")
+    # The dead worker's heartbeat is still fresh: its claimed job is left alone.
+    assert await alive.recover() == 0
+
+    del redis.strings[dead.heartbeat_key()]
+    index = RecordingIndex()
+    worker = JobWorker(alive, index, poll_seconds=0)
+    worker.stop()
+    await worker.run()
+    assert (await alive.get(job.id)).status == QUEUED
+    assert dead.processing_key() not in redis.lists
+    assert await alive.recover() == 0
+
+    await worker.run_once()
+    assert index.calls == [("zig comptime", None, 100, "BACKGROUND")]
+    assert (await alive.get(job.id)).status == SUCCEEDED
+    assert redis.lists[alive.processing_key()] == []
+
+
+@pytest.mark.asyncio
+async def test_search_returns_immediately_with_refresh_job():
+    queue = JobQueue(FakeAsyncRedis())
+    app.dependency_overrides[get_search_engine] = EmptyEngine
+    app.dependency_overrides[get_result_cache] = lambda: None
+    app.dependency_overrides[get_semantic_cache] = lambda: None
+    app.dependency_overrides[get_reranker] = lambda: None
+    app.dependency_overrides[get_job_queue] = lambda: queue
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            resp = await ac.post("/search", json={"query": "fastapi", "refresh": True})
+            assert resp.status_code == 200
+            job = resp.json()["job"]
+            assert resp.json()["results"] == [] and job["status"] == "queued"
+
+            plain = await ac.post("/search", json={"query": "fastapi"})
+            assert plain.json()["job"] is None
+
+            dup = await ac.post("/jobs", json={"query": "FastAPI"})
+            assert dup.status_code == 202
+            assert dup.json()["id"] == job["id"] and dup.json()["created"] is False
+
+            await JobWorker(queue, RecordingIndex(), poll_seconds=0).run_once()
+            status = await ac.get(f"/jobs/{job['id']}", params={"wait": 1})
+            assert status.json()["status"] == "succeeded"
+            assert (await ac.get("/jobs/nope")).status_code == 404
+    finally:
+        app.dependency_overrides.clear()
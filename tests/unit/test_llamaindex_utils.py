@@ -1,5 +1,7 @@
 from types import SimpleNamespace
 
+from llama_index.core.schema import MetadataMode
+
 from server.indexing.reddit_index_utils import RedditIndexUtils
 
 
@@ -51,3 +53,87 @@ def test_map_submissions_to_text_nodes_empty_title():
     assert len(nodes) == 1
     assert isinstance(nodes[0].text, str)
     assert nodes[0].text == ""
+
+
+class _Forest(list):
+    def __init__(self, items):
+        super().__init__(items)
+        self.list_calls = 0
+
+    def list(self):
+        self.list_calls += 1
+        return list(self)
+
+
+def _submission_with_comments():
+    comments = _Forest(
+        [
+            SimpleNamespace(
+                id="c1",
+                body="First!",
+                link_id="t3_abc123",
+                parent_id="t3_abc123",
+                author=SimpleNamespace(name="u2"),
+                subreddit="test",
+            ),
+            SimpleNamespace(id="c2", body="Reply", link_id="t3_abc123", parent_id="t1_c1"),
+        ]
+    )
+    return (
+        SimpleNamespace(
+            id="abc123",
+            title="Hello World",
+            selftext="Body text",
+            subreddit="Test",
+            author=SimpleNamespace(name="U1"),
+            comments=comments,
+        ),
+        comments,
+    )
+
+
+def test_records_feed_both_output_formats_from_one_pass():
+    submission, forest = _submission_with_comments()
+    records = RedditIndexUtils.extract_records([submission])
+    assert forest.list_calls == 1
+
+    nodes = RedditIndexUtils.records_to_text_nodes(records, query="hello")
+    docs = RedditIndexUtils.records_to_meili_documents(records, query="hello")
+    assert forest.list_calls == 1
+    assert [n.metadata["doc_id"] for n in nodes] == ["abc123", "c1", "c2"]
+    assert [d["id"] for d in docs] == ["abc123", "c1", "c2"]
+
+    comment_node = nodes[1]
+    assert comment_node.text == "First!"
+    assert comment_node.metadata["submission_id"] == "abc123"
+    assert comment_node.metadata["author"] == "u2"
+    assert docs[0]["selftext"] == "Body text"
+    # Names keep their display case; filters use the lowercased copies.
+    assert docs[0]["author"] == "U1" and docs[0]["author_lc"] == "u1"
+    assert docs[0]["subreddit"] == nodes[0].metadata["subreddit"] == "Test"
+    assert docs[0]["subreddit_lc"] == nodes[0].metadata["subreddit_lc"] == "test"
+    assert "subreddit_lc" not in nodes[0].get_metadata_str(MetadataMode.EMBED)
+    assert docs[2]["kind"] == "comment"
+
+
+def test_extraction_does_not_trigger_lazy_attribute_fetch():
+    class LazyModel:
+        def __init__(self):
+            self.id = "lazy1"
+            self.title = "Lazy"
+
+        def __getattr__(self, name):  # PRAW fetches from the network here
+            raise AssertionError(f"unexpected lazy fetch of {name}")
+
+    record = RedditIndexUtils.extract_submission(LazyModel())
+    assert record.id == "lazy1"
+    assert record.selftext is None
+
+
+def test_vector_store_payload_keeps_reddit_doc_id():
+    from llama_index.core.vector_stores.utils import node_to_metadata_dict
+
+    submission, _ = _submission_with_comments()
+    nodes = RedditIndexUtils.map_submissions_to_text_nodes([submission], query="q")
+    payloads = [node_to_metadata_dict(n) for n in nodes]
+    assert [p["doc_id"] for p in payloads] == ["abc123", "c1", "c2"]
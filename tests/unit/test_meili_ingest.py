@@ -0,0 +1,98 @@
+import threading
+import time
+from unittest.mock import MagicMock
+
+from server.indexing.meili_ingest import MeiliIngestor
+
+
+def _client():
+    client = MagicMock()
+    index = MagicMock()
+    uids = iter(range(1, 100))
+    index.add_documents.side_effect = lambda docs, pk: {"taskUid": next(uids)}
+    client.index.return_value = index
+    client.get_task.return_value = {"status": "succeeded"}
+    return client, index
+
+
+def test_documents_from_many_upserts_are_sent_in_one_batch():
+    client, index = _client()
+    ingestor = MeiliIngestor(client, "idx", batch_size=100, flush_interval_seconds=60)
+    ingestor.add([{"id": "a"}, {"id": "b"}])
+    ingestor.add([{"id": "b", "title": "newer"}, {"id": "c"}])
+    index.add_documents.assert_not_called()
+
+    assert ingestor.flush() == [1]
+    (docs, pk), _ = index.add_documents.call_args
+    assert pk == "id"
+    assert [d["id"] for d in docs] == ["a", "b", "c"]
+    assert docs[1]["title"] == "newer"
+    assert ingestor.pending_tasks() == [1]
+    client.wait_for_task.assert_not_called()
+
+
+def test_background_flush_when_batch_is_full_and_tasks_are_tracked():
+    client, index = _client()
+    applied = MagicMock()
+    ingestor = MeiliIngestor(
+        client, "idx", batch_size=2, flush_interval_seconds=0.05, on_applied=applied
+    )
+    ingestor.add([{"id": "a"}, {"id": "b"}])
+    deadline = time.time() + 2
+    while (index.add_documents.call_count == 0 or ingestor.pending_tasks()) and (
+        time.time() < deadline
+    ):
+        time.sleep(0.01)
+    assert index.add_documents.call_count == 1
+    assert ingestor.pending_tasks() == []
+    # Only once the task has succeeded are the documents announced as applied.
+    applied.assert_called_once_with()
+    ingestor.close()
+
+
+def test_sync_add_waits_for_task():
+    client, index = _client()
+    applied = MagicMock()
+    ingestor = MeiliIngestor(
+        client, "idx", batch_size=100, flush_interval_seconds=60, on_applied=applied
+    )
+    ingestor.add([{"id": "a"}])
+    applied.assert_not_called()
+    ingestor.add([{"id": "b"}], wait=True)
+    index.add_documents.assert_called_once()
+    client.wait_for_task.assert_called_once_with(1)
+    applied.assert_called_once_with()
+
+
+def test_batches_are_enqueued_in_the_order_they_were_drained():
+    client, index = _client()
+    sent = []
+    first_send = threading.Event()
+    release = threading.Event()
+
+    def add_documents(docs, pk):
+        # The order in which tasks are enqueued is the order calls return.
+        if not first_send.is_set():
+            first_send.set()
+            release.wait(2)
+        sent.append([d["v"] for d in docs])
+        return {"taskUid": len(sent)}
+
+    index.add_documents.side_effect = add_documents
+    ingestor = MeiliIngestor(client, "idx", batch_size=100, flush_interval_seconds=60)
+    ingestor.add([{"id": "a", "v": 1}])
+    background = threading.Thread(target=ingestor.flush)
+    background.start()
+    assert first_send.wait(2)
+    # A synchronous add while the older batch is still being sent queues behind it.
+    caller = threading.Thread(
+        target=ingestor.add, args=([{"id": "a", "v": 2}],), kwargs={"wait": True}
+    )
+    caller.start()
+    time.sleep(0.05)
+    release.set()
+    background.join(2)
+    caller.join(2)
+
+    assert sent == [[1], [2]]
+    assert [c.args[0] for c in client.wait_for_task.call_args_list] == [1, 2]
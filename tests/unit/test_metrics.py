@@ -0,0 +1,156 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from httpx import ASGITransport, AsyncClient
+from prometheus_client import REGISTRY, make_asgi_app
+from prometheus_client.openmetrics.exposition import generate_latest
+
+from server.backends import FakeReddit
+from server.backends.synthetic import SyntheticConfig
+from server.connectors.rate_limit import RateLimitScheduler
+from server.connectors.reddit import RedditConnector
+from server.indexing.reddit_index_utils import RedditIndexUtils
+from server.metrics import (
+    HTTP_REQUESTS_IN_PROGRESS,
+    INDEX_STAGE_CALLS_TOTAL,
+    INDEX_STAGE_DURATION_SECONDS,
+    INDEX_STAGE_ITEMS_TOTAL,
+    REDDIT_COMMENTS_EXPANDED_TOTAL,
+    SWALLOWED_EXCEPTIONS_TOTAL,
+    UNMATCHED_PATH,
+    instrument_app,
+    record_swallowed,
+    track_stage,
+)
+
+
+def _value(metric, **labels):
+    return (metric.labels(**labels) if labels else metric)._value.get()
+
+
+def _observations(stage):
+    return INDEX_STAGE_DURATION_SECONDS.labels(stage=stage)._sum.get()
+
+
+def test_track_stage_counts_calls_items_and_errors():
+    ok = _value(INDEX_STAGE_CALLS_TOTAL, stage="unit", outcome="ok")
+    errors = _value(INDEX_STAGE_CALLS_TOTAL, stage="unit", outcome="error")
+    items = _value(INDEX_STAGE_ITEMS_TOTAL, stage="unit")
+
+    with track_stage("unit", items=3) as stage:
+        stage.add(2)
+    with pytest.raises(RuntimeError):
+        with track_stage("unit"):
+            raise RuntimeError("boom")
+
+    assert _value(INDEX_STAGE_CALLS_TOTAL, stage="unit", outcome="ok") == ok + 1
+    assert _value(INDEX_STAGE_CALLS_TOTAL, stage="unit", outcome="error") == errors + 1
+    assert _value(INDEX_STAGE_ITEMS_TOTAL, stage="unit") == items + 5
+
+    before = _value(SWALLOWED_EXCEPTIONS_TOTAL, stage="unit", exception="KeyError")
+    record_swallowed("unit", KeyError("x"))
+    assert _value(SWALLOWED_EXCEPTIONS_TOTAL, stage="unit", exception="KeyError") == before + 1
+
+
+def test_connector_and_mapping_stages_are_instrumented():
+    reddit = FakeReddit(synthetic=SyntheticConfig(comments_per_submission=6))
+    scheduler = RateLimitScheduler(max_calls=1000, window_seconds=1)
+    conn = RedditConnector(reddit=reddit, scheduler=scheduler)
+    expanded = _value(REDDIT_COMMENTS_EXPANDED_TOTAL)
+    listed = _value(INDEX_STAGE_ITEMS_TOTAL, stage="reddit_search")
+    mapped = _value(INDEX_STAGE_ITEMS_TOTAL, stage="map_records")
+
+    submissions = conn.search("metrics", limit=4)
+    RedditIndexUtils.extract_records(submissions)
+
+    assert _value(INDEX_STAGE_ITEMS_TOTAL, stage="reddit_search") == listed + 4
+    assert _value(REDDIT_COMMENTS_EXPANDED_TOTAL) == expanded + 4 * 6
+    assert _value(INDEX_STAGE_ITEMS_TOTAL, stage="map_records") == mapped + 4 * 7
+    assert _observations("replace_more") > 0
+
+
+def _requests(path, status_code, method="GET"):
+    return (
+        REGISTRY.get_sample_value(
+            "http_requests_total", {"method": method, "path": path, "status_code": status_code}
+        )
+        or 0.0
+    )
+
+
+@pytest.mark.asyncio
+async def test_middleware_labels_route_templates_and_buckets_unknown_paths():
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        return {"id": item_id}
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            for i in range(3):
+                yield f"{i}\n".encode()
+
+        return StreamingResponse(chunks(), media_type="text/plain")
+
+    app.mount("/prom", make_asgi_app())
+    instrument_app(app)
+
+    before = {
+        "item": _requests("/items/{item_id}", "200"),
+        "stream": _requests("/stream", "200"),
+        "unmatched": _requests(UNMATCHED_PATH, "404"),
+        "mount": _requests("/prom", "200"),
+    }
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        for i in range(3):
+            assert (await ac.get(f"/items/{i}")).status_code == 200
+        resp = await ac.get("/stream")
+        assert resp.text == "0\n1\n2\n"
+        for probe in ("/wp-admin.php", "/.env", "/random/1"):
+            assert (await ac.get(probe)).status_code == 404
+        await ac.get("/prom/", headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"})
+
+    assert _requests("/items/{item_id}", "200") == before["item"] + 3
+    assert _requests("/stream", "200") == before["stream"] + 1
+    assert _requests(UNMATCHED_PATH, "404") == before["unmatched"] + 3
+    assert _requests("/prom", "200") == before["mount"] + 1
+    assert (
+        REGISTRY.get_sample_value(
+            "http_requests_total", {"method": "GET", "path": "/random/1", "status_code": "404"}
+        )
+        is None
+    )
+    assert f'trace_id="{trace_id}"' in generate_latest(REGISTRY).decode()
+
+
+@pytest.mark.asyncio
+async def test_middleware_buckets_unknown_methods_and_tracks_in_progress_by_route():
+    app = FastAPI()
+    seen = {}
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        gauge = HTTP_REQUESTS_IN_PROGRESS.labels(method="GET", path="/items/{item_id}")
+        seen["in_progress"] = gauge._value.get()
+        return {"id": item_id}
+
+    instrument_app(app)
+
+    before = _requests(UNMATCHED_PATH, "404", method="OTHER")
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        assert (await ac.get("/items/1")).status_code == 200
+        assert (await ac.request("PROPFIND", "/nowhere")).status_code == 404
+        assert (await ac.request("XYZZY", "/nowhere")).status_code == 404
+
+    assert seen["in_progress"] >= 1
+    assert _value(HTTP_REQUESTS_IN_PROGRESS, method="GET", path="/items/{item_id}") == 0
+    assert _requests(UNMATCHED_PATH, "404", method="OTHER") == before + 2
+    assert (
+        REGISTRY.get_sample_value(
+            "http_requests_total", {"method": "XYZZY", "path": UNMATCHED_PATH, "status_code": "404"}
+        )
+        is None
+    )
@@ -0,0 +1,125 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from server.connectors.reddit import RedditConnector
+from server.query import QueryProcessor, decompose_query
+from server.retrieval.hybrid import SearchCandidate
+
+
+def test_decompose_query_splits_facets_with_shared_context():
+    assert decompose_query(
+        "fastapi vs flask: async performance, docker deployment and unit testing", 5
+    ) == [
+        "fastapi vs flask async performance, docker deployment and unit testing",
+        "fastapi vs flask async performance",
+        "fastapi vs flask docker deployment",
+        "fastapi vs flask unit testing",
+    ]
+    assert decompose_query("django orm or flask sqlalchemy", 2) == [
+        "django orm or flask sqlalchemy",
+        "django orm",
+    ]
+    assert decompose_query("best python web framework", 5) == ["best python web framework"]
+    assert decompose_query("   ", 5) == []
+
+
+def test_decompose_query_keeps_phrases_urls_and_field_tokens_whole():
+    for query in [
+        "rock and roll",
+        "pros and cons",
+        "django or flask",
+        "subreddit:python tips and tricks",
+        "python: pros and cons",
+    ]:
+        assert decompose_query(query, 5) == [query.replace(": ", " ")]
+    assert decompose_query("see https://example.com/a?x=1,2 and other stuff", 5) == [
+        "see https://example.com/a?x=1,2 and other stuff",
+        "see https://example.com/a?x=1,2",
+        "other stuff",
+    ]
+    assert decompose_query('"rock and roll" history, best guitar solos', 5) == [
+        '"rock and roll" history, best guitar solos',
+        '"rock and roll" history',
+        "best guitar solos",
+    ]
+
+
+def test_search_many_fetches_concurrently_and_dedupes():
+    listings = {
+        "a": [SimpleNamespace(id="s1"), SimpleNamespace(id="s2")],
+        "b": [SimpleNamespace(id="s2"), SimpleNamespace(id="s3")],
+    }
+    active = []
+    peak = []
+
+    connector = RedditConnector.__new__(RedditConnector)
+    connector._max_concurrency = 2
+
+    def fake_search(query, subreddit, limit, *, include_comments, priority):
+        active.append(query)
+        peak.append(len(active))
+        time.sleep(0.05)
+        active.remove(query)
+        return listings[query]
+
+    connector.search = fake_search
+    connector.expand_comments = MagicMock()
+
+    merged = connector.search_many(["a", "b", "a"], limit=2)
+
+    assert {q: [s.id for s in subs] for q, subs in merged.items()} == {
+        "a": ["s1", "s2"],
+        "b": ["s3"],
+    }
+    assert max(peak) == 2
+    expanded = connector.expand_comments.call_args.args[0]
+    assert [s.id for s in expanded] == ["s1", "s2", "s3"]
+
+
+class FakeEngine:
+    def __init__(self, rankings):
+        self.rankings = rankings
+        self.in_flight = 0
+        self.peak = 0
+
+    async def search(self, query, top_k=10, *, subreddit=None):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return [SearchCandidate(doc_id=d, score=0.0) for d in self.rankings[query]][:top_k]
+
+
+@pytest.mark.asyncio
+async def test_processor_fetches_once_and_merges_subquery_rankings():
+    index = MagicMock()
+    engine = FakeEngine(
+        {
+            "django orm or flask sqlalchemy": ["p1", "p2"],
+            "django orm": ["p3", "p1"],
+            "flask sqlalchemy": ["p2", "p4"],
+        }
+    )
+    processor = QueryProcessor(index, engine, max_subqueries=3)
+
+    result = await processor.run("django orm or flask sqlalchemy", top_k=3)
+
+    assert result.subqueries == ["django orm or flask sqlalchemy", "django orm", "flask sqlalchemy"]
+    index.upsert_many.assert_called_once()
+    assert index.upsert_many.call_args.args[0] == result.subqueries
+    assert engine.peak == 3
+    assert [c.doc_id for c in result.results] == ["p1", "p2", "p3"]
+
+
+@pytest.mark.asyncio
+async def test_processor_serves_indexed_results_when_fetch_fails():
+    index = MagicMock()
+    index.upsert_many.side_effect = RuntimeError("reddit down")
+    processor = QueryProcessor(index, FakeEngine({"django": ["p1"]}), max_subqueries=3)
+
+    result = await processor.run("django")
+    assert [c.doc_id for c in result.results] == ["p1"]
@@ -0,0 +1,90 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from server.connectors.rate_limit import Priority, RateLimitScheduler, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _http_error(status: int) -> Exception:
+    exc = Exception(f"received {status} HTTP response")
+    exc.response = SimpleNamespace(status_code=status)  # type: ignore[attr-defined]
+    return exc
+
+
+def test_token_bucket_refills_over_time():
+    clock = FakeClock()
+    bucket = TokenBucket(capacity=2, refill_per_second=1.0, clock=clock)
+    bucket.consume()
+    bucket.consume()
+    assert bucket.wait_time() == pytest.approx(1.0)
+    clock.now = 1.0
+    assert bucket.wait_time() == 0.0
+
+
+def test_call_retries_on_429_and_5xx_then_succeeds():
+    sleeps = []
+    scheduler = RateLimitScheduler(
+        max_calls=100, window_seconds=1, retry_max_attempts=3, sleep=sleeps.append
+    )
+    errors = [_http_error(429), _http_error(503)]
+
+    def flaky():
+        if errors:
+            raise errors.pop(0)
+        return "ok"
+
+    assert scheduler.call(flaky) == "ok"
+    assert len(sleeps) == 2
+
+
+def test_call_does_not_retry_client_errors():
+    sleeps = []
+    scheduler = RateLimitScheduler(max_calls=100, window_seconds=1, sleep=sleeps.append)
+    calls = []
+
+    def forbidden():
+        calls.append(1)
+        raise _http_error(403)
+
+    with pytest.raises(Exception, match="403"):
+        scheduler.call(forbidden)
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_exhausted_header_quota_blocks_until_reset():
+    clock = FakeClock()
+    scheduler = RateLimitScheduler(max_calls=100, window_seconds=1, clock=clock)
+    scheduler.update_from_headers({"X-Ratelimit-Remaining": "0", "X-Ratelimit-Reset": "30"})
+    assert scheduler._quota_wait_time() == pytest.approx(30.0)
+    clock.now = 31.0
+    scheduler.acquire()  # does not block once the window has reset
+
+
+def test_interactive_callers_are_admitted_before_background():
+    scheduler = RateLimitScheduler(max_calls=1, window_seconds=0.2)
+    scheduler.acquire()  # drain the bucket so the next callers queue up
+    order = []
+
+    def worker(priority, name):
+        scheduler.acquire(priority)
+        order.append(name)
+
+    background = threading.Thread(target=worker, args=(Priority.BACKGROUND, "background"))
+    background.start()
+    time.sleep(0.02)
+    interactive = threading.Thread(target=worker, args=(Priority.INTERACTIVE, "interactive"))
+    interactive.start()
+    background.join(timeout=5)
+    interactive.join(timeout=5)
+    assert order == ["interactive", "background"]
@@ -3,7 +3,9 @@ from __future__ import annotations
 from types import SimpleNamespace
 
 import pytest
+from praw.models import MoreComments
 
+from server.connectors.rate_limit import Priority, RateLimitScheduler
 from server.connectors.reddit import RedditConnector
 
 
@@ -101,3 +103,210 @@ def test_search_empty_query_returns_empty(monkeypatch):
     conn = RedditConnector()
     assert conn.search("") == []
     assert conn.search("   ") == []
+
+
+def test_search_expands_comments_concurrently(monkeypatch):
+    monkeypatch.setenv("REDDIT_CLIENT_ID", "cid")
+    monkeypatch.setenv("REDDIT_CLIENT_SECRET", "csecret")
+
+    import threading
+    import time
+
+    lock = threading.Lock()
+    state = {"active": 0, "peak": 0}
+
+    class FakeForest:
+        def replace_more(self, limit=None):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.05)
+            with lock:
+                state["active"] -= 1
+
+        def list(self):
+            return []
+
+    class FakeAll:
+        def search(self, query: str, limit: int):
+            return [_fake_submission(id=str(i), comments=FakeForest()) for i in range(limit)]
+
+    class FakeReddit:
+        def subreddit(self, name: str):
+            return FakeAll()
+
+    import server.connectors.reddit as reddit_mod
+
+    monkeypatch.setattr(reddit_mod, "praw", SimpleNamespace(Reddit=lambda **_: FakeReddit()))
+
+    conn = RedditConnector(max_concurrency=4)
+    results = conn.search("fastapi", limit=4)
+    # Order of the listing is preserved while expansions overlap in time.
+    assert [r.id for r in results] == ["0", "1", "2", "3"]
+    assert state["peak"] > 1
+
+
+def test_iter_search_streams_with_bounded_lookahead(monkeypatch):
+    monkeypatch.setenv("REDDIT_CLIENT_ID", "cid")
+    monkeypatch.setenv("REDDIT_CLIENT_SECRET", "csecret")
+
+    produced = []
+
+    class FakeForest:
+        def replace_more(self, limit=None):
+            pass
+
+    class FakeAll:
+        def search(self, query: str, limit: int):
+            for i in range(limit):
+                produced.append(i)
+                yield _fake_submission(id=str(i), comments=FakeForest())
+
+    class FakeReddit:
+        def subreddit(self, name: str):
+            return FakeAll()
+
+    import server.connectors.reddit as reddit_mod
+
+    monkeypatch.setattr(reddit_mod, "praw", SimpleNamespace(Reddit=lambda **_: FakeReddit()))
+
+    conn = RedditConnector(max_concurrency=2)
+    stream = conn.iter_search("fastapi", limit=10)
+    first = next(stream)
+    assert first.id == "0"
+    # Only the look-ahead window has been pulled from the listing.
+    assert len(produced) <= 3
+    assert [s.id for s in stream] == [str(i) for i in range(1, 10)]
+
+
+def test_each_thread_uses_its_own_praw_client(monkeypatch):
+    monkeypatch.setenv("REDDIT_CLIENT_ID", "cid")
+    monkeypatch.setenv("REDDIT_CLIENT_SECRET", "csecret")
+
+    import threading
+    import time
+
+    clients = []
+
+    class FakeReddit:
+        def __init__(self):
+            self.threads = set()
+            clients.append(self)
+
+        def use(self):
+            self.threads.add(threading.get_ident())
+
+        def subreddit(self, name: str):
+            self.use()
+            return FakeAll(self)
+
+    class FakeForest:
+        def __init__(self, submission):
+            self.submission = submission
+
+        def replace_more(self, limit=None):
+            self.submission._reddit.use()
+            time.sleep(0.02)
+
+        def list(self):
+            return []
+
+    class FakeAll:
+        def __init__(self, reddit):
+            self.reddit = reddit
+
+        def search(self, query: str, limit: int):
+            subs = [_fake_submission(id=f"{query}{i}", _reddit=self.reddit) for i in range(limit)]
+            for s in subs:
+                s.comments = FakeForest(s)
+            return subs
+
+    import server.connectors.reddit as reddit_mod
+
+    monkeypatch.setattr(reddit_mod, "praw", SimpleNamespace(Reddit=lambda **_: FakeReddit()))
+
+    conn = RedditConnector(max_concurrency=3)
+    merged = conn.search_many(["a", "b", "c"], limit=3)
+
+    assert sum(len(subs) for subs in merged.values()) == 9
+    assert len(clients) > 1
+    assert all(len(c.threads) <= 1 for c in clients)
+
+
+class RecordingScheduler(RateLimitScheduler):
+    def __init__(self):
+        super().__init__(max_calls=10_000, window_seconds=1, sleep=lambda _: None)
+        self.costs = []
+
+    def acquire(self, priority=Priority.INTERACTIVE, cost=1.0):
+        self.costs.append(cost)
+        super().acquire(priority, cost)
+
+
+def test_search_retries_a_failed_page_without_dropping_earlier_pages():
+    class Listing:
+        """Like PRAW's ListingGenerator: a failed page fetch can be retried."""
+
+        def __init__(self, limit):
+            self.limit, self.index, self.failed = limit, 0, False
+
+        def __iter__(self):
+            return self
+
+        def __next__(self):
+            if self.index >= self.limit:
+                raise StopIteration
+            if self.index == 100 and not self.failed:
+                self.failed = True
+                exc = Exception("received 429 HTTP response")
+                exc.response = SimpleNamespace(status_code=429)
+                raise exc
+            self.index += 1
+            return _fake_submission(id=str(self.index))
+
+    reddit = SimpleNamespace(
+        subreddit=lambda name: SimpleNamespace(search=lambda q, limit: Listing(limit))
+    )
+    scheduler = RecordingScheduler()
+    conn = RedditConnector(reddit=reddit, scheduler=scheduler)
+
+    results = conn.search("fastapi", limit=250, include_comments=False)
+
+    assert [r.id for r in results] == [str(i) for i in range(1, 251)]
+    # Three pages, plus the retried second page.
+    assert scheduler.costs == [1.0, 1.0, 1.0, 1.0]
+
+
+def test_listing_reserves_no_page_past_an_exact_multiple_of_the_page_size():
+    listing = (_fake_submission(id=str(i)) for i in range(300))
+    reddit = SimpleNamespace(
+        subreddit=lambda name: SimpleNamespace(search=lambda q, limit: listing)
+    )
+    scheduler = RecordingScheduler()
+    conn = RedditConnector(reddit=reddit, scheduler=scheduler)
+
+    results = conn.search("fastapi", limit=200, include_comments=False)
+
+    assert len(results) == 200
+    assert scheduler.costs == [1.0, 1.0]
+
+
+def test_comment_expansion_is_charged_per_more_comments():
+    more = [MoreComments(None, {"count": 3, "children": ["x"]}) for _ in range(5)]
+
+    class FakeForest:
+        def replace_more(self, limit=None):
+            del more[: len(more) if limit is None else limit]
+
+        def list(self):
+            return list(more)
+
+    scheduler = RecordingScheduler()
+    conn = RedditConnector(reddit=SimpleNamespace(), scheduler=scheduler)
+    submission = _fake_submission(comments=FakeForest())
+
+    conn.expand_comments([submission], replace_more_limit=2)
+    conn.expand_comments([submission], replace_more_limit=None)
+
+    # The forest fetch, then one request per MoreComments replaced.
+    assert scheduler.costs == [1.0, 2, 1.0, 3]
@@ -38,10 +38,12 @@ def test_upsert_with_results(mock_reddit, mock_meili, mock_qdrant_client, mock_v
     mock_client.index.return_value = mock_index
     mock_meili.Client.return_value = mock_client
 
-    # Make VectorStoreIndex.from_documents a no-op
-    mock_vector_index.from_documents.return_value = None
+    # Make the Qdrant-backed index a no-op
+    mock_vector_index.from_vector_store.return_value = MagicMock()
 
-    rqi = RedditQueryIndex(collection_name="test_index_with_results", embed_model="default")
+    rqi = RedditQueryIndex(
+        collection_name="test_index_with_results", embed_model="default", meili_sync=True
+    )
 
     out = rqi.upsert("q", subreddit="s", limit=1)
     assert len(out) == 1
@@ -54,3 +56,95 @@ def test_upsert_with_results(mock_reddit, mock_meili, mock_qdrant_client, mock_v
     assert isinstance(args[0], list) and len(args[0]) == 1
     assert args[1] == "id"
     mock_client.wait_for_task.assert_called_with(123)
+    mock_vector_index.from_vector_store.return_value.insert_nodes.assert_called_once()
+
+
+def test_embed_model_is_resolved_once(monkeypatch):
+    from server.indexing import registry as registry_mod
+
+    calls = []
+
+    def fake_resolve(spec):
+        calls.append(spec)
+        return object()
+
+    monkeypatch.setattr(registry_mod, "resolve_embed_model", fake_resolve)
+    reg = registry_mod.ModelRegistry()
+    first = reg.embed_model("local:some/model")
+    assert reg.embed_model("local:some/model") is first
+    assert calls == ["local:some/model"]
+    assert registry_mod.resolve_embed_spec("BAAI/bge-small-en-v1.5") == (
+        "local:BAAI/bge-small-en-v1.5"
+    )
+
+
+@patch("server.indexing.reddit_query_index.VectorStoreIndex")
+@patch("server.indexing.reddit_query_index.qdrant_client.QdrantClient")
+@patch("server.indexing.reddit_query_index.meilisearch")
+@patch("server.indexing.reddit_query_index.RedditConnector")
+def test_upsert_stream_indexes_in_micro_batches(
+    mock_reddit, mock_meili, mock_qdrant_client, mock_vector_index
+):
+    from types import SimpleNamespace
+
+    os.environ["IS_TESTING"] = "1"
+    submissions = [SimpleNamespace(id=f"s{i}", title=f"T{i}", selftext="x") for i in range(5)]
+    mock_reddit.return_value.iter_search.return_value = iter(submissions)
+    mock_meili.Client.return_value.index.return_value.add_documents.return_value = {"taskUid": 1}
+
+    rqi = RedditQueryIndex(
+        collection_name="test_upsert_stream",
+        embed_model="default",
+        embedding_cache=None,
+        meili_sync=True,
+        deduplicator=None,
+    )
+    assert rqi.upsert_stream("q", limit=5, batch_size=2) == 5
+
+    insert_nodes = mock_vector_index.from_vector_store.return_value.insert_nodes
+    assert [len(call.args[0]) for call in insert_nodes.call_args_list] == [2, 2, 1]
+    mock_reddit.return_value.search.assert_not_called()
+
+
+@patch("server.indexing.reddit_query_index.meilisearch")
+def test_reindexing_drops_points_of_chunks_that_no_longer_exist(mock_meili):
+    from qdrant_client import QdrantClient
+
+    from server.indexing.chunking import TextChunker
+    from server.indexing.reddit_index_utils import SubmissionRecord
+
+    os.environ["IS_TESTING"] = "1"
+    client = QdrantClient(location=":memory:")
+    mock_meili.Client.return_value.index.return_value.add_documents.return_value = {"taskUid": 1}
+    with patch(
+        "server.indexing.reddit_query_index.qdrant_client.QdrantClient", return_value=client
+    ):
+        rqi = RedditQueryIndex(
+            collection_name="test_stale_chunks",
+            embed_model="default",
+            embedding_cache=None,
+            meili_sync=True,
+            deduplicator=None,
+        )
+    rqi._chunker = TextChunker(max_tokens=64, overlap_tokens=0)
+
+    def index(selftext):
+        fields = dict.fromkeys(SubmissionRecord.__dataclass_fields__)
+        fields.update(id="s1", title="Notes", subreddit="python", selftext=selftext, comments=[])
+        rqi.index_records([SubmissionRecord(**fields)], "q")
+        points, _ = client.scroll("test_stale_chunks", with_payload=True, limit=100)
+        return sorted(p.payload.get("chunk_index", -1) for p in points)
+
+    paragraph = "Pydantic models describe the payloads and keep clients in sync. " * 2
+    long_post = index("\n\n".join([paragraph] * 8))
+    assert long_post == list(range(len(long_post))) and len(long_post) > 2
+    shorter_post = index("\n\n".join([paragraph] * 4))
+    assert shorter_post == list(range(len(shorter_post))) and len(shorter_post) < len(long_post)
+
+    # Duplicates found later are recorded on every chunk of the canonical.
+    rqi._record_duplicates({"s1": ["s9"]})
+    points, _ = client.scroll("test_stale_chunks", with_payload=True, limit=100)
+    assert [p.payload["duplicate_ids"] for p in points] == [["s9"]] * len(shorter_post)
+
+    assert index("Short now.") == [-1]
+    client.close()
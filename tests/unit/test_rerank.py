@@ -0,0 +1,97 @@
+import asyncio
+import json
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from server.metrics import LLM_TOKENS_TOTAL, RERANK_REQUESTS_TOTAL
+from server.postprocess.rerank import LLMReranker, parse_scores
+from server.retrieval.hybrid import SearchCandidate
+
+
+class FakeLLM:
+    """Scores documents by how many query words their snippet contains."""
+
+    def __init__(self, delay=0.0, usage=None):
+        self.prompts = []
+        self.delay = delay
+        self.usage = usage or SimpleNamespace(prompt_tokens=100, completion_tokens=10)
+
+    async def acomplete(self, prompt):
+        self.prompts.append(prompt)
+        await asyncio.sleep(self.delay)
+        query = re.search(r"Query: (.*)", prompt).group(1).split()
+        docs = re.findall(r"\[(\d+)\] (.*)", prompt)
+        scores = [{"id": int(i), "score": sum(w in text for w in query)} for i, text in docs]
+        return SimpleNamespace(text=json.dumps({"scores": scores}), raw={"usage": self.usage})
+
+
+def _cands():
+    titles = ["cooking pasta", "python web", "python web framework", "gardening"]
+    return [SearchCandidate(doc_id=f"d{i}", score=1.0, title=t) for i, t in enumerate(titles)]
+
+
+def _count(metric, **labels):
+    return metric.labels(**labels)._value.get()
+
+
+def test_parse_scores_accepts_json_and_fallback_lines():
+    assert parse_scores('ok {"scores": [{"id": 1, "score": 7}, {"id": 9, "score": 1}]}', 2) == {
+        1: 7.0
+    }
+    assert parse_scores("1: 3\n2 = 8.5", 2) == {1: 3.0, 2: 8.5}
+
+
+@pytest.mark.asyncio
+async def test_rerank_batches_and_caches_judgments():
+    llm = FakeLLM()
+    reranker = LLMReranker(llm, top_k=3, batch_size=2, timeout_seconds=1.0)
+    prompt_tokens = _count(LLM_TOKENS_TOTAL, stage="rerank", kind="prompt")
+
+    out = await reranker.rerank("python web framework", _cands())
+
+    # Only the top 3 are judged (2 prompts); the 4th keeps its place after them.
+    assert [c.doc_id for c in out] == ["d2", "d1", "d0", "d3"]
+    assert out[0].rerank_score == 3 and out[3].rerank_score is None
+    assert len(llm.prompts) == 2
+    assert _count(LLM_TOKENS_TOTAL, stage="rerank", kind="prompt") - prompt_tokens == 200
+
+    cached = _count(RERANK_REQUESTS_TOTAL, outcome="cached")
+    again = await reranker.rerank("Python  web framework", _cands())
+    assert [c.doc_id for c in again] == ["d2", "d1", "d0", "d3"]
+    assert len(llm.prompts) == 2
+    assert _count(RERANK_REQUESTS_TOTAL, outcome="cached") - cached == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "usage",
+    [
+        {"prompt_tokens": 70, "completion_tokens": 5},
+        {"input_tokens": 70, "output_tokens": 5},
+        SimpleNamespace(input_tokens=70, output_tokens=5),
+    ],
+)
+async def test_token_usage_is_read_from_mappings_and_objects(usage):
+    reranker = LLMReranker(FakeLLM(usage=usage), top_k=2, batch_size=2, timeout_seconds=1.0)
+    prompt_tokens = _count(LLM_TOKENS_TOTAL, stage="rerank", kind="prompt")
+    completion_tokens = _count(LLM_TOKENS_TOTAL, stage="rerank", kind="completion")
+
+    await reranker.rerank("python web", _cands())
+
+    assert _count(LLM_TOKENS_TOTAL, stage="rerank", kind="prompt") - prompt_tokens == 70
+    assert _count(LLM_TOKENS_TOTAL, stage="rerank", kind="completion") - completion_tokens == 5
+
+
+@pytest.mark.asyncio
+async def test_deadline_falls_back_to_fusion_order():
+    reranker = LLMReranker(FakeLLM(delay=0.5), top_k=3, batch_size=2, timeout_seconds=0.05)
+    timeouts = _count(RERANK_REQUESTS_TOTAL, outcome="timeout")
+
+    cands = _cands()
+    out = await reranker.rerank("python web framework", cands)
+
+    assert out == cands
+    assert all(c.rerank_score is None for c in out)
+    assert _count(RERANK_REQUESTS_TOTAL, outcome="timeout") - timeouts == 1
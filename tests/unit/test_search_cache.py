@@ -0,0 +1,108 @@
+import pytest
+
+from server.metrics import SEARCH_CACHE_REQUESTS_TOTAL
+from server.retrieval.cache import (
+    SearchResultCache,
+    generation_key,
+    invalidate_collection,
+    normalize_query,
+)
+from server.retrieval.hybrid import SearchCandidate
+
+
+class FakeRedis:
+    """Minimal subset of the redis client API (sync and async flavours)."""
+
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+
+class FakeAsyncRedis(FakeRedis):
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.ttls[key] = ex
+
+
+class BrokenRedis:
+    async def get(self, key):
+        raise ConnectionError("redis down")
+
+    async def set(self, key, value, ex=None):
+        raise ConnectionError("redis down")
+
+
+def _count(result):
+    return SEARCH_CACHE_REQUESTS_TOTAL.labels(result=result)._value.get()
+
+
+def test_normalize_query():
+    assert normalize_query("  Best   Python\tFramework ") == "best python framework"
+
+
+@pytest.mark.asyncio
+async def test_cache_roundtrip_ttl_and_metrics():
+    redis = FakeAsyncRedis()
+    cache = SearchResultCache(redis, "coll", ttl_seconds=30)
+    hits, misses = _count("hit"), _count("miss")
+
+    assert await cache.get("Python  web", "Py", 5) is None
+    await cache.set("Python  web", "Py", 5, [SearchCandidate(doc_id="a", score=0.5, title="A")])
+    cached = await cache.get("python web", "py", 5)
+
+    assert [c.doc_id for c in cached] == ["a"] and cached[0].title == "A"
+    assert await cache.get("python web", "py", 10) is None  # top_k is part of the key
+    assert list(redis.ttls.values()) == [30]
+    assert _count("hit") - hits == 1
+    assert _count("miss") - misses == 2
+
+
+@pytest.mark.asyncio
+async def test_collection_change_invalidates_entries():
+    redis = FakeAsyncRedis()
+    cache = SearchResultCache(redis, "coll", ttl_seconds=30)
+    await cache.set("q", None, 3, [SearchCandidate(doc_id="a", score=1.0)])
+
+    invalidate_collection("coll", redis)
+
+    assert redis.data[generation_key("coll")] == "1"
+    assert await cache.get("q", None, 3) is None
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_is_a_miss():
+    cache = SearchResultCache(BrokenRedis(), "coll")
+    errors = _count("error")
+    assert await cache.get("q", None, 3) is None
+    await cache.set("q", None, 3, [SearchCandidate(doc_id="a", score=1.0)])
+    assert _count("error") - errors == 1
+
+
+@pytest.mark.asyncio
+async def test_redis_failure_bypasses_the_cache_for_a_while():
+    class CountingBrokenRedis(BrokenRedis):
+        calls = 0
+
+        async def get(self, key):
+            self.calls += 1
+            return await super().get(key)
+
+    now = [0.0]
+    redis = CountingBrokenRedis()
+    cache = SearchResultCache(redis, "coll", retry_after_seconds=5.0, clock=lambda: now[0])
+
+    for _ in range(3):
+        generation = await cache.generation()
+        assert await cache.get("q", None, 3, generation) is None
+    assert redis.calls == 1
+
+    now[0] = 5.0
+    await cache.generation()
+    assert redis.calls == 2
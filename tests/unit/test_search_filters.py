@@ -0,0 +1,168 @@
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+from httpx import ASGITransport, AsyncClient
+from qdrant_client import AsyncQdrantClient
+from qdrant_client.http import models as qmodels
+
+from server.backends import FakeMeiliTransport, LexicalStore
+from server.indexing.collection import PAYLOAD_INDEXES
+from server.indexing.reddit_query_index import RedditQueryIndex
+from server.main import app
+from server.retrieval.filters import SearchFilters
+from server.retrieval.hybrid import HybridSearchEngine
+from server.routes.search import (
+    get_reranker,
+    get_result_cache,
+    get_search_engine,
+    get_semantic_cache,
+)
+
+DOCS = [
+    {"id": "s1", "kind": "submission", "subreddit": "Python", "author": "Ann", "ts": 100.0},
+    {"id": "c1", "kind": "comment", "subreddit": "Python", "author": "bob", "ts": 200.0},
+    {"id": "c2", "kind": "comment", "subreddit": "rust", "author": "Ann", "ts": 300.0},
+    {"id": "c3", "kind": "comment", "subreddit": "golang", "author": "cid", "ts": 400.0},
+]
+
+
+def test_filters_render_for_both_backends():
+    filters = SearchFilters.build(
+        subreddit="python", subreddits=["rust", "python"], kinds=["comment"], created_after=150
+    )
+    assert filters.subreddits == ("python", "rust")
+    assert SearchFilters.build(subreddit="Python", authors=["Ann "]) == SearchFilters(
+        subreddits=("python",), authors=("ann",)
+    )
+    assert filters.to_meili() == (
+        'subreddit_lc IN ["python", "rust"] AND kind = "comment" AND created_utc >= 150'
+    )
+    must = filters.to_qdrant().must
+    assert must[0].match.any == ["python", "rust"]
+    assert must[1].match.value == "comment"
+    assert must[2].range.gte == 150 and must[2].range.lte is None
+
+    assert not SearchFilters() and SearchFilters().to_qdrant() is None
+    # A lone subreddit keeps the cache keys used before filters existed.
+    assert SearchFilters.build(subreddit="python").scope() == "python"
+    assert filters.scope() != SearchFilters.build(subreddits=["python", "rust"]).scope()
+
+
+@pytest.mark.asyncio
+async def test_filters_are_pushed_down_before_top_k():
+    qdrant = AsyncQdrantClient(location=":memory:")
+    await qdrant.create_collection(
+        "posts", vectors_config=qmodels.VectorParams(size=2, distance=qmodels.Distance.COSINE)
+    )
+    await qdrant.upsert(
+        "posts",
+        points=[
+            qmodels.PointStruct(
+                id=i,
+                vector=[1.0, 0.1 * i],
+                payload={
+                    "doc_id": d["id"],
+                    "kind": d["kind"],
+                    "subreddit_lc": d["subreddit"].lower(),
+                    "author_lc": d["author"].lower(),
+                    "created_utc": d["ts"],
+                },
+            )
+            for i, d in enumerate(DOCS)
+        ],
+    )
+    store = LexicalStore()
+    store.add(
+        "posts",
+        [
+            {"id": d["id"], "body": "python tips", "kind": d["kind"]}
+            | {"subreddit_lc": d["subreddit"].lower(), "author_lc": d["author"].lower()}
+            | {"created_utc": d["ts"]}
+            for d in DOCS
+        ],
+    )
+    engine = HybridSearchEngine(
+        "posts",
+        qdrant=qdrant,
+        http=httpx.AsyncClient(transport=FakeMeiliTransport(store), base_url="http://meili"),
+    )
+    filters = SearchFilters.build(subreddits=["python", "rust"], kinds=["comment"])
+    try:
+        semantic = await engine._semantic("python", filters, [1.0, 0.0])
+        lexical = await engine._lexical("python", filters)
+        windowed = await engine._semantic(
+            "python", SearchFilters(authors=("ann",), created_before=250.0), [1.0, 0.0]
+        )
+    finally:
+        await engine.aclose()
+
+    assert sorted(h.doc_id for h in semantic) == ["c1", "c2"]
+    assert sorted(h.doc_id for h in lexical) == ["c1", "c2"]
+    assert [h.doc_id for h in windowed] == ["s1"]
+
+
+class RecordingEngine:
+    def __init__(self):
+        self.filters = []
+
+    async def search(self, query, top_k=10, *, filters=None, query_vector=None, **_):
+        self.filters.append(filters)
+        return []
+
+
+@pytest.mark.asyncio
+async def test_search_route_accepts_filters():
+    engine = RecordingEngine()
+    app.dependency_overrides[get_search_engine] = lambda: engine
+    app.dependency_overrides[get_result_cache] = lambda: None
+    app.dependency_overrides[get_semantic_cache] = lambda: None
+    app.dependency_overrides[get_reranker] = lambda: None
+    body = {
+        "query": "async",
+        "subreddit": "python",
+        "filters": {
+            "subreddits": ["rust"],
+            "kinds": ["comment"],
+            "authors": ["ann"],
+            "created_after": "1970-01-01T00:01:40",
+        },
+    }
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            assert (await ac.post("/search", json=body)).status_code == 200
+            bad = {"query": "async", "filters": {"kinds": ["user"]}}
+            assert (await ac.post("/search", json=bad)).status_code == 422
+    finally:
+        app.dependency_overrides.clear()
+
+    assert engine.filters == [
+        SearchFilters(
+            subreddits=("python", "rust"),
+            kinds=("comment",),
+            authors=("ann",),
+            created_after=100.0,
+        )
+    ]
+
+
+def test_collection_is_set_up_once_per_index():
+    rqi = RedditQueryIndex.__new__(RedditQueryIndex)
+    rqi._collection_name = "posts"
+    rqi._collection_ready = False
+    rqi._client = MagicMock()
+    rqi._meili_ingestor = MagicMock()
+    rqi._client.collection_exists.return_value = True
+    rqi._client.get_collection.return_value.payload_schema = {"subreddit_lc": object()}
+
+    rqi.ensure_collection(384)
+    rqi.ensure_collection(384)
+
+    rqi._client.create_collection.assert_not_called()
+    rqi._meili_ingestor.apply_settings.assert_called_once_with()
+    created = {
+        c.kwargs["field_name"]: c.kwargs["field_schema"].value
+        for c in rqi._client.create_payload_index.call_args_list
+    }
+    assert created == {name: schema for name, schema in PAYLOAD_INDEXES if name != "subreddit_lc"}
+    assert created["created_at"] == "datetime" and created["created_utc"] == "float"
@@ -0,0 +1,91 @@
+import pytest
+
+from server.retrieval.hybrid import SearchCandidate
+from server.retrieval.semantic_cache import SemanticQueryCache
+from server.routes.search import SearchRequest, _cached_search
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _results(*ids):
+    return [SearchCandidate(doc_id=i, score=1.0) for i in ids]
+
+
+def test_paraphrase_hits_and_unrelated_query_misses():
+    cache = SemanticQueryCache(threshold=0.9, ttl_seconds=60, max_entries=10)
+    cache.store([1.0, 0.0, 0.1], None, 5, _results("a", "b", "c"))
+
+    hit = cache.lookup([0.98, 0.05, 0.12], None, 2)
+    assert [c.doc_id for c in hit] == ["a", "b"]
+    assert cache.lookup([0.0, 1.0, 0.0], None, 2) is None
+    # Different subreddit, larger top_k or newer collection generation never match.
+    assert cache.lookup([1.0, 0.0, 0.1], "python", 2) is None
+    assert cache.lookup([1.0, 0.0, 0.1], None, 10) is None
+    assert cache.lookup([1.0, 0.0, 0.1], None, 2, generation=1) is None
+
+
+def test_entries_expire_and_capacity_evicts_oldest():
+    clock = FakeClock()
+    cache = SemanticQueryCache(threshold=0.99, ttl_seconds=60, max_entries=2, clock=clock)
+    cache.store([1.0, 0.0], None, 5, _results("x"))
+    clock.now = 1
+    cache.store([0.0, 1.0], None, 5, _results("y"))
+    clock.now = 2
+    cache.store([-1.0, 0.0], None, 5, _results("z"))
+
+    assert len(cache) == 2
+    assert cache.lookup([1.0, 0.0], None, 5) is None
+    assert cache.lookup([0.0, 1.0], None, 5)[0].doc_id == "y"
+
+    clock.now = 100
+    assert cache.lookup([0.0, 1.0], None, 5) is None
+    assert len(cache) == 0
+
+
+def test_lookup_only_scores_slots_of_the_same_scope():
+    cache = SemanticQueryCache(ttl_seconds=60, max_entries=8)
+    cache.store([1.0, 0.0], "python", 5, _results("py"))
+    cache.store([0.8, 0.6], None, 5, _results("all"))
+    cache.store([1.0, 0.0], "rust", 5, _results("rs"))
+
+    assert cache.lookup([1.0, 0.0], "Python", 5)[0].doc_id == "py"
+    assert cache.lookup([1.0, 0.0], "rust", 5)[0].doc_id == "rs"
+    # 0.8 similarity is below the strict default threshold.
+    assert cache.lookup([1.0, 0.0], None, 5) is None
+
+
+class FakeEngine:
+    def __init__(self):
+        self.searches = []
+        self.embeds = 0
+
+    async def embed_query(self, query):
+        self.embeds += 1
+        return [1.0, 0.0] if "python" in query else [0.0, 1.0]
+
+    async def search(self, query, top_k=10, *, subreddit=None, filters=None, query_vector=None):
+        self.searches.append((query, query_vector))
+        return _results("p1", "p2")[:top_k]
+
+
+@pytest.mark.asyncio
+async def test_search_path_embeds_once_and_serves_paraphrases_from_cache():
+    engine = FakeEngine()
+    cache = SemanticQueryCache(threshold=0.9, ttl_seconds=60, max_entries=10)
+
+    first = await _cached_search(
+        SearchRequest(query="best python web framework", top_k=2), engine, None, cache
+    )
+    second = await _cached_search(
+        SearchRequest(query="which python web framework is best", top_k=2), engine, None, cache
+    )
+
+    assert [c.doc_id for c in second] == [c.doc_id for c in first]
+    assert engine.searches == [("best python web framework", [1.0, 0.0])]
+    assert engine.embeds == 2
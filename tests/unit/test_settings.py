@@ -1,3 +1,6 @@
+import pytest
+from pydantic import ValidationError
+
 from server.config import Settings
 
 
@@ -12,3 +15,9 @@ def test_settings_parse_languages(monkeypatch):
     monkeypatch.setenv("NER_LANGUAGES", "es, en , fr ")
     s = Settings()
     assert s.ner_languages == ["es", "en", "fr"]
+
+
+def test_settings_reject_non_positive_half_life(monkeypatch):
+    monkeypatch.setenv("TEMPORAL_DECAY_HALF_LIFE_DAYS", "0")
+    with pytest.raises(ValidationError):
+        Settings()
@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+# Generous default so a loaded CI runner does not flake; the point is to catch
+# a heavy client library creeping back into the import path (~3s when it does).
+IMPORT_BUDGET_SECONDS = float(os.environ.get("STARTUP_IMPORT_BUDGET_SECONDS", "2.0"))
+
+HEAVY_MODULES = ["praw", "qdrant_client", "llama_index.core", "meilisearch"]
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import server.main
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def test_import_does_not_load_heavy_clients():
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE % HEAVY_MODULES],
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=60,
+    )
+    probe = json.loads(out.stdout.strip().splitlines()[-1])
+    assert probe["loaded"] == []
+    assert probe["elapsed"] < IMPORT_BUDGET_SECONDS
+
+
+def test_lifespan_preloads_then_marks_ready(monkeypatch):
+    from server.config import settings
+    from server.indexing.registry import ModelRegistry
+    from server.main import app
+
+    fresh = ModelRegistry()
+    monkeypatch.setattr("server.main.registry", fresh)
+    monkeypatch.setattr(settings, "embedding_warmup", False)
+    with TestClient(app) as client:
+        assert client.get("/healthz").status_code == 200
+        deadline = time.monotonic() + 30
+        while not fresh.is_ready() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        resp = client.get("/readyz")
+    assert resp.status_code == 200
+    assert "server.indexing.reddit_query_index" in sys.modules
@@ -0,0 +1,50 @@
+import pytest
+
+from server.retrieval.hybrid import SearchCandidate
+from server.retrieval.temporal import temporal_rescore
+
+NOW = 1_700_000_000.0
+DAY = 86400.0
+
+
+def _cand(doc_id, relevance, **meta):
+    return SearchCandidate(doc_id=doc_id, score=relevance, metadata=meta)
+
+
+def test_recent_post_overtakes_slightly_more_relevant_old_post():
+    old = _cand("old", 1.0, created_utc=NOW - 60 * DAY)
+    new = _cand("new", 0.9, created_utc=NOW - 1 * DAY)
+
+    out = temporal_rescore(
+        [old, new], now=NOW, half_life_days=7, temporal_weight=0.3, engagement_weight=0.0
+    )
+
+    assert [c.doc_id for c in out] == ["new", "old"]
+    assert new.score == pytest.approx(0.7 * 0.9 + 0.3 * 0.5 ** (1 / 7))
+
+
+def test_engagement_and_missing_signals():
+    popular = _cand("popular", 1.0, score=500, num_comments=200, upvote_ratio=0.95)
+    quiet = _cand("quiet", 1.0, score=1, num_comments=0, upvote_ratio=True)
+    undated = _cand("undated", 1.0)
+
+    out = temporal_rescore(
+        [quiet, undated, popular], now=NOW, temporal_weight=0.0, engagement_weight=0.5
+    )
+
+    assert out[0].doc_id == "popular"
+    assert out[0].score == pytest.approx(1.0)
+    # Equal scores keep their incoming (fusion) order.
+    assert [c.doc_id for c in out[1:]] == ["quiet", "undated"]
+
+
+def test_zero_weights_leave_order_and_scores_untouched():
+    cands = [_cand("a", 0.3), _cand("b", 0.2)]
+    assert temporal_rescore(cands, temporal_weight=0.0, engagement_weight=0.0) == cands
+    assert [c.score for c in cands] == [0.3, 0.2]
+
+
+@pytest.mark.parametrize("half_life", [0, -1.0])
+def test_non_positive_half_life_is_rejected(half_life):
+    with pytest.raises(ValueError):
+        temporal_rescore([_cand("a", 1.0, created_utc=NOW)], now=NOW, half_life_days=half_life)